@@ -0,0 +1,212 @@
+"""Benchmark cases for the audio and data hot paths.
+
+A case's setup builds its inputs and returns the callable that gets timed,
+so decoding fixtures and importing modules never count. Setup imports what
+it needs itself, and a case whose imports fail is skipped, not faked. Any
+other error in setup or in the timed call fails the run.
+"""
+
+from __future__ import annotations
+
+import atexit
+from dataclasses import dataclass
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+
+import synthetic
+
+Timed = Callable[[], Any]
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    setup: Callable[[], Timed]
+    # calls per timed round, for cases too quick to time one call at a time
+    number: int = 1
+
+
+CASES: list[Case] = []
+
+
+def case(name: str, *, number: int = 1) -> Callable[[Callable[[], Timed]], Any]:
+    def _register(setup: Callable[[], Timed]) -> Callable[[], Timed]:
+        CASES.append(Case(name, setup, number))
+        return setup
+
+    return _register
+
+
+def _headlessPlayer(samples: np.ndarray, sample_rate: int):
+    # AudioPlayer.__init__ opens an output device; the WSOLA path only needs
+    # the sample buffer and its own state
+    from core.audio_player import AudioPlayer
+    from imports import QObject
+
+    player = AudioPlayer.__new__(AudioPlayer)
+    QObject.__init__(player)
+    player.samples = samples
+    player.sample_rate = sample_rate
+    player.channels = samples.shape[1]
+    player._resetWsola()
+    return player
+
+
+@case('audio.prepare_samples_60s')
+def prepareSamples() -> Timed:
+    from core.audio_player import AudioPlayer
+
+    segment = synthetic.toSegment(synthetic.tone(60.0))
+    player = _headlessPlayer(np.zeros((1, 2), dtype=np.float32), segment.frame_rate)
+    return lambda: AudioPlayer._prepareSamples(player, segment)
+
+
+@case('audio.integrated_loudness_60s')
+def integratedLoudness() -> Timed:
+    from core.loudness import Meter
+
+    samples = synthetic.tone(60.0).astype(np.float64)
+    return lambda: Meter(synthetic.SAMPLE_RATE).integratedLoudness(samples)
+
+
+@case('audio.crossfade_60s')
+def crossfade() -> Timed:
+    from core.crossfade import getCrossfade
+
+    current = synthetic.toSegment(synthetic.tone(60.0, bpm=120.0))
+    following = synthetic.toSegment(synthetic.tone(60.0, bpm=128.0, seed=99))
+    return lambda: getCrossfade(current, following, 8.0, 1.0)
+
+
+@case('audio.detect_bpm_60s')
+def detectBpm() -> Timed:
+    from core.crossfade import _detect_bpm
+
+    samples = synthetic.tone(60.0, bpm=124.0)
+    return lambda: _detect_bpm(samples, synthetic.SAMPLE_RATE)
+
+
+def _wsolaCase(speed: float) -> None:
+    block = 1024
+    seconds = 10.0
+
+    def setup() -> Timed:
+        player = _headlessPlayer(synthetic.tone(30.0), synthetic.SAMPLE_RATE)
+        output_frames = int(seconds * synthetic.SAMPLE_RATE)
+
+        def run() -> None:
+            # as the audio callback would, in callback-sized blocks
+            player._resetWsola()
+            position = 0
+            for _ in range(output_frames // block):
+                player._readWsola(position, block, speed)
+                position += player._sourceFramesFor(position, block, speed)
+
+        return run
+
+    CASES.append(Case(f'audio.wsola_{speed:g}x_10s', setup))
+
+
+for _speed in (0.5, 0.75, 1.25, 1.5, 2.0):
+    _wsolaCase(_speed)
+
+
+@case('lyrics.lrc_parse_400', number=10)
+def lrcParse() -> Timed:
+    from core.lyrics import LRCLyricParser
+
+    parser = LRCLyricParser()
+    parser.cur = synthetic.lrcText(400)
+    return parser.parse
+
+
+@case('lyrics.yrc_parse_400', number=10)
+def yrcParse() -> Timed:
+    from core.lyrics import YRCLyricParser
+
+    parser = YRCLyricParser()
+    parser.cur = synthetic.yrcText(400)
+    return parser.parse
+
+
+def _lookup(parser: Any, times: list[float]) -> Timed:
+    def run() -> None:
+        # distinct times with cold caches, as while seeking or scrubbing
+        parser._clearLookupCaches()
+        for t in times:
+            parser.getCurrentIndex(t)
+            parser.getCurrentLyric(t)
+            parser.getOffsetedLyric(t, 1)
+
+    return run
+
+
+@case('lyrics.lrc_lookup_2000')
+def lrcLookup() -> Timed:
+    from core.lyrics import LRCLyricParser
+
+    parser = LRCLyricParser()
+    parser.cur = synthetic.lrcText(400)
+    parser.parse()
+    return _lookup(parser, [i * 0.5 + 0.013 for i in range(2000)])
+
+
+@case('lyrics.yrc_lookup_2000')
+def yrcLookup() -> Timed:
+    from core.lyrics import YRCLyricParser
+
+    parser = YRCLyricParser()
+    parser.cur = synthetic.yrcText(400)
+    parser.parse()
+    return _lookup(parser, [i * 0.5 + 0.013 for i in range(2000)])
+
+
+@case('data.favorites_load_10k')
+def favoritesLoad() -> Timed:
+    from core import favorites
+
+    directory = Path(tempfile.mkdtemp(prefix='southside-bench-'))
+    atexit.register(shutil.rmtree, directory, True)
+    path = directory / 'favorites.json'
+    synthetic.writeFavorites(path, 10000)
+    favorites._FAVORITES_PATH = str(path)
+
+    manager = favorites.FavoritesManager()
+    # the local stand-in for the NetEase cover download
+    manager._downloadFirstImage = lambda folder_name, storable: None
+    return manager.load
+
+
+@case('data.song_storable_10k')
+def songStorable() -> Timed:
+    from core.models import SongStorable
+
+    objects = [synthetic.songObject(i) for i in range(10000)]
+    return lambda: [SongStorable.fromObject(obj) for obj in objects]
+
+
+@case('data.normalize_fft_frame', number=200)
+def normalizeFft() -> Timed:
+    from core.free_threaded_worker import _normalizePayload, json_float_array
+
+    magnitudes = np.abs(np.random.default_rng(synthetic.SEED).normal(size=1024))
+    payload = {
+        'option': 'update_fft',
+        'magnitudes': json_float_array(
+            magnitudes.astype(np.float32).tobytes(), 'float32', 1024, 100.0
+        ),
+    }
+    return lambda: _normalizePayload(payload)
+
+
+@case('data.advanced_random_50k', number=20)
+def advancedRandom() -> Timed:
+    from core.weighted_random import AdvancedRandom
+
+    picker: AdvancedRandom[int] = AdvancedRandom()
+    picker.init(list(range(50000)))
+    return picker.random
@@ -0,0 +1,219 @@
+"""Run the hot path benchmarks headlessly and compare them with a baseline.
+
+    python benchmarks/run.py                   # run, write bench_results.json
+    python benchmarks/run.py --save-baseline   # record benchmarks/baseline.json
+    python benchmarks/run.py --check           # exit 1 when a case regressed
+
+Every case reports the median, min, mean and stdev seconds per call. With a
+baseline present, a case whose fastest round is slower than the baseline's by
+more than ``--tolerance`` counts as a regression; the minimum is the figure
+least disturbed by other load on the machine. Record the baseline on the
+machine that runs the checks; timings from other machines mean little.
+
+A case is skipped only when a module it needs is missing, or PortAudio is.
+Any other error fails the run. ``--check`` also fails when there is no
+baseline, or when a case the baseline has was skipped.
+"""
+
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timezone
+import gc
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+import traceback
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / 'src'))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import numpy as np  # noqa: E402
+
+from cases import CASES, Case  # noqa: E402
+
+DEFAULT_REPEAT = 7
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_OUTPUT = ROOT / 'bench_results.json'
+DEFAULT_BASELINE = ROOT / 'benchmarks' / 'baseline.json'
+
+
+def timeCase(case: Case, repeat: int) -> dict[str, float | int]:
+    func = case.setup()
+    func()  # warm caches and lazy imports outside the timed rounds
+
+    samples: list[float] = []
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for _ in range(case.number):
+                func()
+            samples.append((time.perf_counter() - started) / case.number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    return {
+        'median': statistics.median(samples),
+        'min': min(samples),
+        'mean': statistics.fmean(samples),
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'rounds': repeat,
+        'number': case.number,
+    }
+
+
+def skipReason(error: Exception) -> str | None:
+    """Why a case cannot run on this machine, or None for a real failure."""
+    if isinstance(error, ImportError):
+        return f'{type(error).__name__}: {error}'
+    # sounddevice raises a bare OSError when the PortAudio library is missing
+    if isinstance(error, OSError) and 'PortAudio' in str(error):
+        return f'OSError: {error}'
+    return None
+
+
+def compare(
+    cases: dict[str, dict], baseline: dict[str, dict], tolerance: float
+) -> list[str]:
+    regressions = []
+    for name, result in cases.items():
+        previous = baseline.get(name)
+        if not previous or not previous.get('min'):
+            result['baseline_ratio'] = None
+            continue
+        ratio = result['min'] / previous['min']
+        result['baseline_ratio'] = ratio
+        if ratio > 1.0 + tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def formatSeconds(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f'{seconds * 1e6:8.1f}us'
+    if seconds < 1.0:
+        return f'{seconds * 1e3:8.2f}ms'
+    return f'{seconds:8.2f}s '
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description='Time the audio and data hot paths on synthetic inputs.'
+    )
+    parser.add_argument('-k', '--filter', default='', help='run cases containing this')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--output', type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument(
+        '--save-baseline', action='store_true', help='write the results as baseline'
+    )
+    parser.add_argument(
+        '--tolerance',
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help='allowed slowdown over the baseline, as a fraction',
+    )
+    parser.add_argument(
+        '--check',
+        action='store_true',
+        help='exit 1 when a case regressed, or the baseline cannot be checked',
+    )
+    parser.add_argument('--list', action='store_true', help='list cases and exit')
+    args = parser.parse_args()
+
+    selected = [case for case in CASES if args.filter in case.name]
+    if args.list:
+        for case in selected:
+            print(case.name)
+        return 0
+
+    logging.basicConfig(level=logging.WARNING)
+
+    results: dict[str, dict] = {}
+    skipped: dict[str, str] = {}
+    failed: dict[str, str] = {}
+    width = max((len(case.name) for case in selected), default=0)
+    for case in selected:
+        try:
+            result = timeCase(case, max(1, args.repeat))
+        except Exception as e:
+            reason = skipReason(e)
+            if reason is None:
+                failed[case.name] = f'{type(e).__name__}: {e}'
+                print(f'{case.name:<{width}}  FAILED ({failed[case.name]})')
+                traceback.print_exc()
+            else:
+                skipped[case.name] = reason
+                print(f'{case.name:<{width}}  skipped ({reason})')
+            continue
+        results[case.name] = result
+        print(
+            f'{case.name:<{width}}  median {formatSeconds(result["median"])}'
+            f'  min {formatSeconds(result["min"])}'
+            f'  stdev {formatSeconds(result["stdev"])}'
+        )
+
+    regressions: list[str] = []
+    unchecked: list[str] = []
+    has_baseline = args.baseline.exists()
+    if has_baseline and not args.save_baseline:
+        baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+        baseline_cases = baseline.get('cases', {})
+        regressions = compare(results, baseline_cases, args.tolerance)
+        unchecked = [name for name in skipped if name in baseline_cases]
+        print(f'\ncompared with {args.baseline} (tolerance {args.tolerance:.0%}):')
+        for name, result in results.items():
+            ratio = result.get('baseline_ratio')
+            if ratio is None:
+                continue
+            mark = '  REGRESSION' if name in regressions else ''
+            print(f'{name:<{width}}  {ratio:6.2f}x{mark}')
+
+    report = {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'numpy': np.__version__,
+        'repeat': args.repeat,
+        'cases': results,
+        'skipped': skipped,
+        'failed': failed,
+        'regressions': regressions,
+    }
+    args.output.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    print(f'\nwrote {args.output}')
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2), encoding='utf-8')
+        print(f'saved baseline {args.baseline}')
+
+    status = 0
+    if failed:
+        print(f'{len(failed)} case(s) failed: {", ".join(failed)}')
+        status = 1
+    if regressions:
+        print(f'{len(regressions)} case(s) regressed: {", ".join(regressions)}')
+    if args.check and not args.save_baseline:
+        if not has_baseline:
+            print(f'no baseline at {args.baseline}; record one with --save-baseline')
+            status = 1
+        if unchecked:
+            print(f'{len(unchecked)} baseline case(s) skipped: {", ".join(unchecked)}')
+            status = 1
+        if regressions:
+            status = 1
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""Deterministic stand-ins for the audio, lyrics and favourites the app loads.
+
+Nothing here touches the network: songs, lyrics and favourites are generated
+from a fixed seed, so two runs time exactly the same work.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+SAMPLE_RATE = 44100
+SEED = 1234
+
+
+def tone(
+    seconds: float,
+    *,
+    bpm: float = 120.0,
+    sample_rate: int = SAMPLE_RATE,
+    channels: int = 2,
+    seed: int = SEED,
+) -> np.ndarray:
+    """A chord over a kick on every beat plus a little noise, float32 in [-1, 1]."""
+    rng = np.random.default_rng(seed)
+    frames = int(seconds * sample_rate)
+    t = np.arange(frames, dtype=np.float64) / sample_rate
+
+    signal = np.zeros(frames, dtype=np.float64)
+    for freq in (220.0, 277.18, 329.63):
+        signal += 0.12 * np.sin(2 * np.pi * freq * t)
+
+    beat = 60.0 / bpm
+    kick_len = int(0.12 * sample_rate)
+    kick_t = np.arange(kick_len) / sample_rate
+    kick = np.sin(2 * np.pi * 60.0 * kick_t) * np.exp(-kick_t * 30.0) * 0.6
+    for start in np.arange(0.0, seconds, beat):
+        index = int(start * sample_rate)
+        end = min(frames, index + kick_len)
+        signal[index:end] += kick[: end - index]
+
+    signal += rng.normal(0.0, 0.01, frames)
+    out = np.repeat(signal[:, None], channels, axis=1)
+    if channels > 1:
+        # a slight delay on the right channel so the channels differ
+        out[:, 1] = np.roll(out[:, 1], 32)
+    return np.clip(out, -1.0, 1.0).astype(np.float32)
+
+
+def toInt16(samples: np.ndarray) -> np.ndarray:
+    return (samples * 32767.0).astype(np.int16)
+
+
+def toSegment(samples: np.ndarray, sample_rate: int = SAMPLE_RATE):
+    """Wrap float samples as the pydub segment the player decodes to."""
+    from core.audio_player import PatchedAudioSegment
+
+    pcm = toInt16(samples)
+    return PatchedAudioSegment(
+        data=pcm.tobytes(),
+        sample_width=2,
+        frame_rate=sample_rate,
+        channels=pcm.shape[1] if pcm.ndim > 1 else 1,
+    )
+
+
+def lrcText(lines: int = 120, *, step: float = 2.5) -> str:
+    rows = []
+    for index in range(lines):
+        seconds = index * step
+        stamp = f'[{int(seconds // 60):02d}:{seconds % 60:05.2f}]'
+        rows.append(f'{stamp}line {index} of the synthetic lyric')
+        if index % 8 == 7:
+            rows.append(f'[{int((seconds + 2) // 60):02d}:{(seconds + 2) % 60:05.2f}]')
+    return '\n'.join(rows)
+
+
+def yrcText(lines: int = 120, *, step_ms: int = 2500, words: int = 8) -> str:
+    rows = []
+    for index in range(lines):
+        start = index * step_ms
+        word_ms = step_ms // words
+        parts = ''.join(
+            f'({start + w * word_ms},{word_ms},0)word{w} ' for w in range(words)
+        )
+        rows.append(f'[{start},{step_ms}]{parts}')
+    return '\n'.join(rows)
+
+
+def songObject(index: int) -> dict[str, object]:
+    return {
+        'name': f'Synthetic Song {index}',
+        'id': 100000 + index,
+        'artists': [
+            {'id': 5000 + index % 300, 'name': f'Artist {index % 300}'},
+            {'id': 9000 + index % 17, 'name': f'Guest {index % 17}'},
+        ],
+        'duration': 180000 + index % 120000,
+    }
+
+
+def writeFavorites(path: Path, songs: int, folders: int = 10) -> None:
+    per_folder = songs // folders
+    data = {
+        'schema_version': 2,
+        'folders': [
+            {
+                'folder_name': f'Folder {folder}',
+                'songs': [
+                    songObject(folder * per_folder + i) for i in range(per_folder)
+                ],
+            }
+            for folder in range(folders)
+        ],
+    }
+    path.write_text(json.dumps(data), encoding='utf-8')
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+from pyncm.utils import crypto  # noqa: E402
+
+DEFAULT_IDS = 1000
+DEFAULT_REPEAT = 5
+AES_KEY2 = '0123456789abcdef'
+
+
+def track_detail_params(count: int) -> str:
+    # the same payload getTrackDetail sends for ``count`` ids
+    return json.dumps(
+        {'c': json.dumps([{'id': str(29732235 + i)} for i in range(count)])}
+    )
+
+
+def best_of(repeat: int, func) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Time pyncm request encryption on every available AES backend.'
+    )
+    parser.add_argument('--ids', type=int, default=DEFAULT_IDS)
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    args = parser.parse_args()
+
+    params = track_detail_params(args.ids)
+    print(f'payload: {len(params)} bytes ({args.ids} ids), best of {args.repeat}')
+
+    previous = crypto.get_crypto_backend()
+    outputs: dict[str, tuple] = {}
+    try:
+        for name in crypto.CRYPTO_BACKENDS:
+            crypto.set_crypto_backend(name)
+            weapi = crypto._weapi_encrypt(params, AES_KEY2)
+            eapi = crypto._eapi_encrypt('/eapi/v3/song/detail', params)
+            cipher = bytes.fromhex(eapi['params'])
+            outputs[name] = (weapi, eapi, bytes(crypto._eapi_decrypt(cipher)))
+
+            timings = {
+                'weapi_encrypt': best_of(
+                    args.repeat, lambda: crypto._weapi_encrypt(params, AES_KEY2)
+                ),
+                'eapi_encrypt': best_of(
+                    args.repeat,
+                    lambda: crypto._eapi_encrypt('/eapi/v3/song/detail', params),
+                ),
+                'eapi_decrypt': best_of(
+                    args.repeat, lambda: crypto._eapi_decrypt(cipher)
+                ),
+            }
+            print(
+                f'{name:>14}: '
+                + '  '.join(f'{k}={v * 1000:.2f}ms' for k, v in timings.items())
+            )
+    finally:
+        crypto.set_crypto_backend(previous)
+
+    if len({repr(output) for output in outputs.values()}) > 1:
+        print('backends disagree on the encrypted output')
+        sys.exit(1)
+    if len(outputs) == 1:
+        print('pycryptodome is not installed, only the pure-Python backend was timed')
+
+
+if __name__ == '__main__':
+    main()
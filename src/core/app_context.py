@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+from collections import deque
 import logging
 import threading
-from typing import TYPE_CHECKING, Any, Callable, cast
+import time
+from typing import TYPE_CHECKING, Any, Callable, Hashable, cast
 
-from imports import QObject, Signal
+from core.metrics import LatencyHistogram, formatDuration
+from core.tracing import tracer
+from imports import QObject, QTimer, Signal
+from services.events.event_bus import event_bus
+from services.events.events import COLLECT_DEBUG_INFO, EMIT_DEBUG_INFO
 
 if TYPE_CHECKING:
     from core.audio_player import AudioPlayer
@@ -35,34 +41,155 @@ if TYPE_CHECKING:
     from views.library_page import LibraryPage
 
 
+# lanes of scheduled GUI work, most urgent first
+TASK_URGENT = 0
+TASK_NORMAL = 1
+TASK_IDLE = 2
+_TASK_LANES = ('urgent', 'normal', 'idle')
+
+# scheduled work allowed per event loop turn before yielding to Qt
+_FRAME_BUDGET = 8e-3
+
+
+class _ScheduledTask:
+    __slots__ = ('task', 'args', 'kwargs', 'key')
+
+    def __init__(
+        self,
+        task: Callable[..., Any],
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+        key: Hashable | None,
+    ) -> None:
+        self.task: Callable[..., Any] | None = task
+        self.args = args
+        self.kwargs = kwargs
+        self.key = key
+
+
 class _ScheduledTaskRunner(QObject):
+    """Runs scheduled tasks on the GUI thread, one lane at a time.
+
+    Each event loop turn runs tasks for at most ``_FRAME_BUDGET`` and then
+    yields, so a burst of work is spread over several frames. A task added
+    with a key replaces the pending task with the same key.
+    """
+
     scheduledTaskRequested = Signal()
 
     def __init__(self) -> None:
         super().__init__()
         self._logger = logging.getLogger(__name__)
-        self._scheduled_tasks: list[
-            tuple[Callable[..., Any], tuple[Any, ...], dict[str, Any]]
-        ] = []
+        self._lanes: list[deque[_ScheduledTask]] = [deque() for _ in _TASK_LANES]
+        self._keyed: dict[Hashable, tuple[int, _ScheduledTask]] = {}
         self._scheduled_tasks_lock = threading.Lock()
+        self._requested = False
+        self.task_times = LatencyHistogram()
+        self.longest_task = ''
+        self.longest_task_time = 0.0
+        self.depth_max = 0
+        self.coalesced = 0
+        self.yields = 0
         self.scheduledTaskRequested.connect(self._runScheduledTasks)
+        event_bus.subscribe(COLLECT_DEBUG_INFO, self.emitDebugInfo)
 
-    def addTask(self, task: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+    def addTask(
+        self,
+        task: Callable[..., Any],
+        args: tuple[Any, ...] = (),
+        kwargs: dict[str, Any] | None = None,
+        priority: int = TASK_NORMAL,
+        key: Hashable | None = None,
+    ) -> None:
+        entry = _ScheduledTask(task, args, kwargs or {}, key)
         with self._scheduled_tasks_lock:
-            self._scheduled_tasks.append((task, args, kwargs))
-        self.scheduledTaskRequested.emit()
+            if key is not None:
+                pending = self._keyed.get(key)
+                if pending is not None:
+                    self.coalesced += 1
+                    lane, old = pending
+                    if lane <= priority:
+                        old.task, old.args, old.kwargs = task, entry.args, entry.kwargs
+                        return
+                    # moves up to the more urgent lane
+                    old.task = None
+                self._keyed[key] = (priority, entry)
+            self._lanes[priority].append(entry)
+            self.depth_max = max(self.depth_max, self._depthLocked())
+            request = not self._requested
+            self._requested = True
+        if request:
+            self.scheduledTaskRequested.emit()
+
+    def _depthLocked(self) -> int:
+        return sum(len(lane) for lane in self._lanes)
+
+    def _takeLocked(self) -> _ScheduledTask | None:
+        for lane in self._lanes:
+            while lane:
+                entry = lane.popleft()
+                if entry.task is None:
+                    continue
+                if entry.key is not None:
+                    self._keyed.pop(entry.key, None)
+                return entry
+        return None
 
     def _runScheduledTasks(self) -> None:
+        deadline = time.perf_counter() + _FRAME_BUDGET
         while True:
             with self._scheduled_tasks_lock:
-                if not self._scheduled_tasks:
+                entry = self._takeLocked()
+                if entry is None:
+                    self._requested = False
                     return
-                task, args, kwargs = self._scheduled_tasks.pop(0)
+            task = cast('Callable[..., Any]', entry.task)
+            started = time.perf_counter_ns()
             try:
-                task(*args, **kwargs)
+                task(*entry.args, **entry.kwargs)
             except Exception as e:
                 self._logger.exception('scheduled task failed')
+                QTimer.singleShot(0, self._runScheduledTasks)
                 raise e
+            finally:
+                self._recordTask(task, started, time.perf_counter_ns() - started)
+            if time.perf_counter() >= deadline:
+                self.yields += 1
+                QTimer.singleShot(0, self._runScheduledTasks)
+                return
+
+    def _recordTask(
+        self, task: Callable[..., Any], started_ns: int, elapsed_ns: int
+    ) -> None:
+        elapsed = elapsed_ns / 1e9
+        self.task_times.record(elapsed)
+        if elapsed > self.longest_task_time:
+            self.longest_task_time = elapsed
+            self.longest_task = getattr(task, '__qualname__', repr(task))
+        if tracer.enabled:
+            tracer.record(
+                getattr(task, '__qualname__', 'scheduled task'),
+                'scheduled',
+                started_ns,
+                elapsed_ns,
+            )
+
+    def emitDebugInfo(self) -> None:
+        with self._scheduled_tasks_lock:
+            depths = [len(lane) for lane in self._lanes]
+        event_bus.emit(
+            EMIT_DEBUG_INFO,
+            'ScheduledTasks',
+            [
+                'depth=' + ' '.join(f'{n}:{d}' for n, d in zip(_TASK_LANES, depths)),
+                f'depth_max={self.depth_max}',
+                f'coalesced={self.coalesced}',
+                f'yields={self.yields}',
+                f'tasks: {self.task_times.summary()}',
+                f'longest={self.longest_task}'
+                f' ({formatDuration(self.longest_task_time)})',
+            ],
+        )
 
 
 class AppContext:
@@ -108,4 +235,18 @@ class AppContext:
         *args: Any,
         **kwargs: Any,
     ) -> None:
-        self._scheduled_task_runner.addTask(task, *args, **kwargs)
+        self._scheduled_task_runner.addTask(task, args, kwargs)
+
+    def scheduleTask(
+        self,
+        task: Callable[..., Any],
+        *args: Any,
+        priority: int = TASK_NORMAL,
+        key: Hashable | None = None,
+    ) -> None:
+        """Like ``addScheduledTask``, in the lane of ``priority``.
+
+        A pending task with the same ``key`` is replaced, so bulk updates
+        of one widget collapse into the latest.
+        """
+        self._scheduled_task_runner.addTask(task, args, None, priority, key)
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Future
+import logging
+import threading
+from typing import Any, Callable, Coroutine, TypeVar
+
+from services.events.event_bus import event_bus
+from services.events.events import (
+    COLLECT_DEBUG_INFO,
+    EMIT_DEBUG_INFO,
+    START_INTER_LOADING,
+    STOP_INTER_LOADING,
+)
+
+_logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class AsyncBridge:
+    """One background asyncio loop shared by all async API and cover requests."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self.submitted = 0
+        self.pending = 0
+        self.failed = 0
+
+        event_bus.subscribe(COLLECT_DEBUG_INFO, self.emitDebugInfo)
+
+    def submit(self, coro: Coroutine[Any, Any, T]) -> Future[T]:
+        future = asyncio.run_coroutine_threadsafe(coro, self._ensureLoop())
+        with self._lock:
+            self.submitted += 1
+            self.pending += 1
+        future.add_done_callback(self._onDone)
+        return future
+
+    def shutdown(self) -> None:
+        with self._lock:
+            loop = self._loop
+            self._loop = None
+            self._thread = None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+
+    def emitDebugInfo(self) -> None:
+        with self._lock:
+            running = self._loop is not None
+        event_bus.emit(
+            EMIT_DEBUG_INFO,
+            'AsyncBridge',
+            [
+                f'running={running}',
+                f'submitted={self.submitted}',
+                f'pending={self.pending}',
+                f'failed={self.failed}',
+            ],
+        )
+
+    def _ensureLoop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is not None:
+                return self._loop
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def _run() -> None:
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                try:
+                    loop.run_forever()
+                finally:
+                    loop.close()
+
+            self._loop = loop
+            self._thread = threading.Thread(
+                target=_run, daemon=True, name='southside-asyncio'
+            )
+            self._thread.start()
+        ready.wait()
+        return loop
+
+    def _onDone(self, future: Future) -> None:
+        with self._lock:
+            self.pending -= 1
+            if not future.cancelled() and future.exception() is not None:
+                self.failed += 1
+
+
+async_bridge = AsyncBridge()
+
+
+def runAsync(
+    coro: Coroutine[Any, Any, T],
+    parent,
+    finished: Callable[[T], None] | None = None,
+    failed: Callable[[BaseException], None] | None = None,
+) -> Future[T]:
+    """Run ``coro`` on the shared loop and call back on the GUI thread.
+
+    The asyncio counterpart of ``asyncTask``: errors are logged unless
+    ``failed`` is given.
+    """
+    event_bus.emit(START_INTER_LOADING)
+    future = async_bridge.submit(coro)
+
+    def _apply(done: Future[T]) -> None:
+        try:
+            if done.cancelled():
+                return
+            error = done.exception()
+            if error is not None:
+                if failed is not None:
+                    failed(error)
+                else:
+                    _logger.error('Async task failed', exc_info=error)
+                return
+            if finished is not None:
+                finished(done.result())
+        finally:
+            event_bus.emit(STOP_INTER_LOADING)
+
+    def _deliver(done: Future[T]) -> None:
+        ctx = getattr(parent, 'ctx', None)
+        if ctx is not None:
+            ctx.addScheduledTask(_apply, done)
+            return
+        add_scheduled = getattr(parent, 'addScheduledTask', None)
+        if add_scheduled is not None:
+            add_scheduled(_apply, done)
+            return
+        _apply(done)
+
+    future.add_done_callback(_deliver)
+    return future
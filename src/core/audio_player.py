@@ -33,6 +33,8 @@ from scipy.fft import rfft, rfftfreq
 from scipy.signal import resample_poly
 from imports import MessageBox
 from core.config import cfg
+from core.tracing import tracer
+from core.worker_pool import JobCancelled
 
 from pydub.utils import fsdecode, audioop, get_prober_name, mediainfo_json
 from pydub.exceptions import CouldntDecodeError
@@ -323,9 +325,16 @@ def decodeAudioWithSidecar(
     sidecar: Any | None = None,
     *,
     timeout: float = 90.0,
+    **call_options: Any,
 ) -> PatchedAudioSegment:
+    """Decode through ``sidecar`` when it can, else with ffmpeg in process.
+
+    ``call_options`` such as a worker pool priority or cancel token are passed
+    on to ``sidecar.call``. A cancelled job raises instead of falling back.
+    """
     if sidecar is None:
-        return PatchedAudioSegment.from_file(file)
+        with tracer.span('decodeAudio', 'audio', sidecar=False):
+            return PatchedAudioSegment.from_file(file)
 
     payload: dict[str, object]
     if isinstance(file, bytes):
@@ -337,14 +346,20 @@ def decodeAudioWithSidecar(
         payload = {'path': str(file)}
 
     try:
-        decoded = sidecar.call('decode_audio', payload, timeout=timeout)
+        with tracer.span('decodeAudio', 'audio', sidecar=True):
+            decoded = sidecar.call(
+                'decode_audio', payload, timeout=timeout, **call_options
+            )
+    except JobCancelled:
+        raise
     except Exception as e:
         logging.getLogger(__name__).debug('sidecar audio decode failed: %s', e)
         decoded = None
 
     if isinstance(decoded, bytes):
         return PatchedAudioSegment(decoded)
-    return PatchedAudioSegment.from_file(file)
+    with tracer.span('decodeAudio', 'audio', sidecar=False):
+        return PatchedAudioSegment.from_file(file)
 
 
 class AudioPlayer(QObject):
@@ -646,6 +661,23 @@ class AudioPlayer(QObject):
             self._growing_stream_mode = False
         return audio
 
+    def loadPartial(self, file_path: Path, audio: PatchedAudioSegment) -> None:
+        """Play the start of ``file_path`` until ``finishGrowingFile`` adds the rest."""
+        with self._lock:
+            self._stopProducer()
+            self.stop(clear_growing_file=False)
+            if self.stream:
+                self.stream.close()
+                self.stream = None
+
+            self._applyAudio(audio)
+            self._growing_file_path = file_path
+            self._growing_file_complete = False
+            self._growing_file_size = len(audio.raw_data)
+            self._growing_file_last_decode = time.perf_counter()
+            # nothing on disk to re-decode, like a stream fed by the caller
+            self._growing_stream_mode = True
+
     def loadGrowingStream(
         self,
         file_path: Path,
@@ -1397,6 +1429,7 @@ class AudioPlayer(QObject):
             )
         return result, src_frames
 
+    @tracer.traced('audio.callback', 'audio')
     def _audio_callback(self, outdata, frames, _time_info, _status):
         outdata[:] = 0
         try:
@@ -1627,6 +1660,7 @@ class AudioPlayer(QObject):
                 ) / self.sample_rate >= self._producer_target_lead:
                     break
 
+                block_started = time.perf_counter_ns() if tracer.enabled else 0
                 with self._lock:
                     if (
                         not self._producer_running
@@ -1666,6 +1700,13 @@ class AudioPlayer(QObject):
                     out = self._applyReverb(out)
 
                     next_index = min(start_idx + src_frames, len(self.samples))
+                if block_started:
+                    tracer.record(
+                        'producer.block',
+                        'audio',
+                        block_started,
+                        time.perf_counter_ns() - block_started,
+                    )
 
                 try:
                     self._audio_queue.put((out, src_frames), timeout=0)
@@ -1,12 +1,13 @@
+import atexit
 import base64
 from dataclasses import dataclass, field
 import json
 import logging
 import os
+import threading
+import time
 
-from typing import Any, Literal, cast
-
-import win32crypt
+from typing import Any, Callable, Literal, cast
 
 from core.models import SongStorable
 
@@ -79,6 +80,7 @@ class Config:
     setting_section_expanded: dict[str, bool] = field(default_factory=dict)
 
     download_concurrent_threads: int = 16
+    sidecar_workers: int = 0  # 0: one per CPU core
 
     llm_base_url: str = 'https://api.openai.com/v1'
     llm_api_key_encrypted: str = ''
@@ -90,11 +92,18 @@ class Config:
 
     def __init__(self) -> None:
         super().__init__()
-        self.setting_section_expanded = {}
-        self.llm_providers = []
+        self.__dict__['setting_section_expanded'] = {}
+        self.__dict__['llm_providers'] = []
         global _instance
         _instance = self
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        missing = name not in self.__dict__
+        old = self.__dict__.get(name)
+        super().__setattr__(name, value)
+        if missing or old is not value and old != value:
+            _onConfigChanged(name, value)
+
     @staticmethod
     def instance() -> 'Config':
         global _instance
@@ -107,13 +116,36 @@ cfg = Config.instance()
 
 _PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 CONFIG_PATH = os.path.join(_PROJECT_ROOT, 'config.json')
+SESSION_PATH = os.path.join(_PROJECT_ROOT, 'session.json')
 LEGACY_PICKLE_CONFIG_PATH = os.path.join(_PROJECT_ROOT, 'config.pkl')
 SECRET_PREFIX = 'win32crypt:'
 
+# playback state changes far more often than settings, so it lives in its own
+# small file and never forces a rewrite of config.json
+_SESSION_FIELDS = frozenset(
+    {'last_playlist', 'last_playing_index', 'last_playing_time'}
+)
+_SAVE_DELAY = 0.5
+
+ConfigListener = Callable[[str, Any], None]
+
+_listeners: list[ConfigListener] = []
+_listeners_lock = threading.Lock()
+_save_cond = threading.Condition()
+_dirty: set[str] = set()
+_save_deadline = 0.0
+_writer: threading.Thread | None = None
+_last_written: dict[str, str] = {}
+_write_lock = threading.Lock()
+_tracking = False
+
 
 def encryptSecret(value: str) -> str:
     if not value:
         return ''
+    # Windows only, so the modules importing cfg still load elsewhere
+    import win32crypt
+
     encrypted = win32crypt.CryptProtectData(
         value.encode('utf-8'),
         'SouthsideMusic',
@@ -129,6 +161,8 @@ def decryptSecret(value: str) -> str:
     if not value or not value.startswith(SECRET_PREFIX):
         return ''
     try:
+        import win32crypt
+
         encrypted = base64.b64decode(value[len(SECRET_PREFIX) :].encode('ascii'))
         _desc, data = win32crypt.CryptUnprotectData(
             encrypted,
@@ -154,16 +188,27 @@ def _song_from_object(data: Any) -> SongStorable | None:
 
 
 def _config_to_json_object() -> dict[str, Any]:
-    data = _instance.__dict__.copy()
-    data['last_playlist'] = [
-        song.toObject()
-        for song in (_instance.last_playlist or [])
-        if isinstance(song, SongStorable)
-    ]
+    data = {
+        key: value
+        for key, value in _instance.__dict__.copy().items()
+        if key not in _SESSION_FIELDS
+    }
     data.pop('last_playing_song', None)
     return data
 
 
+def _session_to_json_object() -> dict[str, Any]:
+    return {
+        'last_playlist': [
+            song.toObject()
+            for song in list(_instance.last_playlist or [])
+            if isinstance(song, SongStorable)
+        ],
+        'last_playing_index': _instance.last_playing_index,
+        'last_playing_time': _instance.last_playing_time,
+    }
+
+
 def _apply_config_json_object(data: dict[str, Any]) -> None:
     if data.get('language') not in ('en_US', 'zh_CN'):
         data.pop('language', None)
@@ -205,6 +250,20 @@ def _apply_config_json_object(data: dict[str, Any]) -> None:
     _migrate_legacy_llm_config()
 
 
+def _apply_session_json_object(data: dict[str, Any]) -> None:
+    playlist = data.get('last_playlist')
+    if isinstance(playlist, list):
+        _instance.__dict__['last_playlist'] = [
+            song for song in (_song_from_object(item) for item in playlist) if song
+        ]
+    index = data.get('last_playing_index')
+    if isinstance(index, int):
+        _instance.__dict__['last_playing_index'] = index
+    position = data.get('last_playing_time')
+    if isinstance(position, (int, float)):
+        _instance.__dict__['last_playing_time'] = float(position)
+
+
 def _normalize_llm_provider(data: Any) -> dict[str, Any] | None:
     if not isinstance(data, dict):
         return None
@@ -278,26 +337,148 @@ def _delete_legacy_pickle_config() -> None:
         _logger.exception(e)
 
 
-def loadConfig() -> None:
-    global cfg
-    if not os.path.exists(CONFIG_PATH):
-        saveConfig()
-    else:
-        with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+def subscribeConfig(listener: ConfigListener) -> None:
+    """Call ``listener(name, value)`` whenever a ``cfg`` attribute changes."""
+    with _listeners_lock:
+        if listener not in _listeners:
+            _listeners.append(listener)
+
+
+def unsubscribeConfig(listener: ConfigListener) -> None:
+    with _listeners_lock:
+        try:
+            _listeners.remove(listener)
+        except ValueError:
+            pass
+
+
+def _onConfigChanged(name: str, value: Any) -> None:
+    if not _tracking:
+        return
+    _scheduleSave('session' if name in _SESSION_FIELDS else 'config')
+    with _listeners_lock:
+        listeners = tuple(_listeners)
+    for listener in listeners:
+        try:
+            listener(name, value)
+        except Exception:
+            _logger.exception(f'config listener failed for {name}')
+
+
+def _scheduleSave(*docs: str) -> None:
+    global _save_deadline, _writer
+    with _save_cond:
+        _dirty.update(docs)
+        _save_deadline = time.monotonic() + _SAVE_DELAY
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(
+                target=_writerLoop, name='ConfigWriter', daemon=True
+            )
+            _writer.start()
+        _save_cond.notify()
+
 
-        if isinstance(data, dict):
-            _apply_config_json_object(data)
-            _logger.info(f'loaded config {len(_instance.__dict__)=}')
+def _writerLoop() -> None:
+    while True:
+        with _save_cond:
+            while not _dirty:
+                _save_cond.wait()
+            # debounce: keep pushing the write back while changes keep coming
+            while (remaining := _save_deadline - time.monotonic()) > 0:
+                _save_cond.wait(remaining)
+        _flushDirty()
+
+
+def _flushDirty() -> None:
+    with _write_lock:
+        with _save_cond:
+            docs = set(_dirty)
+            _dirty.clear()
+        for doc in docs:
+            _writeDoc(doc)
+
+
+def _writeDoc(doc: str) -> None:
+    try:
+        if doc == 'session':
+            _writeJsonAtomic(SESSION_PATH, _session_to_json_object(), None)
         else:
+            _writeJsonAtomic(CONFIG_PATH, _config_to_json_object(), 2)
+    except RuntimeError:
+        # the GUI thread mutated a container while it was being serialised
+        _scheduleSave(doc)
+    except Exception as e:
+        _logger.exception(e)
+
+
+def _writeJsonAtomic(path: str, data: dict[str, Any], indent: int | None) -> None:
+    text = json.dumps(
+        data,
+        ensure_ascii=False,
+        indent=indent,
+        separators=None if indent else (',', ':'),
+    )
+    if _last_written.get(path) == text:
+        return
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _last_written[path] = text
+    _logger.info(f'saved {os.path.basename(path)}')
+
+
+def _read_json_file(path: str) -> Any:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        _logger.warning(f'failed to read {os.path.basename(path)}: {e}')
+        return None
+
+
+def loadConfig() -> None:
+    global _tracking
+    _tracking = False
+    dirty = set()
+
+    data = _read_json_file(CONFIG_PATH)
+    if isinstance(data, dict):
+        if _SESSION_FIELDS & data.keys() or 'last_playing_song' in data:
+            # configs written before the split still carry the playlist
+            dirty.update(('config', 'session'))
+        _apply_config_json_object(data)
+        _logger.info(f'loaded config {len(_instance.__dict__)=}')
+    else:
+        if data is not None or os.path.exists(CONFIG_PATH):
             _logger.warning('invalid config.json, using defaults')
-            saveConfig()
+        dirty.add('config')
+
+    session = _read_json_file(SESSION_PATH)
+    if isinstance(session, dict):
+        _apply_session_json_object(session)
 
     _delete_legacy_pickle_config()
+    _tracking = True
+    if dirty:
+        _scheduleSave(*dirty)
 
 
 def saveConfig() -> None:
-    with open(CONFIG_PATH, 'w', encoding='utf-8') as f:
-        json.dump(_config_to_json_object(), f, ensure_ascii=False, indent=2)
+    """Schedule a debounced background write of the whole config."""
+    _scheduleSave('config', 'session')
+
+
+def flushConfig() -> None:
+    """Write pending config changes immediately, e.g. right before quitting."""
+    with _save_cond:
+        if not _dirty:
+            return
+    _flushDirty()
+
 
-        _logger.info('saved config')
+atexit.register(flushConfig)
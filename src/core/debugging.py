@@ -4,8 +4,10 @@ if TYPE_CHECKING:
     from core.app_context import AppContext
 from services.events import event_bus
 from imports import QObject, QTimer, QLabel
+from core.tracing import tracer
 from services.events.events import COLLECT_DEBUG_INFO, EMIT_DEBUG_INFO
 import logging
+import threading
 
 _logger = logging.getLogger(__name__)
 
@@ -30,10 +32,20 @@ class Debugging(QObject):
         if not self.collect_timer.isActive():
             self.collect_timer.start(20)
             self.ctx.debugging = True
+            event_bus.resetProfile()
+            event_bus.profiling = True
+            tracer.enable()
             self.collectInfo()
         else:
             self.collect_timer.stop()
             self.ctx.debugging = False
+            event_bus.profiling = False
+            tracer.disable()
+
+    def exportTrace(self):
+        threading.Thread(
+            target=tracer.export, daemon=True, name='southside-trace-export'
+        ).start()
 
     def onDebugInfo(self, name: str, info: list[str]):
         self.infos.append({name: info})
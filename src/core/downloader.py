@@ -1,11 +1,17 @@
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import bisect
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
 import logging
 import math
 import os
 
 import threading
+import time
 from typing import Callable, Dict, Optional
 from core.config import cfg
+from core.http_client import http_client
+from core.tracing import tracer
 
 from imports import (
     START_INTER_LOADING,
@@ -17,7 +23,24 @@ from imports import (
     Signal,
     event_bus,
 )
-import requests
+
+_logger = logging.getLogger(__name__)
+
+_INITIAL_SEGMENTS = 4
+_MIN_SEGMENT_SIZE = 256 * 1024
+_HEAD_SEGMENT_SIZE = 256 * 1024
+_SEGMENT_READ_SIZE = 65536
+_SCHEDULE_INTERVAL = 0.25
+_RATE_WARMUP = 1.0
+_SCALE_UP_RATIO = 0.8
+_SCALE_DOWN_RATIO = 0.5
+_MANIFEST_VERSION = 1
+_MANIFEST_SUFFIX = '.manifest'
+_MANIFEST_INTERVAL = 1.0
+_SLOW_GRACE = 3.0
+_SLOW_RATIO = 0.25
+_MAX_SEGMENT_FAILURES = 3
+_CLAIM_TIMEOUT = 30.0
 
 
 class DownloadingManager(QObject):
@@ -97,8 +120,9 @@ class _DownloadWorker:
         except Exception:
             return bytes()
 
+    @tracer.traced('download.probe', 'download')
     def _probe_download(self) -> tuple[int, bool]:
-        response = requests.head(
+        response = http_client.head(
             self.url,
             headers=self.headers,
             timeout=10,
@@ -109,8 +133,9 @@ class _DownloadWorker:
         accept_ranges = response.headers.get('accept-ranges', '').lower() == 'bytes'
         return total_length, accept_ranges
 
+    @tracer.traced('download.single', 'download')
     def _download_single(self, total_length: int) -> bytes:
-        response = requests.get(
+        response = http_client.get(
             self.url,
             headers=self.headers,
             data=self.data,
@@ -130,82 +155,641 @@ class _DownloadWorker:
 
             final_data.extend(chunk)
             downloaded += len(chunk)
+            http_client.recordBytes(len(chunk))
             if total_length > 0:
                 self.progress(downloaded / total_length)
 
         return bytes(final_data)
 
     def _download_chunks(self, total_length: int) -> bytes:
-        chunk_size = max(
-            self.min_chunk_size,
-            math.ceil(total_length / self.max_chunk_threads),
-        )
-        ranges: list[tuple[int, int]] = []
-        start = 0
-        while start < total_length:
-            end = min(start + chunk_size - 1, total_length - 1)
-            ranges.append((start, end))
-            start = end + 1
-
-        progress_by_chunk = [0] * len(ranges)
-        progress_lock = threading.Lock()
-
-        def on_chunk_progress(index: int, bytes_downloaded: int):
-            with progress_lock:
-                progress_by_chunk[index] = bytes_downloaded
-                downloaded = sum(progress_by_chunk)
-            self.progress(downloaded / total_length)
-
-        with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
-            futures = {
-                executor.submit(
-                    self._download_range,
-                    index,
-                    start,
-                    end,
-                    on_chunk_progress,
-                ): index
-                for index, (start, end) in enumerate(ranges)
-            }
-            results: list[bytes] = [b''] * len(ranges)
-            for future in as_completed(futures):
-                index = futures[future]
-                results[index] = future.result()
-
-        return b''.join(results)
-
-    def _download_range(
-        self,
-        index: int,
-        start: int,
-        end: int,
-        progress: Callable[[int, int], None],
-    ) -> bytes:
-        headers = self.headers.copy()
-        headers['Range'] = f'bytes={start}-{end}'
-        response = requests.get(
+        sink = _MemorySink(total_length)
+        SegmentedDownload(
             self.url,
-            headers=headers,
-            data=self.data,
-            stream=True,
-            timeout=30,
-        )
-        response.raise_for_status()
+            total_length,
+            sink,
+            self.headers,
+            self.data,
+            max_connections=self.max_chunk_threads,
+            progress=lambda downloaded: self.progress(downloaded / total_length),
+        ).run()
+        return bytes(sink.buffer)
 
-        chunk_data = bytearray()
-        for chunk in response.iter_content(chunk_size=8192):
-            if not chunk:
+
+class _MemorySink:
+    def __init__(self, size: int) -> None:
+        self.buffer = bytearray(size)
+
+    def open(self) -> '_MemorySink':
+        return self
+
+    def write(self, offset: int, data: bytes) -> None:
+        self.buffer[offset : offset + len(data)] = data
+
+    def close(self) -> None:
+        pass
+
+
+class FileSink:
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def open(self) -> '_FileWriter':
+        return _FileWriter(self.path)
+
+
+class _FileWriter:
+    def __init__(self, path: str) -> None:
+        self._file = open(path, 'r+b')
+
+    def write(self, offset: int, data: bytes) -> None:
+        self._file.seek(offset)
+        self._file.write(data)
+        # readers poll the contiguous watermark through their own handle
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _Segment:
+    __slots__ = (
+        'start',
+        'end',
+        'pos',
+        'written',
+        'failures',
+        'cancelled',
+        'started_at',
+        'received',
+        'paused',
+        'paused_at',
+    )
+
+    def __init__(self, start: int, end: int) -> None:
+        self.start = start
+        self.end = end
+        self.pos = start
+        self.written = start
+        self.failures = 0
+        self.cancelled = False
+        self.started_at = 0.0
+        self.received = 0
+        # time spent in the progress callback, which may throttle or pause
+        self.paused = 0.0
+        self.paused_at = 0.0
+
+    @property
+    def remaining(self) -> int:
+        return self.end - self.pos + 1
+
+    def rate(self, now: float) -> float:
+        elapsed = now - self.started_at - self.paused
+        if self.paused_at:
+            elapsed -= now - self.paused_at
+        return self.received / elapsed if elapsed > 0 else 0.0
+
+
+class DownloadManifest:
+    """Sidecar record of the byte ranges a partial download already holds."""
+
+    def __init__(self, path: str, identity: str, length: int, etag: str = '') -> None:
+        self.path = path
+        self.identity = identity
+        self.length = length
+        self.etag = etag
+        self.ranges: list[tuple[int, int]] = []
+
+    @classmethod
+    def load(
+        cls,
+        path: str,
+        identity: str,
+        length: int,
+        etag: str = '',
+    ) -> 'DownloadManifest':
+        """Return the stored manifest, or an empty one if it describes other content."""
+        manifest = cls(path, identity, length, etag)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return manifest
+        if (
+            not isinstance(data, dict)
+            or data.get('version') != _MANIFEST_VERSION
+            or data.get('identity') != identity
+            or data.get('length') != length
+            or (etag and data.get('etag') and data.get('etag') != etag)
+        ):
+            _logger.info(f'discarding stale download manifest {path}')
+            return manifest
+        try:
+            manifest.ranges = _mergeRanges(
+                (int(start), int(end))
+                for start, end in data.get('ranges', [])
+                if 0 <= int(start) < int(end) <= length
+            )
+        except (TypeError, ValueError):
+            manifest.ranges = []
+        return manifest
+
+    def completedBytes(self) -> int:
+        return sum(end - start for start, end in self.ranges)
+
+    def missingRanges(self, start_byte: int = 0) -> list[tuple[int, int]]:
+        """Inclusive ``(start, end)`` ranges still to be fetched."""
+        missing: list[tuple[int, int]] = []
+        cursor = start_byte
+        for start, end in self.ranges:
+            if end <= cursor:
                 continue
+            if start > cursor:
+                missing.append((cursor, start - 1))
+            cursor = max(cursor, end)
+        if cursor < self.length:
+            missing.append((cursor, self.length - 1))
+        return missing
+
+    def save(self, ranges: list[tuple[int, int]]) -> None:
+        self.ranges = _mergeRanges(ranges)
+        data = {
+            'version': _MANIFEST_VERSION,
+            'identity': self.identity,
+            'etag': self.etag,
+            'length': self.length,
+            'ranges': self.ranges,
+        }
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+
+    def delete(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            _logger.exception(f'failed to delete download manifest {self.path}')
+
+
+def resumableManifest(
+    dest_path: str,
+    identity: str,
+    length: int,
+    etag: str = '',
+) -> DownloadManifest:
+    """Load the manifest next to ``dest_path`` if the partial file still matches it."""
+    manifest = DownloadManifest.load(
+        dest_path + _MANIFEST_SUFFIX, identity, length, etag
+    )
+    try:
+        size = os.path.getsize(dest_path)
+    except OSError:
+        size = -1
+    if size != length:
+        manifest.ranges = []
+    return manifest
+
+
+def fileMd5(path: str) -> str:
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def discardPartialDownload(dest_path: str) -> None:
+    """Delete a partial download together with its manifest."""
+    for path in (dest_path, dest_path + _MANIFEST_SUFFIX):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class PartialDownloadClaim:
+    """Sole use of a partial download and its manifest until ``release``."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.cancel_requested = False
+        self._cancel: Callable[[], None] | None = None
+        self._lock = threading.Lock()
+
+    def onCancel(self, cancel: Callable[[], None]) -> None:
+        """Run ``cancel`` when another owner asks for the file, now if it did."""
+        with self._lock:
+            self._cancel = cancel
+            requested = self.cancel_requested
+        if requested:
+            cancel()
+
+    def requestCancel(self) -> None:
+        with self._lock:
+            self.cancel_requested = True
+            cancel = self._cancel
+        if cancel is not None:
+            cancel()
+
+    def release(self) -> None:
+        with _claims_cond:
+            if _claims.get(self.path) is self:
+                del _claims[self.path]
+                _claims_cond.notify_all()
+
+    def __enter__(self) -> 'PartialDownloadClaim':
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.release()
+
+
+_claims: dict[str, PartialDownloadClaim] = {}
+_claims_cond = threading.Condition()
+
+
+def claimPartialDownload(
+    dest_path: str,
+    *,
+    preempt: bool = True,
+    timeout: float = _CLAIM_TIMEOUT,
+) -> PartialDownloadClaim | None:
+    """Take ``dest_path`` and its manifest for writing, moving or deleting.
+
+    With ``preempt`` the current owner is asked to cancel and waited for
+    until it releases the file; otherwise None is returned while it is
+    owned. None also means the owner did not let go within ``timeout``.
+    """
+    key = os.path.normcase(os.path.abspath(dest_path))
+    deadline = time.monotonic() + timeout
+    while True:
+        with _claims_cond:
+            owner = _claims.get(key)
+            if owner is None:
+                claim = _claims[key] = PartialDownloadClaim(key)
+                return claim
+            if not preempt:
+                return None
+        # outside the registry lock: cancelling takes the owner's own locks
+        owner.requestCancel()
+        with _claims_cond:
+            released = _claims_cond.wait_for(
+                lambda: _claims.get(key) is not owner,
+                max(0.0, deadline - time.monotonic()),
+            )
+        if not released:
+            _logger.warning(f'{dest_path} is still in use after {timeout:.0f}s')
+            return None
+
+
+def _mergeRanges(ranges) -> list[tuple[int, int]]:
+    merged: list[tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _segmentStart(segment: _Segment) -> int:
+    return segment.start
+
+
+class SegmentedDownload:
+    """Work-stealing range download.
+
+    Starts with a few segments and, whenever a connection frees up, splits the
+    largest range still in flight. The number of connections grows while the
+    per-connection throughput holds up and shrinks when it collapses; segments
+    far slower than their peers are restarted on a fresh connection.
+
+    Pending work is always taken in file order, so the contiguous prefix that
+    ``waitContiguous`` reports advances as early as possible for progressive
+    playback. With ``sequential`` the first segment is kept small to bound the
+    time until the decoder gets its first bytes. Time a connection spends in
+    ``progress`` does not count against its rate, so a caller may throttle or
+    pause it there.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        total_length: int,
+        sink: _MemorySink | FileSink,
+        headers: Optional[Dict] = None,
+        data: Optional[Dict] = None,
+        start_byte: int = 0,
+        max_connections: int = 16,
+        progress: Optional[Callable[[int], None]] = None,
+        sequential: bool = False,
+        manifest: DownloadManifest | None = None,
+    ):
+        self.url = url
+        self.total_length = total_length
+        self.headers = headers.copy() if headers else {}
+        self.data = data
+        self.start_byte = start_byte
+        self.max_connections = max(1, max_connections)
+        self.sequential = sequential
+        self.manifest = manifest
+        self._sink = sink
+        self._progress = progress
+
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._written_cond = threading.Condition(self._lock)
+        self._segments: list[_Segment] = []
+        self._pending: list[_Segment] = []
+        self._active: set[_Segment] = set()
+        self._error: Exception | None = None
+        self._cancelled = False
+        self._done = False
+        self._watermark = start_byte
+        self._downloaded = 0
+        self._cap = 1
+        self._best_rate = 0.0
+        self._last_adjust = 0.0
+        self._last_manifest_save = 0.0
+
+        self.connections = 0
+        self.splits = 0
+        self.retries = 0
+
+    @tracer.traced('download.segmented', 'download')
+    def run(self) -> bool:
+        """Download everything; returns False if cancelled and raises on failure."""
+        if self.manifest is not None:
+            missing = self.manifest.missingRanges(self.start_byte)
+            for start, end in self.manifest.ranges:
+                start = max(start, self.start_byte)
+                if start < end:
+                    done = _Segment(start, end - 1)
+                    done.pos = done.written = end
+                    self._segments.append(done)
+        else:
+            missing = [(self.start_byte, self.total_length - 1)]
+        remaining = sum(end - start + 1 for start, end in missing)
+        if remaining <= 0:
+            self._finish()
+            return True
+
+        initial = max(
+            1,
+            min(
+                self.max_connections,
+                _INITIAL_SEGMENTS,
+                math.ceil(remaining / _MIN_SEGMENT_SIZE),
+            ),
+        )
+        for start, end in missing:
+            if self.sequential and not self._pending and initial > 1:
+                head_end = min(start + _HEAD_SEGMENT_SIZE - 1, end)
+                self._pending.append(_Segment(start, head_end))
+                start = head_end + 1
+                if start > end:
+                    continue
+            pieces = max(1, round(initial * (end - start + 1) / remaining))
+            size = math.ceil((end - start + 1) / pieces)
+            for segment_start in range(start, end + 1, size):
+                self._pending.append(
+                    _Segment(segment_start, min(segment_start + size - 1, end))
+                )
+        self._segments.extend(self._pending)
+        self._segments.sort(key=_segmentStart)
+        self._cap = min(self.max_connections, max(initial, len(self._pending)))
+        with self._lock:
+            self._updateWatermark()
+        started = time.perf_counter()
 
-            chunk_data.extend(chunk)
-            progress(index, len(chunk_data))
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_connections) as executor:
+                self._schedule(executor)
+        finally:
+            self._saveManifest()
+            self._finish()
+
+        if self._error is not None:
+            raise self._error
+        _logger.debug(
+            f'segmented download {remaining} bytes in '
+            f'{time.perf_counter() - started:.2f}s '
+            f'connections={self.connections} splits={self.splits} '
+            f'retries={self.retries} cancelled={self._cancelled}'
+        )
+        return not self._cancelled
 
-        expected = end - start + 1
-        if len(chunk_data) != expected:
-            raise ValueError(
-                f'Chunk size mismatch: expected {expected}, got {len(chunk_data)}'
+    def _saveManifest(self) -> None:
+        if self.manifest is None:
+            return
+        with self._lock:
+            ranges = [
+                (segment.start, segment.written)
+                for segment in self._segments
+                if segment.written > segment.start
+            ]
+        try:
+            self.manifest.save(ranges)
+        except OSError:
+            _logger.exception('failed to save download manifest')
+
+    def _finish(self) -> None:
+        with self._lock:
+            self._done = True
+            self._written_cond.notify_all()
+
+    def cancel(self) -> None:
+        with self._lock:
+            self._cancelled = True
+            for segment in self._active:
+                segment.cancelled = True
+            self._cond.notify_all()
+            self._written_cond.notify_all()
+
+    def waitContiguous(self, offset: int, timeout: float | None = None) -> int | None:
+        """Return the contiguous prefix end once it passes ``offset``.
+
+        None if the download stopped first.
+        """
+        with self._lock:
+            self._written_cond.wait_for(
+                lambda: (
+                    self._watermark > offset
+                    or self._done
+                    or self._cancelled
+                    or self._error is not None
+                ),
+                timeout,
             )
-        return bytes(chunk_data)
+            if self._watermark > offset:
+                return self._watermark
+            if self._done or self._cancelled or self._error is not None:
+                return None
+            return self._watermark
+
+    def _schedule(self, executor: ThreadPoolExecutor) -> None:
+        with self._cond:
+            while True:
+                if self._error is not None or self._cancelled:
+                    for segment in self._active:
+                        segment.cancelled = True
+                    return
+                if not self._pending and not self._active:
+                    return
+                now = time.perf_counter()
+                if now - self._last_manifest_save >= _MANIFEST_INTERVAL:
+                    self._last_manifest_save = now
+                    self._cond.release()
+                    try:
+                        self._saveManifest()
+                    finally:
+                        self._cond.acquire()
+                self._adjustCap(now)
+                self._cancelSlowSegments(now)
+                while len(self._active) < self._cap:
+                    segment = self._nextSegment()
+                    if segment is None:
+                        break
+                    segment.cancelled = False
+                    segment.started_at = now
+                    segment.received = 0
+                    segment.paused = 0.0
+                    self._active.add(segment)
+                    executor.submit(self._fetch, segment)
+                self._cond.wait(_SCHEDULE_INTERVAL)
+
+    def _nextSegment(self) -> _Segment | None:
+        if self._pending:
+            self._pending.sort(key=_segmentStart)
+            return self._pending.pop(0)
+        victim = max(self._active, key=lambda segment: segment.remaining, default=None)
+        if victim is None or victim.remaining < 2 * _MIN_SEGMENT_SIZE:
+            return None
+        middle = victim.pos + victim.remaining // 2
+        segment = _Segment(middle, victim.end)
+        victim.end = middle - 1
+        bisect.insort(self._segments, segment, key=_segmentStart)
+        self.splits += 1
+        return segment
+
+    def _updateWatermark(self) -> None:
+        watermark = self.total_length
+        index = bisect.bisect_right(self._segments, self._watermark, key=_segmentStart)
+        for segment in self._segments[max(0, index - 1) :]:
+            if segment.written <= segment.end:
+                watermark = segment.written
+                break
+        if watermark != self._watermark:
+            self._watermark = watermark
+            self._written_cond.notify_all()
+
+    def _adjustCap(self, now: float) -> None:
+        if now - self._last_adjust < _RATE_WARMUP:
+            return
+        rates = [
+            segment.rate(now)
+            for segment in self._active
+            if now - segment.started_at >= _RATE_WARMUP
+        ]
+        if not rates:
+            return
+        self._last_adjust = now
+        per_connection = sum(rates) / len(rates)
+        self._best_rate = max(self._best_rate, per_connection)
+        if per_connection >= self._best_rate * _SCALE_UP_RATIO:
+            self._cap = min(self.max_connections, self._cap + 1)
+        elif per_connection < self._best_rate * _SCALE_DOWN_RATIO:
+            self._cap = max(1, self._cap - 1)
+
+    def _cancelSlowSegments(self, now: float) -> None:
+        if len(self._active) < 2:
+            return
+        rates = sorted(segment.rate(now) for segment in self._active)
+        median = rates[len(rates) // 2]
+        for segment in self._active:
+            if (
+                not segment.cancelled
+                and now - segment.started_at > _SLOW_GRACE
+                and segment.rate(now) < median * _SLOW_RATIO
+            ):
+                segment.cancelled = True
+
+    def _fetch(self, segment: _Segment) -> None:
+        failure: Exception | None = None
+        try:
+            self._fetchRange(segment)
+        except Exception as e:
+            failure = e
+
+        with self._cond:
+            self._active.discard(segment)
+            # bytes reserved but never written have to be fetched again
+            segment.pos = segment.written
+            if segment.remaining > 0 and self._error is None and not self._cancelled:
+                if failure is not None or not segment.cancelled:
+                    segment.failures += 1
+                if segment.failures > _MAX_SEGMENT_FAILURES:
+                    self._error = failure or ValueError(
+                        f'range {segment.pos}-{segment.end} ended early'
+                    )
+                else:
+                    self.retries += 1
+                    self._pending.insert(0, segment)
+            self._cond.notify()
+
+    @tracer.traced('download.range', 'download')
+    def _fetchRange(self, segment: _Segment) -> None:
+        headers = self.headers.copy()
+        headers['Range'] = f'bytes={segment.pos}-{segment.end}'
+        writer = self._sink.open()
+        try:
+            with http_client.get(
+                self.url,
+                headers=headers,
+                data=self.data,
+                stream=True,
+                timeout=30,
+            ) as response:
+                response.raise_for_status()
+                if response.status_code != 206:
+                    raise ValueError('server ignored the range request')
+                with self._lock:
+                    self.connections += 1
+                for chunk in response.iter_content(chunk_size=_SEGMENT_READ_SIZE):
+                    if not chunk:
+                        continue
+                    with self._lock:
+                        if segment.cancelled or self._error is not None:
+                            return
+                        offset = segment.pos
+                        chunk = chunk[: segment.end - offset + 1]
+                        segment.pos += len(chunk)
+                        segment.received += len(chunk)
+                        self._downloaded += len(chunk)
+                        downloaded = self._downloaded
+                        done = segment.pos > segment.end
+                    writer.write(offset, chunk)
+                    with self._lock:
+                        segment.written = offset + len(chunk)
+                        self._updateWatermark()
+                    http_client.recordBytes(len(chunk))
+                    if self._progress:
+                        with self._lock:
+                            segment.paused_at = time.perf_counter()
+                        try:
+                            self._progress(downloaded)
+                        finally:
+                            with self._lock:
+                                segment.paused += (
+                                    time.perf_counter() - segment.paused_at
+                                )
+                                segment.paused_at = 0.0
+                    if done:
+                        return
+        finally:
+            writer.close()
 
 
 class TaskManager(QObject):
@@ -286,144 +870,3 @@ def asyncTask(
     manager.taskFinished.connect(__finish)
     manager.start()
     return manager
-
-
-_stream_logger = logging.getLogger(__name__)
-
-_MIN_STREAM_CHUNK = 4096
-
-
-def downloadStream(
-    url: str,
-    dest_path: str,
-    on_progress: Callable[[int, int], None] | None = None,
-    start_byte: int = 0,
-    headers: Optional[Dict] = None,
-    data: Optional[Dict] = None,
-) -> tuple[bool, int]:
-    request_headers = headers.copy() if headers else {}
-
-    try:
-        probe = requests.head(
-            url,
-            headers=request_headers,
-            timeout=10,
-            allow_redirects=True,
-        )
-        probe.raise_for_status()
-        total_length = int(probe.headers.get('content-length', 0))
-        accept_ranges = probe.headers.get('accept-ranges', '').lower() == 'bytes'
-
-        if total_length <= 0 or not accept_ranges:
-            return _download_stream_single(
-                url, dest_path, on_progress, start_byte, request_headers, data
-            )
-
-        remaining = total_length - start_byte
-        if remaining <= 0:
-            return True, total_length
-
-        num_threads = min(
-            int(cfg.download_concurrent_threads),
-            max(1, math.ceil(remaining / _MIN_STREAM_CHUNK)),
-        )
-        chunk_size = math.ceil(remaining / num_threads)
-        ranges: list[tuple[int, int]] = []
-        for i in range(num_threads):
-            chunk_start = start_byte + i * chunk_size
-            chunk_end = min(chunk_start + chunk_size - 1, total_length - 1)
-            if chunk_start <= chunk_end:
-                ranges.append((chunk_start, chunk_end))
-
-        if not os.path.exists(dest_path):
-            with open(dest_path, 'wb') as f:
-                f.truncate(total_length)
-        else:
-            with open(dest_path, 'r+b') as f:
-                f.truncate(total_length)
-
-        progress_by_chunk = [0] * len(ranges)
-        progress_lock = threading.Lock()
-        errors: list[Exception] = []
-
-        def _dl_range(index: int, start: int, end: int) -> None:
-            try:
-                hdrs = request_headers.copy()
-                hdrs['Range'] = f'bytes={start}-{end}'
-                resp = requests.get(
-                    url, headers=hdrs, data=data, stream=True, timeout=30
-                )
-                resp.raise_for_status()
-                with open(dest_path, 'r+b') as f:
-                    f.seek(start)
-                    written = 0
-                    for chunk in resp.iter_content(chunk_size=65536):
-                        if not chunk:
-                            continue
-                        f.write(chunk)
-                        written += len(chunk)
-                        with progress_lock:
-                            progress_by_chunk[index] = written
-                            if on_progress:
-                                on_progress(
-                                    start_byte + sum(progress_by_chunk),
-                                    total_length,
-                                )
-            except Exception as e:
-                errors.append(e)
-
-        with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
-            futures = [
-                executor.submit(_dl_range, i, s, e) for i, (s, e) in enumerate(ranges)
-            ]
-            for f in futures:
-                f.result()
-
-        if errors:
-            raise errors[0]
-
-        return True, total_length
-    except Exception:
-        _stream_logger.exception('stream download failed')
-        return False, 0
-
-
-def _download_stream_single(
-    url: str,
-    dest_path: str,
-    on_progress: Callable[[int, int], None] | None,
-    start_byte: int,
-    request_headers: Dict,
-    data: Optional[Dict],
-) -> tuple[bool, int]:
-    if start_byte > 0:
-        request_headers = request_headers.copy()
-        request_headers['Range'] = f'bytes={start_byte}-'
-
-    downloaded = start_byte
-    total_length = 0
-
-    response = requests.get(
-        url,
-        headers=request_headers,
-        data=data,
-        stream=True,
-        timeout=30,
-    )
-    response.raise_for_status()
-
-    content_length = response.headers.get('content-length')
-    if content_length:
-        total_length = int(content_length) + start_byte
-
-    mode = 'ab' if start_byte > 0 else 'wb'
-    with open(dest_path, mode) as f:
-        for chunk in response.iter_content(chunk_size=65536):
-            if not chunk:
-                continue
-            f.write(chunk)
-            f.flush()
-            downloaded += len(chunk)
-            if on_progress:
-                on_progress(downloaded, total_length)
-    return True, total_length
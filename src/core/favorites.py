@@ -5,8 +5,7 @@ import shutil
 import stat
 import threading
 
-import requests
-
+from core.http_client import http_client
 from core.models import (
     DATA_DIR,
     LocalFolderInfo,
@@ -17,6 +16,7 @@ from core.models import (
     LYRIC_DATA_DIR,
     MUSIC_DATA_DIR,
     SongStorable,
+    prefillSongDetails,
 )
 from imports import IMAGE_ASSET_PERSISTED, event_bus
 from qfluentwidgets import MessageBoxBase, SubtitleLabel
@@ -27,6 +27,8 @@ _logger = logging.getLogger(__name__)
 
 _PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 _FAVORITES_PATH = os.path.join(_PROJECT_ROOT, 'favorites.json')
+# Bumped whenever stored song objects need a one-off migration pass on load.
+_FAVORITES_SCHEMA_VERSION = 2
 _image_download_locks: dict[str, threading.Lock] = {}
 
 
@@ -43,23 +45,15 @@ class FavoritesManager:
 
     def load(self) -> None:
         _ensure_dirs()
-        raw = _restore_old_format()
+        raw = _read_favorites()
 
-        folders: list[LocalFolderInfo] = []
-        for folder in raw:
-            songs: list[SongStorable] = []
-            for song_obj in folder.get('songs', []):
-                try:
-                    storable = SongStorable.fromObject(song_obj)
-                except Exception:
-                    _logger.exception(
-                        "Failed to restore song in folder '%s'", folder['folder_name']
-                    )
-                    continue
-                songs.append(storable)
-            folders.append(
-                LocalFolderInfo(folder_name=folder['folder_name'], songs=songs)
+        folders = [
+            LocalFolderInfo(
+                folder_name=folder['folder_name'],
+                song_objects=list(folder.get('songs', [])),
             )
+            for folder in raw
+        ]
 
         with self._lock:
             self.folders.clear()
@@ -71,8 +65,9 @@ class FavoritesManager:
         with self._lock:
             data: list[dict] = []
             for folder in self.folders:
-                songs = [song.toObject() for song in folder.songs]
-                data.append({'folder_name': folder.folder_name, 'songs': songs})
+                data.append(
+                    {'folder_name': folder.folder_name, 'songs': folder.toObjects()}
+                )
             _write_raw(data)
 
     def addFolder(self, folder_name: str) -> LocalFolderInfo:
@@ -111,10 +106,13 @@ class FavoritesManager:
         return False
 
     def ensureFolderFirstImage(self, folder: LocalFolderInfo) -> None:
-        if not folder.songs:
+        first_image_hash = folder.first_image_hash
+        if first_image_hash and os.path.exists(
+            os.path.join(IMAGE_DATA_DIR, first_image_hash)
+        ):
             return
-        storable = folder.songs[0]
-        if storable.imageCached():
+        storable = folder.songAt(0)
+        if storable is None or storable.imageCached():
             return
 
         thread = threading.Thread(
@@ -138,7 +136,7 @@ class FavoritesManager:
                 from core.backend import getBackend
 
                 detail = getBackend().getTrackDetail(storable.id)
-                image_bytes = requests.get(detail.cover_url).content
+                image_bytes = http_client.fetch(detail.cover_url)
             except Exception:
                 _logger.exception(
                     "Failed to auto-download first image for folder '%s'",
@@ -158,6 +156,10 @@ class FavoritesManager:
         with self._lock:
             changed = False
             for f in self.folders:
+                if not f.loaded and not any(
+                    obj.get('name') == song_name for obj in f.toObjects()
+                ):
+                    continue
                 before = len(f.songs)
                 f.songs = [s for s in f.songs if s.name != song_name]
                 if len(f.songs) < before:
@@ -229,7 +231,7 @@ def _ensure_dirs() -> None:
     os.makedirs(LYRIC_DATA_DIR, exist_ok=True)
 
 
-def _restore_old_format() -> list[dict]:
+def _migrate_legacy_cache_dirs() -> None:
     if os.path.exists(LEGACY_MUSIC_CACHE_DIR):
         for item in os.listdir(LEGACY_MUSIC_CACHE_DIR):
             src = os.path.join(LEGACY_MUSIC_CACHE_DIR, item)
@@ -257,29 +259,45 @@ def _restore_old_format() -> list[dict]:
         if os.path.isdir(LEGACY_CACHE_DIR):
             os.rmdir(LEGACY_CACHE_DIR)
 
+
+def _read_favorites() -> list[dict]:
+    _migrate_legacy_cache_dirs()
+
     if not os.path.exists(_FAVORITES_PATH):
         return []
 
     with open(_FAVORITES_PATH, 'r', encoding='utf-8') as f:
         data = json.load(f)
 
-    data_dirty = False
+    if (
+        isinstance(data, dict)
+        and data.get('schema_version') == _FAVORITES_SCHEMA_VERSION
+    ):
+        return list(data.get('folders', []))
+
+    folders = data.get('folders', []) if isinstance(data, dict) else data
+    normalized = _restore_old_format(folders)
+    _write_raw(normalized)
+    return normalized
+
+
+def _restore_old_format(data: list[dict]) -> list[dict]:
     normalized: list[dict] = []
 
     for folder in data:
         songs: list[dict] = []
+        prefillSongDetails(folder.get('songs', []))
         for song_obj in folder.get('songs', []):
-            storable = SongStorable.fromObject(song_obj)
-            had_embedded = bool(
-                song_obj.get('image_base64') or song_obj.get('content_base64')
-            )
+            try:
+                storable = SongStorable.fromObject(song_obj)
+            except Exception:
+                _logger.exception(
+                    "Failed to restore song in folder '%s'", folder['folder_name']
+                )
+                continue
             songs.append(storable.toObject())  # type: ignore
-            data_dirty = data_dirty or had_embedded
         normalized.append({'folder_name': folder['folder_name'], 'songs': songs})
 
-    if data_dirty:
-        _write_raw(normalized)
-
     return normalized
 
 
@@ -287,7 +305,12 @@ def _write_raw(data: list[dict]) -> None:
     if os.path.exists(_FAVORITES_PATH):
         os.chmod(_FAVORITES_PATH, stat.S_IWRITE)
     with open(_FAVORITES_PATH, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
+        json.dump(
+            {'schema_version': _FAVORITES_SCHEMA_VERSION, 'folders': data},
+            f,
+            ensure_ascii=False,
+            indent=4,
+        )
 
 
 class FavoriteSelectionDialog(MessageBoxBase):
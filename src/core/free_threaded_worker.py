@@ -5,6 +5,7 @@ from collections.abc import Callable
 from concurrent.futures import ThreadPoolExecutor
 import io
 import logging
+from multiprocessing import shared_memory
 import os
 from pathlib import Path
 import pickle
@@ -12,12 +13,22 @@ import struct
 import subprocess
 import sys
 import threading
+import time
 from typing import Any
 
 
 _B64_BYTES_KEY = '__southside_b64_bytes__'
 _FLOAT_ARRAY_KEY = '__southside_float_array__'
+_SHM_KEY = '__southside_shm__'
 _MAIN_THREAD_OPS = {'loudness_gain'}
+# bytes at least this large cross the pipe as a shared memory handle
+_SHM_MIN_BYTES = 256 * 1024
+_SHM_MIN_SEGMENT = 1024 * 1024
+# idle segments kept for reuse; a decoded song fills one of up to 64 MiB
+_SHM_POOL_MAX_IDLE = 2
+_SHM_POOL_MAX_BYTES = 128 * 1024 * 1024
+# idle segments unused this long go back to the system
+_SHM_POOL_IDLE_SECONDS = 30.0
 _ORIGINAL_POPEN = subprocess.Popen
 
 
@@ -43,6 +54,20 @@ def json_float_array(
     }
 
 
+def json_base64_bytes_data(value: Any) -> bytes | None:
+    """Return the bytes wrapped by ``json_base64_bytes``, if ``value`` is one."""
+    if isinstance(value, dict) and isinstance(value.get(_B64_BYTES_KEY), bytes):
+        return value[_B64_BYTES_KEY]
+    return None
+
+
+def json_float_array_spec(value: Any) -> dict[str, object] | None:
+    """Return the spec wrapped by ``json_float_array``, if ``value`` is one."""
+    if isinstance(value, dict) and isinstance(value.get(_FLOAT_ARRAY_KEY), dict):
+        return value[_FLOAT_ARRAY_KEY]
+    return None
+
+
 def _readFrame(stream) -> Any | None:
     header = stream.read(4)
     if not header:
@@ -63,6 +88,139 @@ def _writeFrame(stream, payload: Any) -> None:
     stream.flush()
 
 
+def _attachSegment(name: str) -> shared_memory.SharedMemory:
+    try:
+        # the creating process owns the segment, so keep this process's
+        # resource tracker from unlinking it on exit
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+def _destroySegment(segment: shared_memory.SharedMemory) -> None:
+    try:
+        segment.close()
+        segment.unlink()
+    except (BufferError, OSError):
+        pass
+
+
+def _isSegmentHandle(value: Any) -> bool:
+    return isinstance(value, dict) and _SHM_KEY in value
+
+
+def _readSegment(handle: dict[str, Any]) -> bytes:
+    spec = handle[_SHM_KEY]
+    segment = _attachSegment(str(spec['name']))
+    try:
+        return bytes(segment.buf[: int(spec['size'])])
+    finally:
+        segment.close()
+
+
+class _SegmentPool:
+    """Shared memory segments created by this process, kept for reuse.
+
+    At most ``max_idle`` segments stay idle, and each is destroyed once it has
+    gone unused for ``idle_seconds``.
+    """
+
+    def __init__(
+        self,
+        max_idle_bytes: int = _SHM_POOL_MAX_BYTES,
+        max_idle: int = _SHM_POOL_MAX_IDLE,
+        idle_seconds: float = _SHM_POOL_IDLE_SECONDS,
+    ) -> None:
+        self._lock = threading.Lock()
+        # with the time each went idle, oldest first
+        self._idle: list[tuple[shared_memory.SharedMemory, float]] = []
+        self._idle_bytes = 0
+        self._max_idle_bytes = max_idle_bytes
+        self._max_idle = max_idle
+        self._idle_seconds = idle_seconds
+        self._timer: threading.Timer | None = None
+
+    def share(
+        self, data: bytes
+    ) -> tuple[shared_memory.SharedMemory, dict[str, dict[str, object]]]:
+        """Copy ``data`` into a segment and return it with its pipe handle."""
+        segment = self._acquire(len(data))
+        try:
+            segment.buf[: len(data)] = data
+        except BaseException:
+            self.release(segment)
+            raise
+        return segment, {_SHM_KEY: {'name': segment.name, 'size': len(data)}}
+
+    def release(self, segment: shared_memory.SharedMemory) -> None:
+        evicted: list[shared_memory.SharedMemory] = []
+        with self._lock:
+            if segment.size > self._max_idle_bytes or self._max_idle <= 0:
+                evicted.append(segment)
+            else:
+                self._idle.append((segment, time.monotonic()))
+                self._idle_bytes += segment.size
+                # the oldest make room for the one just released
+                while (
+                    len(self._idle) > self._max_idle
+                    or self._idle_bytes > self._max_idle_bytes
+                ):
+                    evicted.append(self._popIdleLocked(0))
+                self._scheduleTrimLocked()
+        for old in evicted:
+            _destroySegment(old)
+
+    def trim(self) -> None:
+        """Destroy the segments idle for longer than ``idle_seconds``."""
+        cutoff = time.monotonic() - self._idle_seconds
+        expired: list[shared_memory.SharedMemory] = []
+        with self._lock:
+            self._timer = None
+            while self._idle and self._idle[0][1] <= cutoff:
+                expired.append(self._popIdleLocked(0))
+            self._scheduleTrimLocked()
+        for segment in expired:
+            _destroySegment(segment)
+
+    def close(self) -> None:
+        with self._lock:
+            idle = [segment for segment, _ in self._idle]
+            self._idle = []
+            self._idle_bytes = 0
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        for segment in idle:
+            _destroySegment(segment)
+
+    def _popIdleLocked(self, index: int) -> shared_memory.SharedMemory:
+        segment, _ = self._idle.pop(index)
+        self._idle_bytes -= segment.size
+        return segment
+
+    def _scheduleTrimLocked(self) -> None:
+        if self._timer is not None or not self._idle:
+            return
+        delay = self._idle[0][1] + self._idle_seconds - time.monotonic()
+        self._timer = threading.Timer(max(0.0, delay), self.trim)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _acquire(self, size: int) -> shared_memory.SharedMemory:
+        with self._lock:
+            best: int | None = None
+            for index, (segment, _) in enumerate(self._idle):
+                if segment.size >= size and (
+                    best is None or segment.size < self._idle[best][0].size
+                ):
+                    best = index
+            if best is not None:
+                return self._popIdleLocked(best)
+        # power-of-two capacities let songs of similar length share segments
+        capacity = max(_SHM_MIN_SEGMENT, 1 << (size - 1).bit_length())
+        return shared_memory.SharedMemory(create=True, size=capacity)
+
+
 def _floatUnpackFormat(dtype: str) -> str | None:
     dtype = dtype.lower()
     if dtype in {'float32', 'single', 'f4', '<f4', '|f4'}:
@@ -262,6 +420,11 @@ def _decodeAudio(payload: dict[str, Any]) -> bytes:
 def _handleWorkerRequest(request: dict[str, Any]) -> Any:
     op = request.get('op')
     payload = request.get('payload', {})
+    if isinstance(payload, dict):
+        payload = {
+            key: _readSegment(value) if _isSegmentHandle(value) else value
+            for key, value in payload.items()
+        }
     if op == 'json_dumps':
         return dumpJsonPayload(payload)
 
@@ -299,46 +462,87 @@ def _workerMain() -> int:
             pass
 
     stdout_lock = threading.Lock()
+    pool = _SegmentPool()
+    lent: dict[str, shared_memory.SharedMemory] = {}
+    lent_lock = threading.Lock()
 
     def _sendResponse(response: dict[str, Any]) -> None:
         with stdout_lock:
             _writeFrame(sys.stdout.buffer, response)
 
+    def _sendResult(request_id: int, msg: Any) -> None:
+        if isinstance(msg, bytes) and len(msg) >= _SHM_MIN_BYTES:
+            try:
+                segment, handle = pool.share(msg)
+            except OSError:
+                pass
+            else:
+                # stays lent until the parent has copied it out
+                with lent_lock:
+                    lent[segment.name] = segment
+                msg = handle
+        _sendResponse({'id': request_id, 'ok': True, 'msg': msg})
+
     def _done(request_id: int, future) -> None:
         try:
             msg = future.result()
-            _sendResponse({'id': request_id, 'ok': True, 'msg': msg})
         except Exception as e:
             _sendResponse({'id': request_id, 'ok': False, 'error': repr(e)})
-
-    with ThreadPoolExecutor(
-        max_workers=max_workers,
-        thread_name_prefix='southside-ft-json',
-    ) as executor:
-        while True:
-            request = _readFrame(sys.stdin.buffer)
-            if request is None:
-                return 0
-            if not isinstance(request, dict):
-                continue
-            if request.get('op') == 'shutdown':
-                return 0
-
-            request_id = int(request.get('id', 0))
-            if request.get('op') in _MAIN_THREAD_OPS:
-                try:
-                    msg = _handleWorkerRequest(request)
-                    _sendResponse({'id': request_id, 'ok': True, 'msg': msg})
-                except Exception as e:
-                    _sendResponse({'id': request_id, 'ok': False, 'error': repr(e)})
-                continue
-
-            future = executor.submit(_handleWorkerRequest, request)
-            future.add_done_callback(lambda fut, rid=request_id: _done(rid, fut))
+            return
+        _sendResult(request_id, msg)
+
+    try:
+        with ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='southside-ft-json',
+        ) as executor:
+            while True:
+                request = _readFrame(sys.stdin.buffer)
+                if request is None:
+                    return 0
+                if not isinstance(request, dict):
+                    continue
+                if request.get('op') == 'shutdown':
+                    return 0
+                if request.get('op') == 'release_segment':
+                    with lent_lock:
+                        segment = lent.pop(str(request.get('name', '')), None)
+                    if segment is not None:
+                        pool.release(segment)
+                    continue
+
+                request_id = int(request.get('id', 0))
+                if request.get('op') in _MAIN_THREAD_OPS:
+                    try:
+                        msg = _handleWorkerRequest(request)
+                    except Exception as e:
+                        _sendResponse({'id': request_id, 'ok': False, 'error': repr(e)})
+                        continue
+                    _sendResult(request_id, msg)
+                    continue
+
+                future = executor.submit(_handleWorkerRequest, request)
+                future.add_done_callback(lambda fut, rid=request_id: _done(rid, fut))
+    finally:
+        pool.close()
+        with lent_lock:
+            for segment in lent.values():
+                _destroySegment(segment)
+            lent.clear()
+
+
+# shared by every sender, so idle segments are bounded per process, not per
+# sidecar
+_sender_pool = _SegmentPool()
 
 
 class FreeThreadedJsonSender:
-    """Send JSON packing work to a Python free-threaded sidecar process."""
+    """Send JSON packing work to a Python free-threaded sidecar process.
+
+    Large ``bytes`` values at the top level of a payload, and large ``bytes``
+    results, are passed through pooled shared memory segments so only a
+    handle goes over the pipe. Every sender in this process shares one pool.
+    """
 
     def __init__(
         self,
@@ -350,6 +554,11 @@ class FreeThreadedJsonSender:
         self._max_workers = max_workers or max(2, os.cpu_count() or 2)
         self._lock = threading.Lock()
         self._callbacks: dict[int, Callable[[Any | None], None]] = {}
+        self._unwanted: set[int] = set()
+        # callbacks of a stopped process, run with None outside the lock
+        self._stopped_callbacks: list[Callable[[Any | None], None]] = []
+        self._lent: dict[int, list[shared_memory.SharedMemory]] = {}
+        self._pool = _sender_pool
         self._next_id = 0
         self._process: subprocess.Popen | None = None
         self._reader_thread: threading.Thread | None = None
@@ -392,28 +601,50 @@ class FreeThreadedJsonSender:
         if request_id is None:
             return None
         if not done.wait(timeout):
-            with self._lock:
-                self._callbacks.pop(request_id, None)
+            self.discard(request_id)
             self._logger.warning('free-threaded worker request timed out')
             return None
         return result[0] if result else None
 
+    def submitCall(
+        self,
+        op: str,
+        payload: dict[str, object],
+        callback: Callable[[Any | None], None],
+    ) -> int | None:
+        """Queue ``op`` without waiting; ``callback`` gets None on failure."""
+        return self._submitRequest(op, payload, callback)
+
+    def discard(self, request_id: int) -> None:
+        """Drop the result of a request that is no longer wanted.
+
+        Its callback still runs, with None, once the worker answers or stops.
+        """
+        with self._lock:
+            if request_id in self._callbacks:
+                self._unwanted.add(request_id)
+
     def _submitRequest(
         self,
         op: str,
         payload: dict[str, object],
         callback: Callable[[Any | None], None],
     ) -> int | None:
+        payload, segments = self._sharePayload(payload)
         with self._lock:
-            if self._shutdown:
-                return None
-            process = self._ensureProcessLocked()
+            process = None if self._shutdown else self._ensureProcessLocked()
             if process is None or process.stdin is None:
+                for segment in segments:
+                    self._pool.release(segment)
                 return None
 
             self._next_id += 1
             request_id = self._next_id
             self._callbacks[request_id] = callback
+            if segments:
+                # the worker may still read these after a timeout, so they
+                # go back to the pool only once its response arrives
+                self._lent[request_id] = segments
             try:
                 _writeFrame(
                     process.stdin,
@@ -427,10 +658,54 @@ class FreeThreadedJsonSender:
                 self._callbacks.pop(request_id, None)
                 self._logger.warning('free-threaded worker submit failed: %s', e)
                 self._stopProcessLocked()
-                return None
+                request_id = None
 
+        if request_id is None:
+            self._runStoppedCallbacks()
         return request_id
 
+    def _runStoppedCallbacks(self) -> None:
+        # a callback may submit again, so none of them runs under the lock
+        with self._lock:
+            callbacks = self._stopped_callbacks
+            self._stopped_callbacks = []
+        for callback in callbacks:
+            callback(None)
+
+    def _sharePayload(
+        self, payload: dict[str, object]
+    ) -> tuple[dict[str, object], list[shared_memory.SharedMemory]]:
+        if not isinstance(payload, dict):
+            return payload, []
+        shared: dict[str, object] = {}
+        segments: list[shared_memory.SharedMemory] = []
+        for key, value in payload.items():
+            if isinstance(value, bytes) and len(value) >= _SHM_MIN_BYTES:
+                try:
+                    segment, value = self._pool.share(value)
+                except OSError as e:
+                    self._logger.debug('shared memory unavailable: %s', e)
+                else:
+                    segments.append(segment)
+            shared[key] = value
+        return shared, segments
+
+    def _takeResult(self, process: subprocess.Popen, msg: Any, wanted: bool) -> Any:
+        if not _isSegmentHandle(msg):
+            return msg
+        try:
+            return _readSegment(msg) if wanted else None
+        finally:
+            with self._lock:
+                if process is self._process and process.stdin is not None:
+                    try:
+                        _writeFrame(
+                            process.stdin,
+                            {'op': 'release_segment', 'name': msg[_SHM_KEY]['name']},
+                        )
+                    except Exception:
+                        pass
+
     def shutdown(self) -> None:
         reader_thread: threading.Thread | None
         with self._lock:
@@ -442,7 +717,9 @@ class FreeThreadedJsonSender:
                 except Exception:
                     pass
             reader_thread = self._stopProcessLocked(terminate_first=False)
+        self._runStoppedCallbacks()
         self._joinReaderThread(reader_thread)
+        self._pool.close()
 
     def is_running(self) -> bool:
         with self._lock:
@@ -580,10 +857,23 @@ class FreeThreadedJsonSender:
             request_id = int(response.get('id', 0))
             with self._lock:
                 callback = self._callbacks.pop(request_id, None)
-            if callback is None:
-                continue
+                wanted = callback is not None and request_id not in self._unwanted
+                self._unwanted.discard(request_id)
+                segments = self._lent.pop(request_id, [])
+            for segment in segments:
+                self._pool.release(segment)
             if response.get('ok'):
-                callback(response.get('msg'))
+                try:
+                    msg = self._takeResult(process, response.get('msg'), wanted)
+                except Exception as e:
+                    self._logger.warning('free-threaded worker result lost: %s', e)
+                    if callback is not None:
+                        callback(None)
+                    continue
+                if callback is not None:
+                    callback(msg if wanted else None)
+            elif callback is None:
+                continue
             else:
                 self._logger.warning(
                     'free-threaded worker error: %s',
@@ -594,6 +884,11 @@ class FreeThreadedJsonSender:
         with self._lock:
             callbacks = list(self._callbacks.values())
             self._callbacks.clear()
+            self._unwanted.clear()
+            lent = [segment for group in self._lent.values() for segment in group]
+            self._lent.clear()
+        for segment in lent:
+            self._pool.release(segment)
         for callback in callbacks:
             callback(None)
 
@@ -606,8 +901,14 @@ class FreeThreadedJsonSender:
         reader_thread = self._reader_thread
         self._process = None
         self._reader_thread = None
+        self._stopped_callbacks.extend(self._callbacks.values())
         self._callbacks.clear()
+        self._unwanted.clear()
+        lent = [segment for group in self._lent.values() for segment in group]
+        self._lent.clear()
         if process is None:
+            for segment in lent:
+                self._pool.release(segment)
             return reader_thread
 
         if not terminate_first:
@@ -648,6 +949,9 @@ class FreeThreadedJsonSender:
                     pipe.close()
             except Exception:
                 pass
+        # the worker is gone, nothing can still be reading these
+        for segment in lent:
+            self._pool.release(segment)
         return reader_thread
 
     def _joinReaderThread(self, reader_thread: threading.Thread | None) -> None:
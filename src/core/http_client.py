@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from collections import deque
+import logging
+import threading
+import time
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from services.events.event_bus import event_bus
+from services.events.events import COLLECT_DEBUG_INFO, EMIT_DEBUG_INFO
+
+_logger = logging.getLogger(__name__)
+
+_POOL_HOSTS = 16
+_POOL_MAXSIZE = 32
+_RATE_WINDOW = 5.0
+_RETRY = Retry(
+    total=3,
+    connect=3,
+    read=2,
+    status=2,
+    backoff_factor=0.3,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({'GET', 'HEAD'}),
+    raise_on_status=False,
+)
+
+
+class HttpClient:
+    """Process-wide pooled HTTP session shared by every download path."""
+
+    def __init__(self) -> None:
+        self.session = requests.Session()
+        self._adapter = HTTPAdapter(
+            pool_connections=_POOL_HOSTS,
+            pool_maxsize=_POOL_MAXSIZE,
+            max_retries=_RETRY,
+            pool_block=False,
+        )
+        self.session.mount('https://', self._adapter)
+        self.session.mount('http://', self._adapter)
+
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._bytes = 0
+        self._window: deque[tuple[float, int]] = deque()
+        self._window_bytes = 0
+        self._ttfb_total = 0.0
+        self._ttfb_count = 0
+
+        event_bus.subscribe(COLLECT_DEBUG_INFO, self.emitDebugInfo)
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        started = time.perf_counter()
+        response = self.session.request(method, url, **kwargs)
+        # with stream=True this returns once the headers arrived
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._requests += 1
+            self._ttfb_total += elapsed
+            self._ttfb_count += 1
+        return response
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def head(self, url: str, **kwargs: Any) -> requests.Response:
+        kwargs.setdefault('allow_redirects', True)
+        return self.request('HEAD', url, **kwargs)
+
+    def fetch(self, url: str, timeout: float = 30) -> bytes:
+        """Download a small resource such as a cover image in one go."""
+        response = self.get(url, timeout=timeout)
+        response.raise_for_status()
+        content = response.content
+        self.recordBytes(len(content))
+        return content
+
+    def recordBytes(self, size: int) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._bytes += size
+            self._window.append((now, size))
+            self._window_bytes += size
+            while self._window and now - self._window[0][0] > _RATE_WINDOW:
+                self._window_bytes -= self._window.popleft()[1]
+
+    def bytesPerSecond(self) -> float:
+        now = time.monotonic()
+        with self._lock:
+            while self._window and now - self._window[0][0] > _RATE_WINDOW:
+                self._window_bytes -= self._window.popleft()[1]
+            return self._window_bytes / _RATE_WINDOW
+
+    def connectionStats(self) -> tuple[int, int]:
+        """Return ``(connections opened, requests sent)`` over all pools."""
+        pools = self._adapter.poolmanager.pools
+        opened = 0
+        sent = 0
+        # keys() is a snapshot; a pool evicted since then is simply skipped
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            opened += getattr(pool, 'num_connections', 0)
+            sent += getattr(pool, 'num_requests', 0)
+        return opened, sent
+
+    def emitDebugInfo(self) -> None:
+        opened, sent = self.connectionStats()
+        with self._lock:
+            ttfb = self._ttfb_total / self._ttfb_count if self._ttfb_count else 0.0
+            requests_count = self._requests
+            total_bytes = self._bytes
+        event_bus.emit(
+            EMIT_DEBUG_INFO,
+            'HttpClient',
+            [
+                f'requests={requests_count}',
+                f'connections={opened}',
+                f'reused={max(0, sent - opened)}',
+                f'bytes={total_bytes}',
+                f'rate={self.bytesPerSecond() / 1024:.1f}KiB/s',
+                f'avg_ttfb={ttfb * 1000:.0f}ms',
+            ],
+        )
+
+
+http_client = HttpClient()
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+import hashlib
+import logging
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Hashable
+from urllib.parse import urlsplit, urlunsplit
+
+from core.app_context import TASK_IDLE
+from core.http_client import http_client
+from core.models import IMAGE_DATA_DIR, SongStorable
+from imports import QBuffer, QByteArray, QImage, QImageReader, QPixmap, QSize, Qt
+from services.events.event_bus import event_bus
+from services.events.events import COLLECT_DEBUG_INFO, EMIT_DEBUG_INFO
+
+if TYPE_CHECKING:
+    from core.app_context import AppContext
+
+_logger = logging.getLogger(__name__)
+
+THUMBNAIL_DIR = os.path.join(IMAGE_DATA_DIR, 'thumbs')
+_PIXMAP_CACHE_MAX = 512
+_DECODE_WORKERS = 4
+_THUMBNAIL_FORMAT = 'PNG'
+_THUMBNAIL_DIR_MAX_BYTES = 64 * 1024 * 1024
+# reading a thumbnail refreshes its mtime at most this often
+_THUMBNAIL_TOUCH_INTERVAL = 24 * 3600
+_STALE_TMP_AGE = 3600
+
+
+def coverVariantUrl(url: str, size: QSize) -> str:
+    """Ask the NetEase image CDN for a copy no larger than ``size``."""
+    if not url:
+        return url
+    parts = urlsplit(url)
+    if not parts.netloc.endswith('music.126.net'):
+        return url
+    return urlunsplit(parts._replace(query=f'param={size.width()}y{size.height()}'))
+
+
+def _decodeScaled(reader: QImageReader, size: QSize) -> QImage | None:
+    source = reader.size()
+    if source.isValid() and (
+        source.width() > size.width() or source.height() > size.height()
+    ):
+        # lets the JPEG decoder skip most of the work for large covers
+        reader.setScaledSize(source.scaled(size, Qt.AspectRatioMode.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull():
+        return None
+    if image.width() > size.width() or image.height() > size.height():
+        image = image.scaled(
+            size,
+            Qt.AspectRatioMode.KeepAspectRatio,
+            Qt.TransformationMode.SmoothTransformation,
+        )
+    return image
+
+
+class CoverImageService:
+    """Decodes covers into per-size thumbnails off the GUI thread.
+
+    Scaled thumbnails are kept on disk next to the image cache, and ready
+    pixmaps in an LRU keyed by ``(source key, size)`` that is only touched on
+    the GUI thread. ``pruneThumbnails`` keeps the disk copies within a size
+    budget, dropping the least recently read first.
+    """
+
+    def __init__(self) -> None:
+        self._executor = ThreadPoolExecutor(
+            max_workers=_DECODE_WORKERS, thread_name_prefix='southside-cover'
+        )
+        self._pixmaps: OrderedDict[tuple[str, int, int], QPixmap] = OrderedDict()
+        self._lock = threading.Lock()
+        self.pixmap_hits = 0
+        self.thumbnail_hits = 0
+        self.decodes = 0
+
+        event_bus.subscribe(COLLECT_DEBUG_INFO, self.emitDebugInfo)
+
+    def cachedPixmap(self, key: str, size: QSize) -> QPixmap | None:
+        pixmap = self._pixmaps.get((key, size.width(), size.height()))
+        if pixmap is not None:
+            self._pixmaps.move_to_end((key, size.width(), size.height()))
+            self.pixmap_hits += 1
+        return pixmap
+
+    def pixmapFromImage(self, key: str, size: QSize, image: QImage) -> QPixmap:
+        """Convert a decoded thumbnail and remember it; GUI thread only."""
+        pixmap = QPixmap.fromImage(image)
+        cache_key = (key, size.width(), size.height())
+        self._pixmaps[cache_key] = pixmap
+        self._pixmaps.move_to_end(cache_key)
+        while len(self._pixmaps) > _PIXMAP_CACHE_MAX:
+            self._pixmaps.popitem(last=False)
+        return pixmap
+
+    def requestStorablePixmap(
+        self,
+        storable: SongStorable,
+        size: QSize,
+        ctx: AppContext,
+        callback: Callable[[QPixmap], None],
+        key: Hashable | None = None,
+    ) -> None:
+        """Deliver the cover of ``storable`` scaled to ``size`` on the GUI thread.
+
+        Deliveries are idle work; a newer request with the same ``key``
+        replaces one that has not been delivered yet.
+        """
+        cache_key = storable.image_cache_hash
+        if not cache_key:
+            return
+        pixmap = self.cachedPixmap(cache_key, size)
+        if pixmap is not None:
+            callback(pixmap)
+            return
+
+        def _deliver(image: QImage) -> None:
+            callback(self.pixmapFromImage(cache_key, size, image))
+
+        def _done(future: Future[QImage | None]) -> None:
+            try:
+                image = future.result()
+            except Exception:
+                _logger.exception(f'failed to decode cover of {storable.id}')
+                return
+            if image is not None:
+                ctx.scheduleTask(_deliver, image, priority=TASK_IDLE, key=key)
+
+        self._executor.submit(self.storableThumbnail, storable, size).add_done_callback(
+            _done
+        )
+
+    def storableThumbnail(self, storable: SongStorable, size: QSize) -> QImage | None:
+        """Load or build the thumbnail of a cached cover; blocking."""
+        key = storable.image_cache_hash
+        image = self._readThumbnail(key, size)
+        if image is not None:
+            return image
+        try:
+            source = storable.getImagePath()
+        except FileNotFoundError:
+            return None
+        image = _decodeScaled(QImageReader(source), size)
+        if image is not None:
+            self._writeThumbnail(key, size, image)
+        return image
+
+    def urlThumbnail(self, url: str, size: QSize) -> tuple[str, QImage | None]:
+        """Download a size variant of a remote cover; blocking.
+
+        Returns the key to use with ``pixmapFromImage`` and the decoded image.
+        """
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        image = self._readThumbnail(key, size)
+        if image is not None:
+            return key, image
+        data = QByteArray(http_client.fetch(coverVariantUrl(url, size)))
+        buffer = QBuffer(data)
+        image = _decodeScaled(QImageReader(buffer), size)
+        if image is not None:
+            self._writeThumbnail(key, size, image)
+        return key, image
+
+    def pruneThumbnails(self, max_bytes: int = _THUMBNAIL_DIR_MAX_BYTES) -> None:
+        """Delete the least recently used thumbnails beyond ``max_bytes``; blocking."""
+        try:
+            names = os.listdir(THUMBNAIL_DIR)
+        except OSError:
+            return
+        stale_tmp = time.time() - _STALE_TMP_AGE
+        thumbnails: list[tuple[float, int, str]] = []
+        for name in names:
+            path = os.path.join(THUMBNAIL_DIR, name)
+            try:
+                stat = os.stat(path)
+                if name.endswith('.tmp'):
+                    # left by a write that died; a live one is seconds old
+                    if stat.st_mtime < stale_tmp:
+                        os.remove(path)
+                    continue
+            except OSError:
+                continue
+            thumbnails.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in thumbnails)
+        thumbnails.sort()
+        for _, size, path in thumbnails:
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                _logger.debug(f'failed to prune thumbnail {path}')
+                continue
+            total -= size
+
+    def emitDebugInfo(self) -> None:
+        event_bus.emit(
+            EMIT_DEBUG_INFO,
+            'CoverImageService',
+            [
+                f'pixmaps={len(self._pixmaps)}',
+                f'pixmap_hits={self.pixmap_hits}',
+                f'thumbnail_hits={self.thumbnail_hits}',
+                f'decodes={self.decodes}',
+            ],
+        )
+
+    def _thumbnailPath(self, key: str, size: QSize) -> str:
+        return os.path.join(
+            THUMBNAIL_DIR,
+            f'{key}_{size.width()}x{size.height()}.{_THUMBNAIL_FORMAT.lower()}',
+        )
+
+    def _readThumbnail(self, key: str, size: QSize) -> QImage | None:
+        path = self._thumbnailPath(key, size)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+        image = QImage(path)
+        if image.isNull():
+            return None
+        if mtime < time.time() - _THUMBNAIL_TOUCH_INTERVAL:
+            # a read counts as a use, so pruning drops the least recently used
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        with self._lock:
+            self.thumbnail_hits += 1
+        return image
+
+    def _writeThumbnail(self, key: str, size: QSize, image: QImage) -> None:
+        with self._lock:
+            self.decodes += 1
+        path = self._thumbnailPath(key, size)
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        try:
+            os.makedirs(THUMBNAIL_DIR, exist_ok=True)
+            if image.save(tmp_path, _THUMBNAIL_FORMAT):
+                os.replace(tmp_path, path)
+                return
+        except OSError:
+            _logger.exception(f'failed to write thumbnail {path}')
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+cover_images = CoverImageService()
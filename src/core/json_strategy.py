@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from core.free_threaded_worker import (
+    dumpJsonPayload,
+    json_base64_bytes_data,
+    json_float_array_spec,
+)
+from core.metrics import LatencyHistogram, formatDuration
+from core.worker_pool import WorkerPool
+from services.events.event_bus import event_bus
+from services.events.events import COLLECT_DEBUG_INFO, EMIT_DEBUG_INFO
+
+# in-process encodes cheaper than this are not worth a sidecar round trip
+_INPROCESS_BUDGET = 1e-3
+# payloads of unknown cost go to the sidecar from this estimated size
+_SIDECAR_MIN_BYTES = 64 * 1024
+# refresh the in-process cost of sidecar-bound options every so often
+_REPROBE_EVERY = 32
+_SIDECAR_RETRY_DELAY = 30.0
+_COST_SMOOTHING = 0.2
+
+
+def _estimateSize(payload: dict[str, object]) -> int:
+    # only looks at the top level, which is where covers and arrays live
+    size = 0
+    for value in payload.values():
+        if isinstance(value, (str, bytes)):
+            size += len(value)
+        elif (data := json_base64_bytes_data(value)) is not None:
+            size += len(data) * 4 // 3
+        elif (spec := json_float_array_spec(value)) is not None:
+            size += int(spec.get('count', 0)) * 12  # type: ignore
+        elif isinstance(value, (list, dict)):
+            size += len(value) * 64
+        else:
+            size += 16
+    return size
+
+
+class JsonStrategy:
+    """Picks in-process or sidecar JSON encoding per payload option.
+
+    Each option remembers how long the in-process encode took. Options that
+    stay under ``_INPROCESS_BUDGET`` never pay for the pipe, and the heavy
+    ones are moved off this process's GIL. Latencies are kept per path.
+    """
+
+    def __init__(self, sender: WorkerPool) -> None:
+        self._sender = sender
+        self._lock = threading.Lock()
+        self._costs: dict[object, float] = {}
+        self._sidecar_runs: dict[object, int] = {}
+        self._sidecar_retry_at = 0.0
+        self.histograms = {
+            'inprocess': LatencyHistogram(),
+            'sidecar': LatencyHistogram(),
+        }
+        self.sidecar_failures = 0
+
+        event_bus.subscribe(COLLECT_DEBUG_INFO, self.emitDebugInfo)
+
+    def histogram(self, path: str) -> LatencyHistogram:
+        with self._lock:
+            histogram = self.histograms.get(path)
+            if histogram is None:
+                histogram = self.histograms[path] = LatencyHistogram()
+            return histogram
+
+    def dump(self, payload: dict[str, object], timeout: float = 5.0) -> str:
+        option = payload.get('option')
+        if self._useSidecar(option, payload):
+            started = time.perf_counter()
+            msg = self._sender.dump(payload, timeout)
+            if msg is not None:
+                self.histograms['sidecar'].record(time.perf_counter() - started)
+                return msg
+            with self._lock:
+                self.sidecar_failures += 1
+                if not self._sender.is_running():
+                    self._sidecar_retry_at = time.monotonic() + _SIDECAR_RETRY_DELAY
+
+        started = time.perf_counter()
+        msg = dumpJsonPayload(payload)
+        elapsed = time.perf_counter() - started
+        self.histograms['inprocess'].record(elapsed)
+        with self._lock:
+            cost = self._costs.get(option)
+            # a faster sample is taken as is, so a slow first encode (imports,
+            # cold caches) doesn't pin a small option to the sidecar
+            self._costs[option] = (
+                elapsed
+                if cost is None or elapsed < cost
+                else cost + (elapsed - cost) * _COST_SMOOTHING
+            )
+        return msg
+
+    def _useSidecar(self, option: object, payload: dict[str, object]) -> bool:
+        with self._lock:
+            if time.monotonic() < self._sidecar_retry_at:
+                return False
+            cost = self._costs.get(option)
+            if cost is None:
+                return _estimateSize(payload) >= _SIDECAR_MIN_BYTES
+            if cost < _INPROCESS_BUDGET:
+                return False
+            runs = self._sidecar_runs.get(option, 0) + 1
+            self._sidecar_runs[option] = runs
+            return runs % _REPROBE_EVERY != 0
+
+    def emitDebugInfo(self) -> None:
+        with self._lock:
+            histograms = list(self.histograms.items())
+            costs = sorted(self._costs.items(), key=lambda item: -item[1])[:4]
+        event_bus.emit(
+            EMIT_DEBUG_INFO,
+            'JsonStrategy',
+            [f'{path}: {histogram.summary()}' for path, histogram in histograms]
+            + [f'cost[{option}]={formatDuration(cost)}' for option, cost in costs]
+            + [f'sidecar_failures={self.sidecar_failures}'],
+        )
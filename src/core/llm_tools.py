@@ -672,7 +672,7 @@ class LLMToolRunner:
                     'handle': handle,
                     'name': local_folder.folder_name,
                     'kind': 'local',
-                    'song_count': len(local_folder.songs),
+                    'song_count': local_folder.song_count,
                 }
             )
         cloud = []
@@ -710,16 +710,18 @@ class LLMToolRunner:
             songs = getBackend().getPlaylistTracks(folder_obj.id)
             if self._cloudSongCount(folder_obj) is None:
                 self._setCloudSongCount(folder_obj, len(songs))
+            sliced = songs[offset : offset + limit]
+            total = len(songs)
         else:
-            songs = folder_obj.songs
+            sliced = folder_obj.songPage(offset, limit)
+            total = folder_obj.song_count
 
-        sliced = songs[offset : offset + limit]
         return {
             'folder': self._folderToDict(folder, folder_obj),
             'offset': offset,
             'limit': limit,
-            'total': len(songs),
-            'next_offset': offset + len(sliced),
+            'total': total,
+            'next_offset': min(total, offset + limit),
             'songs': [
                 self._songToDict(song, self._songHandle(song)) for song in sliced
             ],
@@ -1308,7 +1310,7 @@ class LLMToolRunner:
             'handle': handle,
             'kind': 'local',
             'name': folder.folder_name,
-            'song_count': len(folder.songs),
+            'song_count': folder.song_count,
         }
 
     def _cloudSongCount(self, folder: CloudFolderInfo) -> int | None:
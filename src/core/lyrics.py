@@ -115,6 +115,68 @@ def _try_parse_yrc_line(line: str) -> YRCLyricInfo | None:
     )
 
 
+def parseYrcText(text: str) -> list[YRCLyricInfo]:
+    parsed: list[YRCLyricInfo] = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+
+        if _is_metadata_tag(stripped):
+            continue
+
+        metadata = _try_parse_json_metadata_line(stripped)
+        if metadata is not None:
+            parsed.append(
+                YRCLyricInfo(
+                    time=metadata.time,
+                    duration=0,
+                    content=metadata.content,
+                    chars=[],
+                    isMetadata=True,
+                )
+            )
+            continue
+
+        info = _try_parse_yrc_line(stripped)
+        if info is not None:
+            parsed.append(info)
+
+    parsed.sort(key=lambda x: x.time)
+    return parsed
+
+
+def parseLrcText(text: str) -> tuple[list[LyricInfo], list[float]]:
+    parsed: list[LyricInfo] = []
+    empty_times: list[float] = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+
+        if _is_metadata_tag(stripped):
+            continue
+
+        if _is_json_metadata(stripped):
+            continue
+
+        m = _LRC_TIME_RE.match(stripped)
+        if m and not stripped[m.end() :].strip():
+            minutes = int(m.group(1))
+            seconds = int(m.group(2))
+            ms_raw = m.group(3).ljust(3, '0')[:3]
+            ms = int(ms_raw)
+            empty_times.append(minutes * 60 + seconds + ms / 1000)
+            continue
+
+        info = _try_parse_lrc_line(stripped)
+        if info is not None:
+            parsed.append(info)
+
+    parsed.sort(key=lambda x: x.time)
+    return parsed, empty_times
+
+
 class YRCLyricParser:
     def __init__(self) -> None:
         self._logger = logging.getLogger(__name__)
@@ -175,44 +237,27 @@ class YRCLyricParser:
 
         return len(self.parsed) - 1
 
-    def parse(self) -> None:
+    def _clearLookupCaches(self) -> None:
         self._getOffsetedLyric.cache_clear()
         self._getCurrentLyric.cache_clear()
         self._getCurrentLyricIndex.cache_clear()
 
+    def parse(self) -> None:
+        self._clearLookupCaches()
+
         self.parsed.clear()
 
         if not self.cur:
             return
 
-        for line in self.cur.splitlines():
-            stripped = line.strip()
-            if not stripped:
-                continue
-
-            if _is_metadata_tag(stripped):
-                continue
-
-            metadata = _try_parse_json_metadata_line(stripped)
-            if metadata is not None:
-                self.parsed.append(
-                    YRCLyricInfo(
-                        time=metadata.time,
-                        duration=0,
-                        content=metadata.content,
-                        chars=[],
-                        isMetadata=True,
-                    )
-                )
-                continue
-
-            info = _try_parse_yrc_line(stripped)
-            if info is not None:
-                self.parsed.append(info)
-
-        self.parsed.sort(key=lambda x: x.time)
+        self.parsed.extend(parseYrcText(self.cur))
         self._logger.info(f'parsed {len(self.parsed)} YRC lines')
 
+    def loadParsed(self, parsed: list[YRCLyricInfo]) -> None:
+        self._clearLookupCaches()
+        self.cur = ''
+        self.parsed = list(parsed)
+
 
 class LRCLyricParser:
     def __init__(self) -> None:
@@ -276,11 +321,14 @@ class LRCLyricParser:
 
         return len(self.parsed) - 1
 
-    def parse(self) -> None:
+    def _clearLookupCaches(self) -> None:
         self._getOffsetedLyric.cache_clear()
         self._getCurrentLyric.cache_clear()
         self._getCurrentLyricIndex.cache_clear()
 
+    def parse(self) -> None:
+        self._clearLookupCaches()
+
         self.parsed.clear()
         self.empty_times.clear()
         self.version += 1
@@ -288,29 +336,14 @@ class LRCLyricParser:
         if not self.cur:
             return
 
-        for line in self.cur.splitlines():
-            stripped = line.strip()
-            if not stripped:
-                continue
-
-            if _is_metadata_tag(stripped):
-                continue
-
-            if _is_json_metadata(stripped):
-                continue
-
-            m = _LRC_TIME_RE.match(stripped)
-            if m and not stripped[m.end() :].strip():
-                minutes = int(m.group(1))
-                seconds = int(m.group(2))
-                ms_raw = m.group(3).ljust(3, '0')[:3]
-                ms = int(ms_raw)
-                self.empty_times.append(minutes * 60 + seconds + ms / 1000)
-                continue
-
-            info = _try_parse_lrc_line(stripped)
-            if info is not None:
-                self.parsed.append(info)
-
-        self.parsed.sort(key=lambda x: x.time)
+        parsed, empty_times = parseLrcText(self.cur)
+        self.parsed.extend(parsed)
+        self.empty_times.extend(empty_times)
         self._logger.info(f'parsed {len(self.parsed)} lines')
+
+    def loadParsed(self, parsed: list[LyricInfo], empty_times: list[float]) -> None:
+        self._clearLookupCaches()
+        self.cur = ''
+        self.parsed = list(parsed)
+        self.empty_times = list(empty_times)
+        self.version += 1
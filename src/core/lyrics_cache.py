@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import logging
+import os
+import struct
+import threading
+from typing import TYPE_CHECKING
+
+from core.lyrics import (
+    LyricInfo,
+    YRCCharInfo,
+    YRCLyricInfo,
+    parseLrcText,
+    parseYrcText,
+)
+
+if TYPE_CHECKING:
+    from core.models import SongStorable
+
+_logger = logging.getLogger(__name__)
+
+# Binary layout (all little-endian):
+#   header:  magic, format version, source json mtime_ns, source json size, flags
+#   3 x LRC: line count, empty count, times f64[n], metadata u8[n],
+#            text offsets u32[n + 1], utf-8 blob, empty times f64[e]
+#   1 x YRC: line count, char count, times f64[n], durations f64[n],
+#            metadata u8[n], char bounds u32[n + 1], text offsets u32[n + 1],
+#            utf-8 blob, char starts f64[m], char durations f64[m],
+#            char text offsets u32[m + 1], utf-8 blob
+_MAGIC = b'SSLY'
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct('<4sHqqB')
+_COUNTS = struct.Struct('<II')
+_FLAG_HAS_YRC = 1
+_FLAG_HAS_YTLRC = 2
+_EMPTY_LYRIC = '[00:00.000]'
+_MEMO_MAX = 32
+_BINARY_SUFFIX = '.lyb'
+
+
+@dataclass
+class ParsedLrc:
+    lines: list[LyricInfo] = field(default_factory=list)
+    empty_times: list[float] = field(default_factory=list)
+
+
+@dataclass
+class ParsedLyrics:
+    lyric: ParsedLrc = field(default_factory=ParsedLrc)
+    translated_lyric: ParsedLrc = field(default_factory=ParsedLrc)
+    ytlrc_lyric: ParsedLrc = field(default_factory=ParsedLrc)
+    yrc_lyric: list[YRCLyricInfo] = field(default_factory=list)
+    has_yrc: bool = False
+    has_ytlrc: bool = False
+
+    @property
+    def translation(self) -> ParsedLrc:
+        if self.has_yrc and self.has_ytlrc:
+            return self.ytlrc_lyric
+        return self.translated_lyric
+
+
+_memo: OrderedDict[str, tuple[tuple[int, int], ParsedLyrics]] = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def _sourceStamp(path: str) -> tuple[int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _binaryPath(json_path: str) -> str:
+    return os.path.splitext(json_path)[0] + _BINARY_SUFFIX
+
+
+def _parseLrc(text: str) -> ParsedLrc:
+    lines, empty_times = parseLrcText(text)
+    return ParsedLrc(lines=lines, empty_times=empty_times)
+
+
+def _parseLyrics(lyrics: dict[str, str]) -> ParsedLyrics:
+    yrc = lyrics.get('yrc_lyric', '')
+    ytlrc = lyrics.get('ytlrc_lyric', '')
+    return ParsedLyrics(
+        lyric=_parseLrc(lyrics.get('lyric', '') or _EMPTY_LYRIC),
+        translated_lyric=_parseLrc(lyrics.get('translated_lyric', '') or _EMPTY_LYRIC),
+        ytlrc_lyric=_parseLrc(ytlrc),
+        yrc_lyric=parseYrcText(yrc),
+        has_yrc=bool(yrc),
+        has_ytlrc=bool(ytlrc),
+    )
+
+
+def _packTexts(texts: list[str]) -> bytes:
+    encoded = [text.encode('utf-8') for text in texts]
+    offsets = [0]
+    for item in encoded:
+        offsets.append(offsets[-1] + len(item))
+    return struct.pack(f'<{len(offsets)}I', *offsets) + b''.join(encoded)
+
+
+def _packLrc(parsed: ParsedLrc) -> bytes:
+    lines = parsed.lines
+    count = len(lines)
+    empty_count = len(parsed.empty_times)
+    return b''.join(
+        (
+            _COUNTS.pack(count, empty_count),
+            struct.pack(f'<{count}d', *(line.time for line in lines)),
+            bytes(int(line.isMetadata) for line in lines),
+            _packTexts([line.content for line in lines]),
+            struct.pack(f'<{empty_count}d', *parsed.empty_times),
+        )
+    )
+
+
+def _packYrc(lines: list[YRCLyricInfo]) -> bytes:
+    count = len(lines)
+    chars = [char for line in lines for char in line.chars]
+    char_count = len(chars)
+    bounds = [0]
+    for line in lines:
+        bounds.append(bounds[-1] + len(line.chars))
+    return b''.join(
+        (
+            _COUNTS.pack(count, char_count),
+            struct.pack(f'<{count}d', *(line.time for line in lines)),
+            struct.pack(f'<{count}d', *(line.duration for line in lines)),
+            bytes(int(line.isMetadata) for line in lines),
+            struct.pack(f'<{count + 1}I', *bounds),
+            _packTexts([line.content for line in lines]),
+            struct.pack(f'<{char_count}d', *(char.start for char in chars)),
+            struct.pack(f'<{char_count}d', *(char.duration for char in chars)),
+            _packTexts([char.char for char in chars]),
+        )
+    )
+
+
+class _Reader:
+    def __init__(self, data: bytes) -> None:
+        self._view = memoryview(data)
+        self._pos = 0
+
+    def unpack(self, fmt: str) -> tuple:
+        values = struct.unpack_from(fmt, self._view, self._pos)
+        self._pos += struct.calcsize(fmt)
+        return values
+
+    def take(self, size: int) -> memoryview:
+        if self._pos + size > len(self._view):
+            raise ValueError('truncated lyrics cache')
+        chunk = self._view[self._pos : self._pos + size]
+        self._pos += size
+        return chunk
+
+    def texts(self, count: int) -> list[str]:
+        offsets = self.unpack(f'<{count + 1}I')
+        blob = bytes(self.take(offsets[-1]))
+        return [blob[offsets[i] : offsets[i + 1]].decode('utf-8') for i in range(count)]
+
+
+def _unpackLrc(reader: _Reader) -> ParsedLrc:
+    count, empty_count = reader.unpack('<II')
+    times = reader.unpack(f'<{count}d')
+    metadata = bytes(reader.take(count))
+    texts = reader.texts(count)
+    empty_times = reader.unpack(f'<{empty_count}d')
+    return ParsedLrc(
+        lines=[
+            LyricInfo(time=times[i], content=texts[i], isMetadata=bool(metadata[i]))
+            for i in range(count)
+        ],
+        empty_times=list(empty_times),
+    )
+
+
+def _unpackYrc(reader: _Reader) -> list[YRCLyricInfo]:
+    count, char_count = reader.unpack('<II')
+    times = reader.unpack(f'<{count}d')
+    durations = reader.unpack(f'<{count}d')
+    metadata = bytes(reader.take(count))
+    bounds = reader.unpack(f'<{count + 1}I')
+    texts = reader.texts(count)
+    char_starts = reader.unpack(f'<{char_count}d')
+    char_durations = reader.unpack(f'<{char_count}d')
+    char_texts = reader.texts(char_count)
+    chars = [
+        YRCCharInfo(
+            start=char_starts[i], duration=char_durations[i], char=char_texts[i]
+        )
+        for i in range(char_count)
+    ]
+    return [
+        YRCLyricInfo(
+            time=times[i],
+            duration=durations[i],
+            content=texts[i],
+            chars=chars[bounds[i] : bounds[i + 1]],
+            isMetadata=bool(metadata[i]),
+        )
+        for i in range(count)
+    ]
+
+
+def _writeBinary(path: str, source: tuple[int, int], parsed: ParsedLyrics) -> None:
+    flags = (_FLAG_HAS_YRC if parsed.has_yrc else 0) | (
+        _FLAG_HAS_YTLRC if parsed.has_ytlrc else 0
+    )
+    data = b''.join(
+        (
+            _HEADER.pack(_MAGIC, _FORMAT_VERSION, source[0], source[1], flags),
+            _packLrc(parsed.lyric),
+            _packLrc(parsed.translated_lyric),
+            _packLrc(parsed.ytlrc_lyric),
+            _packYrc(parsed.yrc_lyric),
+        )
+    )
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _readBinary(path: str, source: tuple[int, int]) -> ParsedLyrics | None:
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    try:
+        reader = _Reader(data)
+        magic, version, mtime_ns, size, flags = reader.unpack(_HEADER.format)
+        if magic != _MAGIC or version != _FORMAT_VERSION:
+            return None
+        if (mtime_ns, size) != source:
+            return None
+        return ParsedLyrics(
+            lyric=_unpackLrc(reader),
+            translated_lyric=_unpackLrc(reader),
+            ytlrc_lyric=_unpackLrc(reader),
+            yrc_lyric=_unpackYrc(reader),
+            has_yrc=bool(flags & _FLAG_HAS_YRC),
+            has_ytlrc=bool(flags & _FLAG_HAS_YTLRC),
+        )
+    except (struct.error, ValueError, UnicodeDecodeError):
+        _logger.warning('discarding corrupt lyrics cache %s', path)
+        return None
+
+
+def getParsedLyrics(song: SongStorable) -> ParsedLyrics:
+    """Return the parsed lyrics of ``song``, parsing at most once per edit."""
+    json_path = song.getLyricPath()
+    source = _sourceStamp(json_path)
+    if source is None:
+        return _parseLyrics({})
+
+    with _memo_lock:
+        entry = _memo.get(song.id)
+        if entry is not None and entry[0] == source:
+            _memo.move_to_end(song.id)
+            return entry[1]
+
+    binary_path = _binaryPath(json_path)
+    parsed = _readBinary(binary_path, source)
+    if parsed is None:
+        parsed = _parseLyrics(song.getLyrics())
+        try:
+            _writeBinary(binary_path, source, parsed)
+        except OSError:
+            _logger.exception('failed to write lyrics cache %s', binary_path)
+
+    with _memo_lock:
+        _memo[song.id] = (source, parsed)
+        _memo.move_to_end(song.id)
+        while len(_memo) > _MEMO_MAX:
+            _memo.popitem(last=False)
+    return parsed
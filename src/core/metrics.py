@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+import threading
+
+# upper bucket bounds in seconds: 16 us, 32 us, ... ~4.2 s, then overflow
+_BUCKET_BOUNDS = tuple(16e-6 * 2**i for i in range(19))
+
+
+def formatDuration(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f'{seconds * 1e6:.0f}us'
+    if seconds < 1.0:
+        return f'{seconds * 1e3:.2f}ms'
+    return f'{seconds:.2f}s'
+
+
+class LatencyHistogram:
+    """Power-of-two latency buckets, cheap enough to record on hot paths."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(_BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        index = bisect_left(_BUCKET_BOUNDS, seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of samples."""
+        with self._lock:
+            if self.count == 0:
+                return 0.0
+            target = max(1, round(self.count * fraction))
+            seen = 0
+            for index, bucket in enumerate(self._counts):
+                seen += bucket
+                if seen >= target:
+                    break
+            return _BUCKET_BOUNDS[index] if index < len(_BUCKET_BOUNDS) else self.max
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts = [0] * (len(_BUCKET_BOUNDS) + 1)
+            self.count = 0
+            self.total = 0.0
+            self.max = 0.0
+
+    def summary(self) -> str:
+        if self.count == 0:
+            return 'n=0'
+        return (
+            f'n={self.count}'
+            f' avg={formatDuration(self.total / self.count)}'
+            f' p50<={formatDuration(self.percentile(0.5))}'
+            f' p99<={formatDuration(self.percentile(0.99))}'
+            f' max={formatDuration(self.max)}'
+        )
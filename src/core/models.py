@@ -1,15 +1,19 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+import asyncio
 from dataclasses import dataclass, field
 import threading
 from typing import Any, Literal
 import base64
 import hashlib
 import json
+import logging
 import os
 import shutil
 
+_logger = logging.getLogger(__name__)
+
 _PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 DATA_DIR = os.path.join(_PROJECT_ROOT, 'data')
 MUSIC_DATA_DIR = os.path.join(DATA_DIR, 'music')
@@ -21,7 +25,15 @@ LEGACY_IMAGE_CACHE_DIR = os.path.join(LEGACY_CACHE_DIR, 'image')
 COUNT_FILE = os.path.join(DATA_DIR, 'count.json')
 _count_lock = threading.Lock()
 
+# ids a bulk detail lookup could not resolve; storables skip asking again
+_details_unavailable: set[str] = set()
+
+_lyric_data_memo: dict[str, tuple[tuple[int, int], dict[str, Any]]] = {}
+_lyric_data_lock = threading.Lock()
+_LYRIC_DATA_MEMO_MAX = 64
+
 _CACHE_INDEX_PATH = os.path.join(DATA_DIR, 'cache_index.json')
+_HASH_CHUNK_SIZE = 1024 * 1024
 _cache_index: dict[str, dict[str, str]] = {}
 _cache_index_loaded: bool = False
 
@@ -148,6 +160,23 @@ def _load_count() -> dict[str, int]:
     return {str(song_id): _intFromObject(count) for song_id, count in obj.items()}
 
 
+_count_snapshot: tuple[tuple[int, int] | None, dict[str, int]] = (None, {})
+
+
+def _cached_count(song_id: str) -> int:
+    global _count_snapshot
+    try:
+        st = os.stat(COUNT_FILE)
+        stamp: tuple[int, int] | None = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        stamp = None
+    if stamp is None:
+        return 0
+    if _count_snapshot[0] != stamp:
+        _count_snapshot = (stamp, _load_count())
+    return _count_snapshot[1].get(song_id, 0)
+
+
 def _normalize_count(obj: dict[str, int]) -> dict[str, int]:
     result: dict[str, int] = {}
     for song_id, count in obj.items():
@@ -158,6 +187,27 @@ def _normalize_count(obj: dict[str, int]) -> dict[str, int]:
     return result
 
 
+def _read_lyric_data(path: str) -> dict[str, Any] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _lyric_data_lock:
+        entry = _lyric_data_memo.get(path)
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        data = {}
+    with _lyric_data_lock:
+        if len(_lyric_data_memo) >= _LYRIC_DATA_MEMO_MAX:
+            _lyric_data_memo.pop(next(iter(_lyric_data_memo)))
+        _lyric_data_memo[path] = (stamp, data)
+    return data
+
+
 def _save_count(obj: dict[str, int]) -> None:
     os.makedirs(DATA_DIR, exist_ok=True)
     with open(COUNT_FILE, 'w', encoding='utf-8') as fp:
@@ -220,7 +270,7 @@ class SongStorable:
         self.loaded_loudness_gain = loaded_loudness_gain
         self.loggedin_when_download = loggedin_when_download
         self.viptype_when_download = viptype_when_download
-        self.count = _load_count().get(self.id, 0)
+        self.count = _cached_count(self.id)
 
     def _ensureCount(self) -> None:
         with _count_lock:
@@ -244,6 +294,10 @@ class SongStorable:
     def _ensureArtists(self) -> None:
         if (self.artists and self.duration > 0) or not self.id:
             return
+        if self.id in _details_unavailable:
+            if not self.artists:
+                self.artists = []
+            return
         try:
             from core.backend import getBackend
 
@@ -271,13 +325,29 @@ class SongStorable:
         if not os.path.exists(cache_path):
             with open(cache_path, 'wb') as f:
                 f.write(data)
+        self._setCacheHash(hash_attr, cache_hash)
+        return cache_hash
+
+    def _writeCacheFromFile(self, path: str, cache_dir: str, hash_attr: str) -> str:
+        os.makedirs(cache_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            while chunk := f.read(_HASH_CHUNK_SIZE):
+                digest.update(chunk)
+        cache_hash = digest.hexdigest()
+        cache_path = os.path.join(cache_dir, cache_hash)
+        if not os.path.exists(cache_path):
+            shutil.copyfile(path, cache_path)
+        self._setCacheHash(hash_attr, cache_hash)
+        return cache_hash
+
+    def _setCacheHash(self, hash_attr: str, cache_hash: str) -> None:
         setattr(self, hash_attr, cache_hash)
         if self.id:
             if hash_attr == 'image_cache_hash':
                 _updateCacheIndex(self.id, image_hash=cache_hash)
             elif hash_attr == 'content_cache_hash':
                 _updateCacheIndex(self.id, audio_hash=cache_hash)
-        return cache_hash
 
     @staticmethod
     def _ensureCacheDirs() -> None:
@@ -298,20 +368,26 @@ class SongStorable:
         )
         return os.path.join(legacy_dir, cache_hash)
 
-    def _readCache(self, cache_hash: str, cache_dir: str) -> bytes | None:
+    def _resolveCachePath(self, cache_hash: str, cache_dir: str) -> str | None:
         if not cache_hash:
             return None
         cache_path = self._getCachePath(cache_dir, cache_hash)
         if os.path.exists(cache_path):
-            with open(cache_path, 'rb') as f:
-                return f.read()
+            return cache_path
         legacy_path = self._getLegacyCachePath(cache_dir, cache_hash)
         if os.path.exists(legacy_path):
+            os.makedirs(cache_dir, exist_ok=True)
             shutil.move(legacy_path, cache_path)
-            with open(cache_path, 'rb') as f:
-                return f.read()
+            return cache_path
         return None
 
+    def _readCache(self, cache_hash: str, cache_dir: str) -> bytes | None:
+        cache_path = self._resolveCachePath(cache_hash, cache_dir)
+        if cache_path is None:
+            return None
+        with open(cache_path, 'rb') as f:
+            return f.read()
+
     def imageCached(self) -> bool:
         self._ensureCacheFields()
         return bool(self.image_cache_hash) and os.path.exists(
@@ -337,6 +413,11 @@ class SongStorable:
     def cacheAudio(self, data: bytes) -> str:
         return self._writeCache(data, MUSIC_DATA_DIR, 'content_cache_hash')
 
+    def cacheAudioFile(self, path: str | os.PathLike[str]) -> str:
+        return self._writeCacheFromFile(
+            os.fspath(path), MUSIC_DATA_DIR, 'content_cache_hash'
+        )
+
     def _ensureCacheFields(self) -> None:
         self.id = _song_id_from_object(self.id)
         if not hasattr(self, 'image_cache_hash'):
@@ -384,6 +465,24 @@ class SongStorable:
             f'Music cache not found for {self.name}: hash={self.content_cache_hash}'
         )
 
+    def getImagePath(self) -> str:
+        self._ensureCacheFields()
+        result = self._resolveCachePath(self.image_cache_hash, IMAGE_DATA_DIR)
+        if result is not None:
+            return result
+        raise FileNotFoundError(
+            f'Image cache not found for {self.name}: hash={self.image_cache_hash}'
+        )
+
+    def getMusicPath(self) -> str:
+        self._ensureCacheFields()
+        result = self._resolveCachePath(self.content_cache_hash, MUSIC_DATA_DIR)
+        if result is not None:
+            return result
+        raise FileNotFoundError(
+            f'Music cache not found for {self.name}: hash={self.content_cache_hash}'
+        )
+
     def getLyricPath(self) -> str:
         self._ensureCacheFields()
         cache_name = self.lyric_cache_hash or f'{self.id}.json'
@@ -391,16 +490,14 @@ class SongStorable:
 
     def getLyrics(self) -> dict[str, str]:
         self._ensureCacheFields()
-        path = self.getLyricPath()
-        if not os.path.exists(path):
+        data = _read_lyric_data(self.getLyricPath())
+        if data is None:
             return {
                 'lyric': '',
                 'translated_lyric': '',
                 'yrc_lyric': '',
                 'ytlrc_lyric': '',
             }
-        with open(path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
         return {
             'lyric': data.get('lyric', ''),
             'translated_lyric': data.get('translated_lyric', ''),
@@ -430,6 +527,8 @@ class SongStorable:
         os.makedirs(LYRIC_DATA_DIR, exist_ok=True)
         self.lyric_cache_hash = f'{self.id}.json'
         path = self.getLyricPath()
+        with _lyric_data_lock:
+            _lyric_data_memo.pop(path, None)
         with open(path, 'w', encoding='utf-8') as f:
             json.dump(
                 {
@@ -448,47 +547,24 @@ class SongStorable:
         self._ensureCacheFields()
         return not self.lyric_cache_hash or not os.path.exists(self.getLyricPath())
 
-    def yrcLyricsMissing(self) -> bool:
+    def _lyricFieldMissing(self, key: str) -> bool:
         self._ensureCacheFields()
         if self.lyricsMissing():
             return True
         try:
-            with open(self.getLyricPath(), 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = _read_lyric_data(self.getLyricPath())
         except Exception:
             return True
-        return not data.get('has_yrc_lyric')
+        return not data or not data.get(key)
+
+    def yrcLyricsMissing(self) -> bool:
+        return self._lyricFieldMissing('has_yrc_lyric')
 
     def translatedLyricsMissing(self) -> bool:
-        self._ensureCacheFields()
-        if self.lyricsMissing():
-            return True
-        try:
-            with open(self.getLyricPath(), 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        except Exception:
-            return True
-        return not data.get('translated_lyric')
+        return self._lyricFieldMissing('translated_lyric')
 
     def ytlrcMissing(self) -> bool:
-        self._ensureCacheFields()
-        if self.lyricsMissing():
-            return True
-        try:
-            with open(self.getLyricPath(), 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        except Exception:
-            return True
-        return not data.get('ytlrc_lyric')
-        self._ensureCacheFields()
-        if self.lyricsMissing():
-            return True
-        try:
-            with open(self.getLyricPath(), 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        except Exception:
-            return True
-        return not data.get('has_yrc_lyric')
+        return self._lyricFieldMissing('ytlrc_lyric')
 
     def ensureCachedAssets(self, logged_in: bool, vip_type: int) -> bool:
         self._ensureCacheFields()
@@ -558,10 +634,173 @@ class SongStorable:
         )
 
 
-@dataclass
+def _songObjectIncomplete(obj: dict[str, object]) -> bool:
+    return bool(obj.get('id')) and not (
+        _artistsFromObject(obj.get('artists', []))
+        and _intFromObject(obj.get('duration', 0)) > 0
+    )
+
+
+def prefillSongDetails(song_objects: list[dict[str, object]]) -> None:
+    """Fill in missing artists and durations of raw song objects in place.
+
+    One bulk detail lookup covers the whole list, so building storables from
+    the objects afterwards makes no per-song request.
+    """
+    incomplete = [obj for obj in song_objects if _songObjectIncomplete(obj)]
+    ids = {_song_id_from_object(obj.get('id')) for obj in incomplete}
+    ids -= _details_unavailable
+    if not ids:
+        return
+    try:
+        from core.backend import getBackend
+
+        details = getBackend().getTrackDetails(sorted(ids))
+    except Exception as e:
+        # nothing is marked unavailable, so the songs are asked for again
+        _logger.warning(f'failed to look up details of {len(ids)} songs: {e}')
+        return
+    _details_unavailable.update(
+        track_id for track_id, detail in details.items() if detail is None
+    )
+
+    for obj in incomplete:
+        detail = details.get(_song_id_from_object(obj.get('id')))
+        if detail is None:
+            continue
+        if not _artistsFromObject(obj.get('artists', [])):
+            obj['artists'] = [_artist_to_object(artist) for artist in detail.artists]
+        if _intFromObject(obj.get('duration', 0)) <= 0:
+            obj['duration'] = max(0, _intFromObject(detail.duration))
+
+
 class LocalFolderInfo:
-    folder_name: str
-    songs: list[SongStorable]
+    """A local favourites folder whose songs are materialised on demand.
+
+    Folders restored from disk keep the raw song objects and only build
+    ``SongStorable`` instances when a song (or page of songs) is requested.
+    """
+
+    def __init__(
+        self,
+        folder_name: str,
+        songs: list[SongStorable] | None = None,
+        *,
+        song_objects: list[dict[str, object]] | None = None,
+    ) -> None:
+        self.folder_name = folder_name
+        self._songs: list[SongStorable] | None = songs
+        self._song_objects: list[dict[str, object]] = (
+            list(song_objects or []) if songs is None else []
+        )
+        if songs is None and song_objects is None:
+            self._songs = []
+        self._materialised: dict[int, SongStorable | None] = {}
+        self._materialise_lock = threading.RLock()
+
+    def __repr__(self) -> str:
+        return (
+            f'LocalFolderInfo(folder_name={self.folder_name!r}, '
+            f'song_count={self.song_count}, loaded={self.loaded})'
+        )
+
+    @property
+    def loaded(self) -> bool:
+        return self._songs is not None
+
+    @property
+    def songs(self) -> list[SongStorable]:
+        if self._songs is not None:
+            return self._songs
+        with self._materialise_lock:
+            if self._songs is None:
+                prefillSongDetails(self._song_objects)
+                songs = [self.songAt(i) for i in range(len(self._song_objects))]
+                self._songs = [song for song in songs if song is not None]
+                self._song_objects = []
+                self._materialised.clear()
+            return self._songs
+
+    @songs.setter
+    def songs(self, songs: list[SongStorable]) -> None:
+        with self._materialise_lock:
+            self._songs = songs
+            self._song_objects = []
+            self._materialised.clear()
+
+    @property
+    def song_count(self) -> int:
+        if self._songs is not None:
+            return len(self._songs)
+        return len(self._song_objects)
+
+    @property
+    def first_image_hash(self) -> str:
+        if self._songs is not None:
+            return self._songs[0].image_cache_hash if self._songs else ''
+        if not self._song_objects:
+            return ''
+        return str(self._song_objects[0].get('image_cache_hash', '') or '')
+
+    def songAt(self, index: int) -> SongStorable | None:
+        if self._songs is not None:
+            return self._songs[index] if 0 <= index < len(self._songs) else None
+        with self._materialise_lock:
+            if self._songs is not None:
+                return self.songAt(index)
+            if index in self._materialised:
+                return self._materialised[index]
+            if not 0 <= index < len(self._song_objects):
+                return None
+            try:
+                song = SongStorable.fromObject(self._song_objects[index])
+            except Exception:
+                _logger.exception(
+                    "Failed to restore song in folder '%s'", self.folder_name
+                )
+                song = None
+            self._materialised[index] = song
+            return song
+
+    def songPage(self, offset: int, limit: int) -> list[SongStorable]:
+        end = min(self.song_count, offset + limit)
+        with self._materialise_lock:
+            if self._songs is None:
+                prefillSongDetails(
+                    [
+                        self._song_objects[i]
+                        for i in range(max(0, offset), end)
+                        if i not in self._materialised
+                    ]
+                )
+        songs = (self.songAt(i) for i in range(max(0, offset), end))
+        return [song for song in songs if song is not None]
+
+    def songIds(self) -> list[str]:
+        if self._songs is not None:
+            return [song.id for song in self._songs]
+        return [_song_id_from_object(obj.get('id')) for obj in self._song_objects]
+
+    def hasSong(self, song_id: str) -> bool:
+        return _song_id_from_object(song_id) in self.songIds()
+
+    def findSongs(self, song_id: str) -> list[SongStorable]:
+        song_id = _song_id_from_object(song_id)
+        if self._songs is not None:
+            return [song for song in self._songs if song.id == song_id]
+        indexes = [i for i, sid in enumerate(self.songIds()) if sid == song_id]
+        songs = (self.songAt(i) for i in indexes)
+        return [song for song in songs if song is not None]
+
+    def toObjects(self) -> list[dict[str, object]]:
+        with self._materialise_lock:
+            if self._songs is not None:
+                return [song.toObject() for song in self._songs]
+            objects: list[dict[str, object]] = []
+            for i, obj in enumerate(self._song_objects):
+                song = self._materialised.get(i)
+                objects.append(song.toObject() if song is not None else obj)
+            return objects
 
 
 @dataclass
@@ -625,6 +864,8 @@ class TrackDetailInfo:
 @dataclass
 class TrackAudioInfo:
     url: str
+    md5: str = ''
+    size: int = 0
 
 
 @dataclass
@@ -649,6 +890,21 @@ class MusicServiceBackend(ABC):
     @abstractmethod
     def getTrackDetail(self, track_id: int | str) -> TrackDetailInfo: ...
 
+    def getTrackDetails(
+        self, track_ids: list[str]
+    ) -> dict[str, TrackDetailInfo | None]:
+        """Look up several tracks; None marks an id the service does not know.
+
+        Ids whose lookup failed are left out, so callers can ask again later.
+        """
+        details: dict[str, TrackDetailInfo | None] = {}
+        for track_id in track_ids:
+            try:
+                details[str(track_id)] = self.getTrackDetail(track_id)
+            except Exception as e:
+                _logger.debug(f'failed to look up track {track_id}: {e}')
+        return details
+
     @abstractmethod
     def getTrackAudio(
         self, track_id: int | str, bitrate: int = 999000
@@ -688,3 +944,9 @@ class MusicServiceBackend(ABC):
 
     @abstractmethod
     def getDailyRecommendFolders(self) -> list[CloudFolderInfo]: ...
+
+    async def getDailyRecommendSongsAsync(self) -> list[SongStorable]:
+        return await asyncio.to_thread(self.getDailyRecommendSongs)
+
+    async def getDailyRecommendFoldersAsync(self) -> list[CloudFolderInfo]:
+        return await asyncio.to_thread(self.getDailyRecommendFolders)
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+import os
+import threading
 from typing import Any, Literal
 
 import pyncm
-from pyncm import apis
+from pyncm import aio, apis
 
 from core.models import (
+    DATA_DIR,
     AlbumInfo,
     ArtistInfo,
     CloudFolderInfo,
@@ -22,21 +26,48 @@ from core.models import (
     SearchCloudFolderInfo,
     getCachedHashes,
 )
+from core.request_batcher import RequestBatcher
+from core.response_cache import CachePolicy, ResponseCache
 
 _logger = logging.getLogger(__name__)
 
+_CACHE_POLICIES = {
+    'search_song': CachePolicy(ttl=300),
+    'search_playlist': CachePolicy(ttl=300),
+    'playlist_tracks': CachePolicy(ttl=600, persist=True),
+    'user_playlists': CachePolicy(ttl=600, persist=True),
+    'daily_songs': CachePolicy(ttl=3600, persist=True),
+    'track_lyrics': CachePolicy(ttl=86400),
+}
+
 
 class NeteaseCloudMusicBackend(MusicServiceBackend):
+    def __init__(self) -> None:
+        # single-song lookups from concurrent cards and workers are coalesced
+        # into one request of up to 1000 ids
+        self._detail_batcher: RequestBatcher[str, TrackDetailInfo] = RequestBatcher(
+            'detail', _fetch_track_details
+        )
+        self._audio_batchers: dict[int, RequestBatcher[str, TrackAudioInfo]] = {}
+        self._audio_batchers_lock = threading.Lock()
+        self._cache = ResponseCache(
+            _CACHE_POLICIES, disk_dir=os.path.join(DATA_DIR, 'api_cache')
+        )
+
     def searchSong(
         self, keywords: str, offset: int = 0, limit: int = 30
     ) -> list[SearchSongInfo]:
-        resp = apis.cloudsearch.getSearchResult(
-            keywords, stype=1, limit=limit, offset=offset
-        )
-        assert isinstance(resp, dict), 'Invalid search response'
+        def _load() -> list[dict[str, Any]]:
+            resp = apis.cloudsearch.getSearchResult(
+                keywords, stype=1, limit=limit, offset=offset
+            )
+            assert isinstance(resp, dict), 'Invalid search response'
+            return resp.get('result', {}).get('songs', [])
 
         songs: list[SearchSongInfo] = []
-        for songdict in resp.get('result', {}).get('songs', []):
+        for songdict in self._cache.get(
+            'search_song', (keywords, offset, limit), _load
+        ):
             artists = [
                 ArtistInfo(id=art.get('id', 0), name=art.get('name', ''))
                 for art in songdict.get('ar', [])
@@ -68,13 +99,17 @@ class NeteaseCloudMusicBackend(MusicServiceBackend):
     def searchPlaylist(
         self, keywords: str, offset: int = 0, limit: int = 30
     ) -> list[SearchCloudFolderInfo]:
-        resp = apis.cloudsearch.getSearchResult(
-            keywords, stype=1000, limit=limit, offset=offset
-        )
-        assert isinstance(resp, dict), 'Invalid search response'
+        def _load() -> list[dict[str, Any]]:
+            resp = apis.cloudsearch.getSearchResult(
+                keywords, stype=1000, limit=limit, offset=offset
+            )
+            assert isinstance(resp, dict), 'Invalid search response'
+            return resp.get('result', {}).get('playlists', [])
 
         playlists: list[SearchCloudFolderInfo] = []
-        for playlist_dict in resp.get('result', {}).get('playlists', []):
+        for playlist_dict in self._cache.get(
+            'search_playlist', (keywords, offset, limit), _load
+        ):
             playlists.append(
                 SearchCloudFolderInfo(
                     folder_name=playlist_dict['name'],
@@ -86,46 +121,52 @@ class NeteaseCloudMusicBackend(MusicServiceBackend):
         return playlists
 
     def getTrackDetail(self, track_id: int | str) -> TrackDetailInfo:
-        response = apis.track.getTrackDetail(song_ids=[track_id])
-        assert isinstance(response, dict), 'Invalid track detail response'
-        detail = response['songs'][0]  # type: ignore
-        al = detail.get('al', {})
-        return TrackDetailInfo(
-            cover_url=al.get('picUrl', ''),
-            album_name=al.get('name', ''),
-            cd=detail.get('cd', '1'),
-            track_no=detail.get('no', 1),
-            publish_time=detail.get('publishTime', 0),
-            artists=[
-                ArtistInfo(
-                    id=obj['id'],
-                    name=obj['name'],
-                )
-                for obj in detail.get('ar', [])
-            ],
-            duration=detail.get('dt', 0),
-            name=detail.get('name', ''),
-            aliases=[str(alias) for alias in detail.get('alia', []) if alias],
-            display_tags=_tag_texts(detail.get('displayTags')),
-            entertainment_tags=_tag_texts(detail.get('entertainmentTags')),
-            award_tags=_tag_texts(detail.get('awardTags')),
-            mark_tags=_tag_texts(detail.get('markTags')),
-            song_feature=detail.get('songFeature'),
-        )
+        return self._detail_batcher.get(str(track_id))
+
+    def getTrackDetails(
+        self, track_ids: list[str]
+    ) -> dict[str, TrackDetailInfo | None]:
+        # submitted together, the ids share as few batches as the limit allows
+        futures = {
+            str(track_id): self._detail_batcher.submit(str(track_id))
+            for track_id in track_ids
+        }
+        details: dict[str, TrackDetailInfo | None] = {}
+        for track_id, future in futures.items():
+            try:
+                details[track_id] = future.result()
+            except KeyError:
+                # the batch succeeded without this id
+                details[track_id] = None
+            except Exception:
+                # a failed batch; the batcher has logged it, and leaving the
+                # ids out lets a later lookup retry them
+                continue
+        return details
 
     def getTrackAudio(
         self, track_id: int | str, bitrate: int = 999000
     ) -> TrackAudioInfo:
-        resp = apis.track.getTrackAudio([str(track_id)], bitrate=bitrate)
-        if isinstance(resp, bytes):
-            resp = json.loads(resp.decode())
-        assert isinstance(resp, dict), 'Invalid track audio response'
-        url = resp['data'][0]['url']  # type: ignore
-        return TrackAudioInfo(url=url)
+        return self._audioBatcher(bitrate).get(str(track_id))
+
+    def _audioBatcher(self, bitrate: int) -> RequestBatcher[str, TrackAudioInfo]:
+        with self._audio_batchers_lock:
+            batcher = self._audio_batchers.get(bitrate)
+            if batcher is None:
+                batcher = RequestBatcher(
+                    f'audio-{bitrate // 1000}k',
+                    lambda ids: _fetch_track_audio(ids, bitrate),
+                )
+                self._audio_batchers[bitrate] = batcher
+            return batcher
 
     def getTrackLyrics(self, track_id: int | str) -> TrackLyricsInfo:
-        data = apis.track.getTrackLyricsNew(str(track_id))
-        assert isinstance(data, dict), 'Invalid track lyrics response'
+        def _load() -> dict[str, Any]:
+            data = apis.track.getTrackLyricsNew(str(track_id))
+            assert isinstance(data, dict), 'Invalid track lyrics response'
+            return data
+
+        data = self._cache.get('track_lyrics', str(track_id), _load)
 
         lyric = data.get('lrc', {}).get('lyric', '')
 
@@ -153,11 +194,14 @@ class NeteaseCloudMusicBackend(MusicServiceBackend):
 
     def getUserPlaylists(self) -> list[CloudFolderInfo]:
         with pyncm.getCurrentSession() as session:
-            response = apis.user.getUserPlaylists(session.uid)
-            assert isinstance(response, dict), 'Invaild Response'
-            assert not session.is_anonymous, 'Anonymous Account'
 
-            data = response['playlist']  # type: ignore
+            def _load() -> list[dict[str, Any]]:
+                response = apis.user.getUserPlaylists(session.uid)
+                assert isinstance(response, dict), 'Invaild Response'
+                assert not session.is_anonymous, 'Anonymous Account'
+                return response['playlist']  # type: ignore
+
+            data = self._cache.get('user_playlists', str(session.uid), _load)
 
             return [
                 CloudFolderInfo(
@@ -173,11 +217,16 @@ class NeteaseCloudMusicBackend(MusicServiceBackend):
         with pyncm.getCurrentSession():
             response = apis.playlist.setCreatePlaylist(name, False)
             assert isinstance(response, dict), 'Invalid Response'
+            self._cache.invalidate('user_playlists')
             return str(response['id'])  # type: ignore
 
     def removePlaylist(self, id: str) -> None:
-        with pyncm.getCurrentSession():
-            apis.playlist.setRemovePlaylist(id)  # type: ignore
+        with pyncm.getCurrentSession() as session:
+            try:
+                apis.playlist.setRemovePlaylist(id)  # type: ignore
+            finally:
+                self._cache.invalidate('user_playlists')
+                self._cache.invalidate('playlist_tracks', (str(session.uid), id))
 
     def editPlaylist(
         self,
@@ -185,10 +234,15 @@ class NeteaseCloudMusicBackend(MusicServiceBackend):
         song_ids: list[str],
         folder_id: str,
     ) -> bool:
-        with pyncm.getCurrentSession():
-            result = apis.playlist.setManipulatePlaylistTracks(
-                song_ids, folder_id, op=option
-            )
+        with pyncm.getCurrentSession() as session:
+            try:
+                result = apis.playlist.setManipulatePlaylistTracks(
+                    song_ids, folder_id, op=option
+                )
+            finally:
+                # even a failed edit may have been applied server-side
+                self._cache.invalidate('user_playlists')
+                self._cache.invalidate('playlist_tracks', (str(session.uid), folder_id))
             assert isinstance(result, dict), 'Invalid Response'
             if result.get('code') != 200:
                 _logger.warning('edit_playlist(%s) failed: %s', option, result)
@@ -196,11 +250,17 @@ class NeteaseCloudMusicBackend(MusicServiceBackend):
             return True
 
     def getPlaylistTracks(self, playlist_id: str) -> list[SongStorable]:
-        with pyncm.getCurrentSession():
-            response = apis.playlist.getPlaylistAllTracks(int(playlist_id))
-            assert isinstance(response, dict), 'Invalid Response'
-            assert response.get('code') == 200, f'API Error: {response}'
-            songs = response['songs']  # type: ignore
+        with pyncm.getCurrentSession() as session:
+
+            def _load() -> list[dict[str, Any]]:
+                response = apis.playlist.getPlaylistAllTracks(int(playlist_id))
+                assert isinstance(response, dict), 'Invalid Response'
+                assert response.get('code') == 200, f'API Error: {response}'
+                return response['songs']  # type: ignore
+
+            songs = self._cache.get(
+                'playlist_tracks', (str(session.uid), playlist_id), _load
+            )
             result: list[SongStorable] = []
             for s in songs:
                 cached = getCachedHashes(str(s['id']))
@@ -226,47 +286,36 @@ class NeteaseCloudMusicBackend(MusicServiceBackend):
         return pyncm.getCurrentSession().vipType
 
     def getDailyRecommendSongs(self) -> list[SongStorable]:
-        with pyncm.getCurrentSession():
-            response = apis.user.getDailyRecommend()
-            assert isinstance(response, dict), 'Invalid Response'
-            assert response.get('code') == 200, f'API Error: {response}'
-            return [
-                SongStorable(
-                    info=SongInfo(
-                        name=obj['name'],
-                        artists=[
-                            ArtistInfo(id=a['id'], name=a['name'])
-                            for a in obj['artists']
-                        ],
-                        id=obj['id'],
-                        privilege=obj['fee'],
-                        duration=obj['duration'],
-                    ),
-                    image=None,
-                    image_cache_hash=getCachedHashes(str(obj['id'])).get(
-                        'image_cache_hash', ''
-                    ),
-                    content_cache_hash=getCachedHashes(str(obj['id'])).get(
-                        'content_cache_hash', ''
-                    ),
-                )
-                for obj in response['recommend']
-            ]
+        with pyncm.getCurrentSession() as session:
+
+            def _load() -> list[dict[str, Any]]:
+                response = apis.user.getDailyRecommend()
+                return _daily_recommend_list(response)
+
+            recommend = self._cache.get('daily_songs', str(session.uid), _load)
+            return _daily_song_storables(recommend)
 
     def getDailyRecommendFolders(self) -> list[CloudFolderInfo]:
         with pyncm.getCurrentSession():
             response = apis.user.getDailyRecommendResource()
-            assert isinstance(response, dict), 'Invalid Response'
-            assert response.get('code') == 200, f'API Error: {response}'
-            return [
-                CloudFolderInfo(
-                    folder_name=obj['name'],
-                    image_url=obj.get('picUrl', ''),
-                    id=str(obj['id']),
-                    song_count=obj.get('trackCount'),
-                )
-                for obj in response.get('recommend') or []
-            ]
+            return [_daily_folder_info(obj) for obj in _daily_recommend_list(response)]
+
+    async def getDailyRecommendSongsAsync(self) -> list[SongStorable]:
+        session = aio.getCurrentAsyncSession()
+
+        async def _load() -> list[dict[str, Any]]:
+            response = await aio.weapi('/weapi/v2/discovery/recommend/songs', {})
+            return _daily_recommend_list(response)
+
+        recommend = await self._cache.getAsync(
+            'daily_songs', str(session.session.uid), _load
+        )
+        # building storables reads the cache index from disk
+        return await asyncio.to_thread(_daily_song_storables, recommend)
+
+    async def getDailyRecommendFoldersAsync(self) -> list[CloudFolderInfo]:
+        response = await aio.weapi('/weapi/v1/discovery/recommend/resource', {})
+        return [_daily_folder_info(obj) for obj in _daily_recommend_list(response)]
 
     def recordPlayed(self, song_id: str, song_name: str, time: float):
         apis.user.setWeblog(
@@ -303,6 +352,91 @@ class NeteaseCloudMusicBackend(MusicServiceBackend):
         )
 
 
+def _daily_recommend_list(response: Any) -> list[dict[str, Any]]:
+    assert isinstance(response, dict), 'Invalid Response'
+    assert response.get('code') == 200, f'API Error: {response}'
+    return response.get('recommend') or []
+
+
+def _daily_song_storables(recommend: list[dict[str, Any]]) -> list[SongStorable]:
+    return [_daily_song_storable(obj) for obj in recommend]
+
+
+def _daily_song_storable(obj: dict[str, Any]) -> SongStorable:
+    cached = getCachedHashes(str(obj['id']))
+    return SongStorable(
+        info=SongInfo(
+            name=obj['name'],
+            artists=[ArtistInfo(id=a['id'], name=a['name']) for a in obj['artists']],
+            id=obj['id'],
+            privilege=obj['fee'],
+            duration=obj['duration'],
+        ),
+        image=None,
+        image_cache_hash=cached.get('image_cache_hash', ''),
+        content_cache_hash=cached.get('content_cache_hash', ''),
+    )
+
+
+def _daily_folder_info(obj: dict[str, Any]) -> CloudFolderInfo:
+    return CloudFolderInfo(
+        folder_name=obj['name'],
+        image_url=obj.get('picUrl', ''),
+        id=str(obj['id']),
+        song_count=obj.get('trackCount'),
+    )
+
+
+def _fetch_track_details(track_ids: list[str]) -> dict[str, TrackDetailInfo]:
+    response = apis.track.getTrackDetail(song_ids=track_ids)
+    assert isinstance(response, dict), 'Invalid track detail response'
+    return {
+        str(detail['id']): _track_detail_from_dict(detail)
+        for detail in response.get('songs') or []
+    }
+
+
+def _fetch_track_audio(track_ids: list[str], bitrate: int) -> dict[str, TrackAudioInfo]:
+    resp = apis.track.getTrackAudio(track_ids, bitrate=bitrate)
+    if isinstance(resp, bytes):
+        resp = json.loads(resp.decode())
+    assert isinstance(resp, dict), 'Invalid track audio response'
+    return {
+        str(data['id']): TrackAudioInfo(
+            url=data['url'],
+            md5=str(data.get('md5') or ''),
+            size=int(data.get('size') or 0),
+        )
+        for data in resp.get('data') or []
+    }
+
+
+def _track_detail_from_dict(detail: dict[str, Any]) -> TrackDetailInfo:
+    al = detail.get('al', {})
+    return TrackDetailInfo(
+        cover_url=al.get('picUrl', ''),
+        album_name=al.get('name', ''),
+        cd=detail.get('cd', '1'),
+        track_no=detail.get('no', 1),
+        publish_time=detail.get('publishTime', 0),
+        artists=[
+            ArtistInfo(
+                id=obj['id'],
+                name=obj['name'],
+            )
+            for obj in detail.get('ar', [])
+        ],
+        duration=detail.get('dt', 0),
+        name=detail.get('name', ''),
+        aliases=[str(alias) for alias in detail.get('alia', []) if alias],
+        display_tags=_tag_texts(detail.get('displayTags')),
+        entertainment_tags=_tag_texts(detail.get('entertainmentTags')),
+        award_tags=_tag_texts(detail.get('awardTags')),
+        mark_tags=_tag_texts(detail.get('markTags')),
+        song_feature=detail.get('songFeature'),
+    )
+
+
 def _tag_texts(value: Any) -> list[str]:
     result: list[str] = []
 
@@ -4,9 +4,7 @@ import base64
 import logging
 import os
 from pathlib import Path
-import re
 import subprocess
-import tempfile
 import threading
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Any, Callable, Literal, Optional, TypedDict
@@ -14,7 +12,6 @@ import time as timeLib
 
 import numpy as np
 
-import requests
 from core.audio_player import (
     AudioPlayer,
     PatchedAudioSegment as AudioSegment_,
@@ -26,19 +23,42 @@ from core.audio_player import (
 from core.backend import getBackend
 from core.config import cfg
 from core.crossfade import CrossFadeInfo, getCrossfade
-from core.downloader import asyncTask, asyncDownload
+from core.downloader import (
+    FileSink,
+    PartialDownloadClaim,
+    SegmentedDownload,
+    asyncDownload,
+    asyncTask,
+    claimPartialDownload,
+    discardPartialDownload,
+    fileMd5,
+    resumableManifest,
+)
 from core.favorites import saveFavorites
-from core.free_threaded_worker import FreeThreadedJsonSender
+from core.http_client import http_client
 from core.image import getAverageColorFromBytes
+from core.image_service import cover_images
 from core.loudness import getAdjustedGainFactor
+from core.lyrics_cache import ParsedLyrics, getParsedLyrics
 from core.models import (
     IMAGE_DATA_DIR,
     MUSIC_DATA_DIR,
     SongStorable,
-    TrackLyricsInfo,
 )
 from core.netease_backend import NeteaseCloudMusicBackend
+from core.prefetch import PrefetchScheduler
+from core.session_snapshot import saveSessionSnapshot, takeSessionAudio
+from core.tracing import tracer
 from core.weighted_random import AdvancedRandom
+from core.worker_pool import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_FOREGROUND,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_PRELOAD,
+    CancelToken,
+    JobCancelled,
+    worker_pool,
+)
 from services.events.event_bus import event_bus
 from services.events.events import (
     COLLECT_DEBUG_INFO,
@@ -83,7 +103,10 @@ _STREAM_SAMPLE_RATE = 44100
 _STREAM_CHANNELS = 2
 _STREAM_PCM_READ_BYTES = _STREAM_SAMPLE_RATE * _STREAM_CHANNELS * 4
 _STREAM_PLAY_MIN_SECONDS = 5.0
-_LYRIC_TIME_RE = re.compile(r'\[(\d+):(\d+(?:\.\d+)?)\]')
+_SESSION_SNAPSHOT_INTERVAL_MS = 15000
+# a snapshot prefix must reach this far past the resume point to be worth playing
+_SESSION_PREFIX_MARGIN = 2.0
+_PARTIAL_DOWNLOAD_MAX_AGE = 7 * 24 * 3600
 
 
 @dataclass(frozen=True)
@@ -125,21 +148,32 @@ class PlayingManager:
         self._preload_download_seq = 0
         self._preload_download_song_id: str | None = None
         self._pending_play_selection: PlaySelection | None = None
-        self._ft_worker = FreeThreadedJsonSender(logger=self._logger)
+        self._ft_worker = worker_pool
+        self._preload_token = CancelToken()
         self._stream_processes: set[subprocess.Popen[bytes]] = set()
         self._stream_process_lock = threading.Lock()
         self.crossfading = False
         self._play_storable_time: float = timeLib.time()
         self._last_storable: SongStorable | None = None
+        self._prefetcher = PrefetchScheduler(self)
 
         if ctx is not None:
             self._bindEvents()
             ctx.app.aboutToQuit.connect(self.shutdownWorkers)
+            self._snapshot_timer = QTimer()
+            self._snapshot_timer.setInterval(_SESSION_SNAPSHOT_INTERVAL_MS)
+            self._snapshot_timer.timeout.connect(self._saveSessionSnapshot)
+            self._snapshot_timer.start()
             threading.Thread(
                 target=self._warmFreeThreadedWorker,
                 daemon=True,
                 name='southside-ft-worker-warmup',
             ).start()
+            threading.Thread(
+                target=self._pruneDiskCaches,
+                daemon=True,
+                name='southside-prune-caches',
+            ).start()
 
     @property
     def _app(self):
@@ -210,6 +244,7 @@ class PlayingManager:
         self.refreshRandom()
         self.clearReservedNext()
         self.clearPreload()
+        self._prefetcher.schedule()
 
     def _emitError(self, title: str, message: str) -> None:
         event_bus.emit(PLAYBACK_ERROR, title, message)
@@ -222,7 +257,25 @@ class PlayingManager:
     def _schedule(self, func: Callable, *args) -> None:
         self.ctx.addScheduledTask(func, *args)  # type: ignore
 
+    def _saveSessionSnapshot(self, block: bool = False) -> None:
+        player = self._player
+        song = self.current_song
+        if player is None or song is None or self.current_song_audio is None:
+            return
+        index = self.current_index
+        if not 0 <= index < len(self.playlist) or self.playlist[index].id != song.id:
+            return
+        saveSessionSnapshot(
+            self.playlist,
+            index,
+            player.getPosition(),
+            song,
+            self.current_song_audio,
+            block=block,
+        )
+
     def shutdownWorkers(self) -> None:
+        self._saveSessionSnapshot(block=True)
         self._play_seq += 1
         self._preload_download_seq += 1
         self._pending_play_selection = None
@@ -232,6 +285,7 @@ class PlayingManager:
         self._shutdownCrossfadePlayer()
         self._clearCrossfadePlaybackLoad()
         self.clearPreload()
+        self._prefetcher.stop()
         self._terminateStreamProcesses()
         self._ft_worker.shutdown()
 
@@ -280,17 +334,40 @@ class PlayingManager:
             except Exception:
                 pass
 
+    def _pruneDiskCaches(self) -> None:
+        self._prunePartialDownloads()
+        cover_images.pruneThumbnails()
+
+    def _prunePartialDownloads(self) -> None:
+        cutoff = timeLib.time() - _PARTIAL_DOWNLOAD_MAX_AGE
+        try:
+            names = os.listdir(MUSIC_DATA_DIR)
+        except OSError:
+            return
+        for name in names:
+            if not (name.startswith('stream_') and name.endswith('.part')):
+                continue
+            path = os.path.join(MUSIC_DATA_DIR, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    discardPartialDownload(path)
+            except OSError:
+                self._logger.debug(f'failed to prune partial download {name}')
+
     def _warmFreeThreadedWorker(self) -> None:
-        self._callFreeThreadedWorker('base64_decode', {'data': ''}, timeout=10.0)
+        self._callFreeThreadedWorker(
+            'base64_decode', {'data': ''}, timeout=10.0, priority=PRIORITY_BACKGROUND
+        )
 
     def _callFreeThreadedWorker(
         self,
         op: str,
         payload: dict[str, object],
         timeout: float,
+        priority: int = PRIORITY_INTERACTIVE,
     ) -> object | None:
         try:
-            return self._ft_worker.call(op, payload, timeout=timeout)
+            return self._ft_worker.call(op, payload, timeout=timeout, priority=priority)
         except Exception as e:
             self._logger.debug('free-threaded worker %s failed: %s', op, e)
             return None
@@ -310,6 +387,7 @@ class PlayingManager:
             return getAverageColorFromBytes(image_bytes)
         return [128, 128, 128]
 
+    @tracer.traced('loudness', 'audio')
     def _computeLoudnessGain(
         self,
         target_lufs: float,
@@ -326,6 +404,7 @@ class PlayingManager:
                     'frame_rate': int(audio.frame_rate),
                 },
                 timeout=30.0,
+                priority=PRIORITY_BACKGROUND,
             )
             if isinstance(result, (int, float)) and np.isfinite(result):
                 return float(result)
@@ -338,6 +417,7 @@ class PlayingManager:
             'base64_decode',
             {'data': data},
             timeout=10.0,
+            priority=PRIORITY_FOREGROUND,
         )
         if isinstance(result, bytes):
             return result
@@ -377,6 +457,7 @@ class PlayingManager:
         self._preload_download_seq += 1
         self._preload_download_song_id = None
         self._pending_play_selection = None
+        self._ft_worker.cancel(self._preload_token)
 
     def _cancelCrossfadePlayback(self) -> None:
         self._crossfade_generation += 1
@@ -421,6 +502,35 @@ class PlayingManager:
         selection = self.getNextSelection(mode, by_user, reserve)
         return selection.song if selection is not None else None
 
+    def upcomingSongs(self, count: int) -> list[SongStorable]:
+        """Best guess of the next ``count`` songs in play order."""
+        if not self.playlist or count <= 0:
+            return []
+        mode = self.play_mode
+        songs: list[SongStorable] = []
+        reserved = self._reserved_next
+        if self.isSelectionCurrent(reserved):
+            songs.append(reserved.song)  # type: ignore[union-attr]
+
+        if mode == 'Repeat one':
+            pass
+        elif mode == 'Shuffle':
+            for song in self._randomer.peek(count):
+                if song is not self.current_song and song not in songs:
+                    songs.append(song)
+        else:
+            index = self.current_index
+            for _ in range(min(count, len(self.playlist))):
+                index += 1
+                if index >= len(self.playlist):
+                    if mode != 'Repeat list':
+                        break
+                    index = 0
+                song = self.playlist[index]
+                if song is not self.current_song and song not in songs:
+                    songs.append(song)
+        return songs[:count]
+
     def consumeNextSelection(
         self,
         mode: PlayMode,
@@ -544,6 +654,7 @@ class PlayingManager:
         self._crossfade_started = True
         self.playNext(False)
 
+    @tracer.traced('crossfade', 'audio')
     def _computeCrossfadeInfo(
         self,
         current_audio: AudioSegment_ | None,
@@ -585,19 +696,15 @@ class PlayingManager:
         if total_seconds <= 0:
             return 0.0
         try:
-            lyrics = song.getLyrics()
+            parsed = getParsedLyrics(song)
         except Exception:
             self._logger.exception('failed to read lyrics for crossfade timing')
             return 0.0
         last_seconds = 0.0
-        for text in (
-            lyrics.get('yrc_lyric', ''),
-            lyrics.get('lyric', ''),
-            lyrics.get('ytlrc_lyric', ''),
-            lyrics.get('translated_lyric', ''),
-        ):
-            for match in _LYRIC_TIME_RE.finditer(text):
-                seconds = int(match.group(1)) * 60 + float(match.group(2))
+        for lrc in (parsed.lyric, parsed.ytlrc_lyric, parsed.translated_lyric):
+            for line in lrc.lines:
+                last_seconds = max(last_seconds, line.time)
+            for seconds in lrc.empty_times:
                 last_seconds = max(last_seconds, seconds)
         if last_seconds <= 0 or last_seconds >= total_seconds:
             return 0.0
@@ -668,6 +775,7 @@ class PlayingManager:
             self.preloadNextSong()
         if self.getNextSong(self.play_mode) is None:
             self.preloaded = True
+        self._prefetcher.schedule()
 
     def _setStorableLoudness(
         self,
@@ -679,9 +787,7 @@ class PlayingManager:
         song_id = str(song_storable.id)
 
         for folder in self._favs_ref:
-            for favorite in folder.songs:  # type: ignore
-                if str(favorite.id) != song_id:
-                    continue
+            for favorite in folder.findSongs(song_id):  # type: ignore
                 if (
                     favorite.target_lufs == target_lufs
                     and favorite.loudness_gain == gain
@@ -732,6 +838,8 @@ class PlayingManager:
 
             next_song = selection.song
             self._logger.debug(next_song)
+            self._ft_worker.cancel(self._preload_token)
+            preload_token = self._preload_token = CancelToken()
 
             def _is_preload_current() -> bool:
                 return self.isSelectionCurrent(selection)
@@ -785,21 +893,26 @@ class PlayingManager:
                 try:
                     lock = self._lock
                     if lock is None:
-                        song_bytes = next_song.getMusicBytes()
+                        song_path = next_song.getMusicPath()
                     else:
                         with lock:
-                            song_bytes = next_song.getMusicBytes()
+                            song_path = next_song.getMusicPath()
                     cache_key = next_song.content_cache_hash
                     cached = getCachedAudio(cache_key) if cache_key else None
                     if cached is not None:
                         audio = cached
                     else:
                         audio = decodeAudioWithSidecar(
-                            song_bytes,
+                            song_path,
                             self._ft_worker,
+                            priority=PRIORITY_PRELOAD,
+                            token=preload_token,
                         )
                         if cache_key:
                             cacheDecodedAudio(cache_key, audio)
+                except JobCancelled:
+                    self._logger.info('discarding cancelled preload')
+                    return
                 except Exception as e:
                     next_song.content_cache_hash = ''
                     saveFavorites()
@@ -851,7 +964,7 @@ class PlayingManager:
                     self.clearReservedNext()
                     self._schedule(self.playPreloadedSong, sel)
 
-            image_missing, music_missing = self._storable_asset_missing(next_song)
+            image_missing, music_missing = self.storableAssetsMissing(next_song)
             if image_missing or music_missing:
                 _download_then_preload(image_missing, music_missing)
             else:
@@ -1081,7 +1194,7 @@ class PlayingManager:
         self.clearPreload()
         self.playStorable(storable)
 
-    def _storable_asset_missing(self, song_storable: SongStorable) -> tuple[bool, bool]:
+    def storableAssetsMissing(self, song_storable: SongStorable) -> tuple[bool, bool]:
         backend = getBackend()
         return not song_storable.imageCached(), not song_storable.audioCached(
             backend.loggedIn(), int(backend.getUserVipType())
@@ -1094,6 +1207,12 @@ class PlayingManager:
         music_missing: bool,
         finished: Callable[[bool], None],
     ) -> None:
+        self._prefetcher.foregroundStarted()
+
+        def _finish(success: bool) -> None:
+            self._prefetcher.foregroundFinished()
+            finished(success)
+
         class PrepareInfo(TypedDict):
             error: Optional[str]
             image: Optional[bytes]
@@ -1106,7 +1225,7 @@ class PlayingManager:
                 if image_missing:
                     detail = getBackend().getTrackDetail(song_storable.id)
                     image_url = detail.cover_url
-                    prepared['image'] = requests.get(image_url).content
+                    prepared['image'] = http_client.fetch(image_url)
 
                 if music_missing:
                     audio = getBackend().getTrackAudio(
@@ -1147,14 +1266,14 @@ class PlayingManager:
                 return False
 
         def _play_after_persist(music_bytes: bytes | None = None) -> None:
-            finished(_persist_assets(music_bytes))
+            _finish(_persist_assets(music_bytes))
 
         def _on_prepared() -> None:
             if prepared.get('error'):
                 self._logger.warning(
                     f'failed to prepare storable asset download: {prepared["error"]}'
                 )
-                finished(False)
+                _finish(False)
                 return
 
             if music_missing:
@@ -1165,7 +1284,7 @@ class PlayingManager:
                         '(song %s may not support requested bitrate 3200k)',
                         song_storable.id,
                     )
-                    finished(False)
+                    _finish(False)
                     return
                 asyncDownload(
                     music_url,
@@ -1216,7 +1335,7 @@ class PlayingManager:
         song_storable: SongStorable,
         after_download: Callable[[], None] | None = None,
     ) -> bool:
-        image_missing, music_missing = self._storable_asset_missing(song_storable)
+        image_missing, music_missing = self.storableAssetsMissing(song_storable)
         if image_missing or music_missing:
             if (
                 self._preload_download_song_id is not None
@@ -1252,12 +1371,14 @@ class PlayingManager:
         if preloaded_audio is not None:
             return preloaded_audio
 
-        music_bytes = song_storable.getMusicBytes()
+        music_path = song_storable.getMusicPath()
         cache_key = song_storable.content_cache_hash
         cached = getCachedAudio(cache_key) if cache_key else None
         if cached is not None:
             return cached
-        audio = decodeAudioWithSidecar(music_bytes, self._ft_worker)
+        audio = decodeAudioWithSidecar(
+            music_path, self._ft_worker, priority=PRIORITY_FOREGROUND
+        )
         if cache_key:
             cacheDecodedAudio(cache_key, audio)
         return audio
@@ -1310,6 +1431,7 @@ class PlayingManager:
         self._show_original_lyrics(song_storable)
         self._compute_gain_async(song_storable, gain_audio)
         self._download_update_lyrics(song_storable)
+        self._prefetcher.schedule()
 
         event_bus.emit(SONG_CHANGED, song_storable)
         image_bytes = result.get('image')
@@ -1357,14 +1479,18 @@ class PlayingManager:
             error: Optional[str]
             image: Optional[bytes]
             music_url: Optional[str]
+            music_md5: Optional[str]
 
-        prepared: PrepareInfo = PrepareInfo(error=None, image=None, music_url=None)
+        prepared: PrepareInfo = PrepareInfo(
+            error=None, image=None, music_url=None, music_md5=None
+        )
         result: dict[str, object] = {}
         state = {
             'started': False,
             'starting': False,
             'download_success': False,
             'cancelled': False,
+            'resumable': False,
         }
         download_done = threading.Event()
         temp_path: Path | None = None
@@ -1398,8 +1524,11 @@ class PlayingManager:
             self._schedule(_apply)
 
         def _cleanup(path: Path) -> None:
+            if state['resumable']:
+                # keep the partial file and its manifest for the next attempt
+                return
             try:
-                path.unlink(missing_ok=True)
+                discardPartialDownload(str(path))
             except OSError:
                 self._logger.exception('failed to delete stream temp file')
 
@@ -1490,51 +1619,170 @@ class PlayingManager:
                     self._unregisterStreamProcess(process)
                 self._schedule(_on_stream_finished, path, success)
 
+        def _feed_decoder(
+            path: Path,
+            download: SegmentedDownload,
+            total_size: int,
+            process: subprocess.Popen[bytes],
+        ) -> None:
+            stdin = process.stdin
+            fed = 0
+            try:
+                with open(path, 'rb') as f:
+                    while fed < total_size and stdin is not None:
+                        available = download.waitContiguous(fed, timeout=0.5)
+                        if available is None:
+                            return
+                        f.seek(fed)
+                        while fed < available:
+                            chunk = f.read(min(available - fed, 65536))
+                            if not chunk:
+                                break
+                            stdin.write(chunk)
+                            stdin.flush()
+                            fed += len(chunk)
+            except (BrokenPipeError, OSError):
+                # the decoder went away; keep downloading for the cache
+                pass
+
+        def _download_segmented(
+            path: Path,
+            claim: PartialDownloadClaim,
+            music_url: str,
+            total_size: int,
+            etag: str,
+            process: subprocess.Popen[bytes],
+        ) -> bool:
+            md5 = prepared.get('music_md5') or ''
+            manifest = resumableManifest(
+                str(path),
+                md5 or f'{song_storable.id}:{total_size}',
+                total_size,
+                etag,
+            )
+            resumed = manifest.completedBytes()
+            if resumed:
+                self._logger.info(
+                    f'resuming stream download of {song_storable.id} at '
+                    f'{resumed}/{total_size} bytes'
+                )
+            with open(path, 'r+b' if path.exists() else 'wb') as f:
+                f.truncate(total_size)
+            state['resumable'] = True
+
+            def _progress(downloaded: int) -> None:
+                if not _is_current() or claim.cancel_requested:
+                    state['cancelled'] = True
+                    download.cancel()
+                    return
+                _on_progress(resumed + downloaded, total_size)
+
+            download = SegmentedDownload(
+                music_url,
+                total_size,
+                FileSink(str(path)),
+                _AUDIO_HEADERS,
+                max_connections=int(cfg.download_concurrent_threads),
+                progress=_progress,
+                sequential=True,
+                manifest=manifest,
+            )
+            # a replay of this song takes the file over once this run stops
+            claim.onCancel(download.cancel)
+            feeder = threading.Thread(
+                target=_feed_decoder,
+                args=(path, download, total_size, process),
+                daemon=True,
+            )
+            feeder.start()
+            try:
+                completed = download.run()
+            finally:
+                feeder.join()
+            if not completed or state['cancelled']:
+                return False
+            if md5 and fileMd5(str(path)) != md5.lower():
+                state['resumable'] = False
+                raise ValueError(f'checksum mismatch for streamed {song_storable.id}')
+            return True
+
+        def _download_sequential(
+            path: Path,
+            claim: PartialDownloadClaim,
+            music_url: str,
+            process: subprocess.Popen[bytes],
+        ) -> bool:
+            downloaded = 0
+            total_size = 0
+            with http_client.get(
+                music_url,
+                headers=_AUDIO_HEADERS,
+                stream=True,
+                timeout=30,
+            ) as response:
+                response.raise_for_status()
+                content_length = response.headers.get('content-length')
+                if content_length:
+                    total_size = int(content_length)
+
+                stdin = process.stdin
+                with open(path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=65536):
+                        if not chunk:
+                            continue
+                        if not _is_current() or claim.cancel_requested:
+                            state['cancelled'] = True
+                            return False
+                        f.write(chunk)
+                        f.flush()
+                        http_client.recordBytes(len(chunk))
+                        if stdin is not None:
+                            try:
+                                stdin.write(chunk)
+                                stdin.flush()
+                            except (BrokenPipeError, OSError):
+                                stdin = None
+                        downloaded += len(chunk)
+                        _on_progress(downloaded, total_size)
+            return True
+
         def _download(
             path: Path,
             music_url: str,
             process: subprocess.Popen[bytes],
         ) -> None:
             success = False
-            downloaded = 0
-            total_size = 0
+            claim: PartialDownloadClaim | None = None
+            self._prefetcher.foregroundStarted()
             try:
-                with requests.get(
-                    music_url,
-                    headers=_AUDIO_HEADERS,
-                    stream=True,
-                    timeout=30,
-                ) as response:
-                    response.raise_for_status()
-                    content_length = response.headers.get('content-length')
-                    if content_length:
-                        total_size = int(content_length)
-
-                    stdin = process.stdin
-                    with open(path, 'wb') as f:
-                        for chunk in response.iter_content(chunk_size=65536):
-                            if not chunk:
-                                continue
-                            if not _is_current():
-                                state['cancelled'] = True
-                                return
-                            f.write(chunk)
-                            f.flush()
-                            if stdin is not None:
-                                try:
-                                    stdin.write(chunk)
-                                    stdin.flush()
-                                except (BrokenPipeError, OSError):
-                                    stdin = None
-                            downloaded += len(chunk)
-                            _on_progress(downloaded, total_size)
+                # the prefetcher or an earlier play of this song may still be
+                # writing the file; wait for it to hand the file over
+                claim = claimPartialDownload(str(path))
+                if claim is None:
+                    return
+                probe = http_client.head(music_url, headers=_AUDIO_HEADERS, timeout=10)
+                probe.raise_for_status()
+                total_size = int(probe.headers.get('content-length', 0))
+                ranged = probe.headers.get('accept-ranges', '').lower() == 'bytes'
+                if total_size > 0 and ranged:
+                    completed = _download_segmented(
+                        path,
+                        claim,
+                        music_url,
+                        total_size,
+                        probe.headers.get('etag', ''),
+                        process,
+                    )
+                else:
+                    completed = _download_sequential(path, claim, music_url, process)
+                if not completed:
+                    return
 
                 success = True
                 if success:
                     try:
-                        with open(path, 'rb') as f:
-                            music_bytes = f.read()
-                        song_storable.cacheAudio(music_bytes)
+                        song_storable.cacheAudioFile(path)
+                        state['resumable'] = False
                         saveFavorites()
                     except Exception:
                         self._logger.exception(
@@ -1545,7 +1793,11 @@ class PlayingManager:
                 if not state['cancelled']:
                     self._logger.exception('failed to download streaming audio')
             finally:
+                self._prefetcher.foregroundFinished()
                 state['download_success'] = success
+                if claim is not None:
+                    _cleanup(path)
+                    claim.release()
                 try:
                     if process.stdin is not None:
                         process.stdin.close()
@@ -1561,7 +1813,6 @@ class PlayingManager:
             if not success:
                 if _is_current() and state['started'] and player is not None:
                     player.finishGrowingStream(path)
-                _cleanup(path)
                 if _is_current() and not state['started']:
                     if state['download_success']:
                         self.playStorable(song_storable)
@@ -1587,19 +1838,19 @@ class PlayingManager:
                     target=_refresh_current_audio,
                     daemon=True,
                 ).start()
-            _cleanup(path)
 
         def _prepare() -> None:
             try:
                 if image_missing:
                     detail = getBackend().getTrackDetail(song_storable.id)
-                    image_bytes = requests.get(detail.cover_url).content
+                    image_bytes = http_client.fetch(detail.cover_url)
                     prepared['image'] = image_bytes
                 audio = getBackend().getTrackAudio(
                     str(song_storable.id),
                     bitrate=3200 * 1000,
                 )
                 prepared['music_url'] = audio.url
+                prepared['music_md5'] = audio.md5
             except Exception as e:
                 prepared['error'] = str(e)
 
@@ -1638,16 +1889,12 @@ class PlayingManager:
                 return
 
             os.makedirs(MUSIC_DATA_DIR, exist_ok=True)
-            fd, raw_path = tempfile.mkstemp(
-                prefix='stream_', suffix='.part', dir=MUSIC_DATA_DIR
-            )
-            os.close(fd)
-            temp_path = Path(raw_path)
+            # a stable name lets an interrupted download resume from its manifest
+            temp_path = Path(MUSIC_DATA_DIR) / f'stream_{song_storable.id}.part'
             event_bus.emit(START_PROGRESS_LOADING)
             event_bus.emit(UPDATE_LOADING_PROGRESS, 0.0)
             player = self._player
             if player is None:
-                _cleanup(temp_path)
                 return
             try:
                 player.loadGrowingStream(
@@ -1680,7 +1927,6 @@ class PlayingManager:
                 )
                 self._registerStreamProcess(process)
             except Exception:
-                _cleanup(temp_path)
                 self._logger.exception('failed to start streaming decoder')
                 self._emitError(
                     tr('playing_manager.playback_failed'),
@@ -1736,7 +1982,7 @@ class PlayingManager:
         self._last_storable = self.current_song
 
         self._cancelCrossfadePlayback()
-        image_missing, music_missing = self._storable_asset_missing(song_storable)
+        image_missing, music_missing = self.storableAssetsMissing(song_storable)
         player.stop()
         player.setVolume(1.0)
         self.current_song = song_storable
@@ -1791,7 +2037,21 @@ class PlayingManager:
             mwindow = self._mwindow_obj
             if mwindow is not None:
                 mwindow._loading_song = True
-            audio = self._loadStorableAudio(song_storable, preloaded_audio)
+            source_audio = preloaded_audio
+            partial_path: Path | None = None
+            session = takeSessionAudio(song_storable) if source_audio is None else None
+            if session is not None:
+                session_audio, complete = session
+                if complete:
+                    source_audio = session_audio
+                elif (restore_position or 0.0) < (
+                    session_audio.duration_seconds - _SESSION_PREFIX_MARGIN
+                ):
+                    # play the snapshot's first seconds while the rest decodes
+                    partial_path = Path(song_storable.getMusicPath())
+                    player.loadPartial(partial_path, session_audio)
+                    self._startLoadedAudio(restore_position, pause_after_load)
+            audio = self._loadStorableAudio(song_storable, source_audio)
 
             if mwindow is not None:
                 mwindow._loading_song = False
@@ -1800,7 +2060,10 @@ class PlayingManager:
                 return
             result['audio'] = audio
             self.current_song_audio = audio
-            player.load(audio)
+            if partial_path is not None:
+                player.finishGrowingFile(partial_path, audio)
+            else:
+                player.load(audio)
             if not _is_current_playback():
                 return
             self.total_length = self._storableDuration(
@@ -1808,13 +2071,8 @@ class PlayingManager:
                 player.getLength(),
             )
             self._applyStoredLoudnessGain(song_storable)
-            if not player.isPlaying():
-                player.play()
-
-            if restore_position is not None:
-                player.setPosition(restore_position)
-            if pause_after_load:
-                player.pause()
+            if partial_path is None:
+                self._startLoadedAudio(restore_position, pause_after_load)
 
             self._loadPlaybackImage(song_storable, result)
 
@@ -1830,16 +2088,27 @@ class PlayingManager:
 
         asyncTask(_prepare, (), self._mwindow_obj, _finish)
 
+    def _startLoadedAudio(
+        self, restore_position: float | None, pause_after_load: bool
+    ) -> None:
+        player = self._player
+        if player is None:
+            return
+        if not player.isPlaying():
+            player.play()
+
+        if restore_position is not None:
+            player.setPosition(restore_position)
+        if pause_after_load:
+            player.pause()
+
     def _show_original_lyrics(self, song_storable: SongStorable) -> None:
         if not self.ctx:
             return
-        lyrics = song_storable.getLyrics()
-        self.ctx.mgr.cur = lyrics['lyric'] or '[00:00.000]'
-        self.ctx.transmgr.cur = ''
-        self.ctx.ymgr.cur = ''
-        self.ctx.mgr.parse()
-        self.ctx.transmgr.parse()
-        self.ctx.ymgr.parse()
+        parsed = getParsedLyrics(song_storable)
+        self.ctx.mgr.loadParsed(parsed.lyric.lines, parsed.lyric.empty_times)
+        self.ctx.transmgr.loadParsed([], [])
+        self.ctx.ymgr.loadParsed([])
         event_bus.emit(PLAYBACK_LYRICS_UPDATED, song_storable)
 
     def _compute_gain_async(
@@ -1865,62 +2134,53 @@ class PlayingManager:
 
         threading.Thread(target=_compute_and_apply, daemon=True).start()
 
+    def downloadMissingLyrics(self, song_storable: SongStorable) -> None:
+        need_yrc = song_storable.yrcLyricsMissing()
+        need_translated_lyric = song_storable.translatedLyricsMissing()
+        need_ytlrc = song_storable.ytlrcMissing()
+        if not (need_yrc or need_translated_lyric or need_ytlrc):
+            return
+        try:
+            lyric_result = getBackend().getTrackLyrics(song_storable.id)
+        except Exception:
+            self._logger.exception('failed to download lyrics for storable playback')
+            return
+        yrc_lyric = lyric_result.yrc_lyric or ''
+        ytlrc = lyric_result.ytlrc_lyric or ''
+        if yrc_lyric and ytlrc:
+            translated_lyric = ytlrc
+        else:
+            translated_lyric = lyric_result.translated_lyric or ''
+        song_storable.writeLyrics(
+            lyric_result.lyric or '[00:00.000]',
+            translated_lyric,
+            yrc_lyric,
+            ytlrc,
+        )
+        saveFavorites()
+
     def _download_update_lyrics(self, song_storable: SongStorable) -> None:
         lyric_target = song_storable
-        lyric_result: TrackLyricsInfo | None = None
+        parsed: ParsedLyrics | None = None
 
         def _download() -> None:
-            nonlocal lyric_result
-            need_yrc = song_storable.yrcLyricsMissing()
-            need_translated_lyric = song_storable.translatedLyricsMissing()
-            need_ytlrc = song_storable.ytlrcMissing()
-            if not need_yrc and not need_translated_lyric and not need_ytlrc:
-                return
+            nonlocal parsed
+            self.downloadMissingLyrics(lyric_target)
             try:
-                lyric_result = getBackend().getTrackLyrics(song_storable.id)
+                parsed = getParsedLyrics(lyric_target)
             except Exception:
-                self._logger.exception(
-                    'failed to download lyrics for storable playback'
-                )
-                lyric_result = None
+                self._logger.exception('failed to parse lyrics for storable playback')
 
         def _apply() -> None:
             if self.current_song is not lyric_target:
                 return
+            if not self.ctx or parsed is None:
+                return
 
-            if self.ctx:
-                mgr = self.ctx.mgr
-                transmgr = self.ctx.transmgr
-                ymgr = self.ctx.ymgr
-
-            if lyric_result is None:
-                lyrics = lyric_target.getLyrics()
-                mgr.cur = lyrics['lyric'] or '[00:00.000]'
-                ymgr.cur = lyrics['yrc_lyric']
-                ytlrc = lyrics.get('ytlrc_lyric', '')
-                if ymgr.cur and ytlrc:
-                    transmgr.cur = ytlrc
-                else:
-                    transmgr.cur = lyrics['translated_lyric'] or '[00:00.000]'
-            else:
-                mgr.cur = lyric_result.lyric or '[00:00.000]'
-                ymgr.cur = lyric_result.yrc_lyric or ''
-                ytlrc = lyric_result.ytlrc_lyric or ''
-                if ymgr.cur and ytlrc:
-                    transmgr.cur = ytlrc
-                else:
-                    transmgr.cur = lyric_result.translated_lyric or '[00:00.000]'
-                lyric_target.writeLyrics(
-                    mgr.cur,
-                    transmgr.cur if transmgr.cur != '[00:00.000]' else '',
-                    ymgr.cur,
-                    ytlrc,
-                )
-                saveFavorites()
-
-            mgr.parse()
-            transmgr.parse()
-            ymgr.parse()
+            translation = parsed.translation
+            self.ctx.mgr.loadParsed(parsed.lyric.lines, parsed.lyric.empty_times)
+            self.ctx.transmgr.loadParsed(translation.lines, translation.empty_times)
+            self.ctx.ymgr.loadParsed(parsed.yrc_lyric)
             event_bus.emit(PLAYBACK_LYRICS_UPDATED, lyric_target)
 
         asyncTask(_download, (), self._mwindow_obj, _apply)
@@ -1932,10 +2192,14 @@ class PlayingManager:
         self._logger.debug(f'loading data {len(music_bytes)}')
         lock = self._lock
         if lock is None:
-            audio = decodeAudioWithSidecar(music_bytes, self._ft_worker)
+            audio = decodeAudioWithSidecar(
+                music_bytes, self._ft_worker, priority=PRIORITY_FOREGROUND
+            )
         else:
             with lock:
-                audio = decodeAudioWithSidecar(music_bytes, self._ft_worker)
+                audio = decodeAudioWithSidecar(
+                    music_bytes, self._ft_worker, priority=PRIORITY_FOREGROUND
+                )
 
         self._logger.debug(f'applying gain {gain} {cfg.target_lufs=}')
         audio = audio.apply_gain(20 * np.log10(gain))
@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import logging
+import os
+from pathlib import Path
+import shutil
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from core.backend import getBackend
+from core.downloader import (
+    FileSink,
+    PartialDownloadClaim,
+    SegmentedDownload,
+    claimPartialDownload,
+    discardPartialDownload,
+    fileMd5,
+    resumableManifest,
+)
+from core.favorites import saveFavorites
+from core.http_client import http_client
+from core.lyrics_cache import getParsedLyrics
+from core.models import MUSIC_DATA_DIR, SongStorable
+from services.events.event_bus import event_bus
+from services.events.events import (
+    COLLECT_DEBUG_INFO,
+    EMIT_DEBUG_INFO,
+    IMAGE_ASSET_PERSISTED,
+)
+
+if TYPE_CHECKING:
+    from core.playing_manager import PlayingManager
+
+_logger = logging.getLogger(__name__)
+
+_PREFETCH_AHEAD = 3
+_PREFETCH_CONNECTIONS = 2
+_PREFETCH_MAX_BYTES_PER_SECOND = 2 * 1024 * 1024
+_PREFETCH_SESSION_BUDGET = 1024 * 1024 * 1024
+_PREFETCH_MIN_FREE_DISK = 1024 * 1024 * 1024
+_PREFETCH_BITRATE = 3200 * 1000
+
+
+class _PrefetchCancelled(Exception):
+    pass
+
+
+class PrefetchScheduler:
+    """Caches audio, covers and lyrics of the next few songs in play order.
+
+    Works through one song at a time on a background thread, throttled to a
+    bandwidth budget, and waits while a foreground download is running.
+    Rescheduling drops queued songs that are no longer upcoming and cancels
+    the song in progress if it left the queue. The partial audio file is
+    claimed without preempting anyone, and handed over as soon as the
+    foreground claims it.
+    """
+
+    def __init__(self, manager: PlayingManager) -> None:
+        self._manager = manager
+        self._cond = threading.Condition()
+        self._queue: list[SongStorable] = []
+        self._current: SongStorable | None = None
+        self._download: SegmentedDownload | None = None
+        self._foreground = 0
+        self._stopped = False
+        self._thread: threading.Thread | None = None
+        self._session_bytes = 0
+        self._bucket_started = time.monotonic()
+        self._bucket_bytes = 0
+        self.completed = 0
+        self.cancelled = 0
+
+        event_bus.subscribe(COLLECT_DEBUG_INFO, self.emitDebugInfo)
+
+    def schedule(self) -> None:
+        """Recompute the upcoming songs; call on the GUI thread."""
+        songs = self._manager.upcomingSongs(_PREFETCH_AHEAD)
+        with self._cond:
+            if self._stopped:
+                return
+            current = self._current
+            self._queue = [song for song in songs if song is not current]
+            if current is not None and all(song is not current for song in songs):
+                self._current = None
+                if self._download is not None:
+                    self._download.cancel()
+            if self._queue and (self._thread is None or not self._thread.is_alive()):
+                self._thread = threading.Thread(
+                    target=self._run, daemon=True, name='southside-prefetch'
+                )
+                self._thread.start()
+            self._cond.notify_all()
+
+    def foregroundStarted(self) -> None:
+        with self._cond:
+            self._foreground += 1
+
+    def foregroundFinished(self) -> None:
+        with self._cond:
+            self._foreground = max(0, self._foreground - 1)
+            self._cond.notify_all()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._queue.clear()
+            if self._download is not None:
+                self._download.cancel()
+            self._cond.notify_all()
+
+    def emitDebugInfo(self) -> None:
+        with self._cond:
+            queued = len(self._queue)
+            current = self._current.name if self._current else None
+            foreground = self._foreground
+        event_bus.emit(
+            EMIT_DEBUG_INFO,
+            'PrefetchScheduler',
+            [
+                f'queued={queued}',
+                f'current={current}',
+                f'paused={foreground > 0}',
+                f'completed={self.completed}',
+                f'cancelled={self.cancelled}',
+                f'session_bytes={self._session_bytes}',
+            ],
+        )
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._stopped or (self._queue and not self._foreground)
+                )
+                if self._stopped:
+                    return
+                song = self._queue.pop(0)
+                self._current = song
+            try:
+                self._prefetch(song)
+                self.completed += 1
+            except _PrefetchCancelled:
+                self.cancelled += 1
+            except Exception:
+                _logger.exception(f'failed to prefetch {song.id}')
+            finally:
+                with self._cond:
+                    self._current = None
+                    self._download = None
+
+    def _queuedLocked(self, song: SongStorable) -> bool:
+        return not self._stopped and (
+            self._current is song or any(item is song for item in self._queue)
+        )
+
+    def _isQueued(self, song: SongStorable) -> bool:
+        with self._cond:
+            return self._queuedLocked(song)
+
+    def _prefetch(self, song: SongStorable) -> None:
+        image_missing, music_missing = self._manager.storableAssetsMissing(song)
+        if image_missing:
+            detail = getBackend().getTrackDetail(song.id)
+            song.cacheImage(http_client.fetch(detail.cover_url))
+            saveFavorites()
+            # listeners update widgets, so they must run on the GUI thread
+            ctx = self._manager.ctx
+            if ctx is not None:
+                ctx.addScheduledTask(event_bus.emit, IMAGE_ASSET_PERSISTED, song)
+
+        self._manager.downloadMissingLyrics(song)
+        getParsedLyrics(song)
+
+        if music_missing and self._withinDiskBudget():
+            self._prefetchAudio(song)
+
+    def _withinDiskBudget(self) -> bool:
+        if self._session_bytes >= _PREFETCH_SESSION_BUDGET:
+            return False
+        try:
+            return shutil.disk_usage(MUSIC_DATA_DIR).free >= _PREFETCH_MIN_FREE_DISK
+        except OSError:
+            return False
+
+    def _prefetchAudio(self, song: SongStorable) -> None:
+        audio = getBackend().getTrackAudio(str(song.id), bitrate=_PREFETCH_BITRATE)
+        if not audio.url:
+            return
+        probe = http_client.head(audio.url, timeout=10)
+        probe.raise_for_status()
+        total_size = int(probe.headers.get('content-length', 0))
+        if total_size <= 0 or probe.headers.get('accept-ranges', '').lower() != 'bytes':
+            return
+
+        os.makedirs(MUSIC_DATA_DIR, exist_ok=True)
+        # same name as the streaming player uses, so either side can resume it
+        path = Path(MUSIC_DATA_DIR) / f'stream_{song.id}.part'
+        claim = claimPartialDownload(str(path), preempt=False)
+        if claim is None:
+            # the foreground is streaming this song already
+            return
+        with claim:
+            self._downloadAudio(
+                song,
+                path,
+                claim,
+                audio.url,
+                audio.md5,
+                total_size,
+                probe.headers.get('etag', ''),
+            )
+
+    def _downloadAudio(
+        self,
+        song: SongStorable,
+        path: Path,
+        claim: PartialDownloadClaim,
+        url: str,
+        md5: str | None,
+        total_size: int,
+        etag: str,
+    ) -> None:
+        manifest = resumableManifest(
+            str(path),
+            md5 or f'{song.id}:{total_size}',
+            total_size,
+            etag,
+        )
+        with open(path, 'r+b' if path.exists() else 'wb') as f:
+            f.truncate(total_size)
+
+        received = 0
+
+        def _progress(downloaded: int) -> None:
+            nonlocal received
+            with self._cond:
+                delay = self._throttleDelay(max(0, downloaded - received))
+                received = max(received, downloaded)
+            if delay > 0:
+                time.sleep(delay)
+            with self._cond:
+                # hold the connection back while the foreground needs bandwidth
+                self._cond.wait_for(
+                    lambda: (
+                        not self._foreground
+                        or claim.cancel_requested
+                        or not self._queuedLocked(song)
+                    )
+                )
+
+        download = SegmentedDownload(
+            url,
+            total_size,
+            FileSink(str(path)),
+            max_connections=_PREFETCH_CONNECTIONS,
+            progress=_progress,
+            manifest=manifest,
+        )
+        with self._cond:
+            self._download = download
+        claim.onCancel(lambda: self._yieldDownload(download))
+        if not self._isQueued(song) or claim.cancel_requested:
+            raise _PrefetchCancelled
+        # run() returns only once every connection has stopped writing, so
+        # the claim is released with the file and manifest at rest
+        completed = download.run()
+        if not completed or claim.cancel_requested or not self._isQueued(song):
+            raise _PrefetchCancelled
+        self._session_bytes += received
+
+        if md5 and fileMd5(str(path)) != md5.lower():
+            discardPartialDownload(str(path))
+            raise ValueError(f'checksum mismatch for prefetched {song.id}')
+        song.cacheAudioFile(path)
+        discardPartialDownload(str(path))
+        saveFavorites()
+        _logger.info(f'prefetched {song.id} ({total_size} bytes)')
+
+    def _yieldDownload(self, download: SegmentedDownload) -> None:
+        download.cancel()
+        with self._cond:
+            # wake a connection held back in _progress
+            self._cond.notify_all()
+
+    def _throttleDelay(self, size: int) -> float:
+        now = time.monotonic()
+        if now - self._bucket_started >= 1.0:
+            self._bucket_started = now
+            self._bucket_bytes = 0
+        self._bucket_bytes += size
+        excess = self._bucket_bytes - _PREFETCH_MAX_BYTES_PER_SECOND
+        return excess / _PREFETCH_MAX_BYTES_PER_SECOND if excess > 0 else 0.0
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor
+import logging
+import threading
+import time
+from typing import Callable, Generic, Hashable, TypeVar
+
+from services.events.event_bus import event_bus
+from services.events.events import COLLECT_DEBUG_INFO, EMIT_DEBUG_INFO
+
+_logger = logging.getLogger(__name__)
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+_BATCH_WINDOW = 0.005
+_MAX_BATCH = 1000
+_MAX_INFLIGHT_BATCHES = 4
+
+
+class RequestBatcher(Generic[K, V]):
+    """Coalesces single-key lookups from many threads into batched calls.
+
+    ``fetch`` receives up to ``max_batch`` keys and returns a mapping from key
+    to value; keys missing from the mapping fail with ``KeyError``. Lookups of
+    a key that is already pending or in flight share its future.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fetch: Callable[[list[K]], dict[K, V]],
+        window: float = _BATCH_WINDOW,
+        max_batch: int = _MAX_BATCH,
+    ) -> None:
+        self.name = name
+        self._fetch = fetch
+        self._window = window
+        self._max_batch = max_batch
+        self._cond = threading.Condition()
+        self._pending: dict[K, Future[V]] = {}
+        self._inflight: dict[K, Future[V]] = {}
+        self._thread: threading.Thread | None = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=_MAX_INFLIGHT_BATCHES,
+            thread_name_prefix=f'southside-batch-{name}',
+        )
+        self.lookups = 0
+        self.batches = 0
+        self.shared = 0
+
+        event_bus.subscribe(COLLECT_DEBUG_INFO, self.emitDebugInfo)
+
+    def submit(self, key: K) -> Future[V]:
+        with self._cond:
+            self.lookups += 1
+            future = self._pending.get(key) or self._inflight.get(key)
+            if future is not None:
+                self.shared += 1
+                return future
+            future = Future()
+            self._pending[key] = future
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    daemon=True,
+                    name=f'southside-batcher-{self.name}',
+                )
+                self._thread.start()
+            self._cond.notify_all()
+            return future
+
+    def get(self, key: K, timeout: float | None = None) -> V:
+        return self.submit(key).result(timeout)
+
+    def emitDebugInfo(self) -> None:
+        with self._cond:
+            pending = len(self._pending)
+            inflight = len(self._inflight)
+        event_bus.emit(
+            EMIT_DEBUG_INFO,
+            f'RequestBatcher[{self.name}]',
+            [
+                f'lookups={self.lookups}',
+                f'batches={self.batches}',
+                f'shared={self.shared}',
+                f'pending={pending}',
+                f'inflight={inflight}',
+            ],
+        )
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: bool(self._pending))
+                # give concurrent callers a moment to join this batch
+                deadline = time.monotonic() + self._window
+                while len(self._pending) < self._max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                keys = list(self._pending)[: self._max_batch]
+                batch = {key: self._pending.pop(key) for key in keys}
+                self._inflight.update(batch)
+                self.batches += 1
+            self._executor.submit(self._dispatch, batch)
+
+    def _dispatch(self, batch: dict[K, Future[V]]) -> None:
+        try:
+            results = self._fetch(list(batch))
+        except Exception as e:
+            _logger.warning(f'{self.name} batch of {len(batch)} failed: {e}')
+            for future in batch.values():
+                future.set_exception(e)
+        else:
+            for key, future in batch.items():
+                if key in results:
+                    future.set_result(results[key])
+                else:
+                    future.set_exception(KeyError(key))
+        finally:
+            with self._cond:
+                for key in batch:
+                    self._inflight.pop(key, None)
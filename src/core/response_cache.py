@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+import glob
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Hashable
+
+from services.events.event_bus import event_bus
+from services.events.events import COLLECT_DEBUG_INFO, EMIT_DEBUG_INFO
+
+_logger = logging.getLogger(__name__)
+
+_MAX_ENTRIES = 256
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    ttl: float
+    persist: bool = False
+
+
+class ResponseCache:
+    """TTL cache for read-only API responses.
+
+    Values must be JSON-serialisable when their endpoint persists to disk.
+    Concurrent loads of the same key share one call, and invalidating an
+    endpoint also discards loads that were in flight when it happened. The
+    coroutine variant keeps disk access off the event loop.
+    """
+
+    def __init__(
+        self,
+        policies: dict[str, CachePolicy],
+        disk_dir: str | None = None,
+        max_entries: int = _MAX_ENTRIES,
+    ) -> None:
+        self._policies = policies
+        self._disk_dir = disk_dir
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[str, Hashable], tuple[float, Any]] = (
+            OrderedDict()
+        )
+        self._inflight: dict[tuple[str, Hashable], Future[Any]] = {}
+        self._inflight_async: dict[tuple[str, Hashable], asyncio.Future[Any]] = {}
+        self._generations: dict[str, int] = {}
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.shared = 0
+
+        event_bus.subscribe(COLLECT_DEBUG_INFO, self.emitDebugInfo)
+
+    def get(self, endpoint: str, key: Hashable, load: Callable[[], Any]) -> Any:
+        policy = self._policies.get(endpoint)
+        if policy is None:
+            return load()
+
+        entry_key = (endpoint, key)
+        with self._lock:
+            found, value = self._lookupLocked(entry_key)
+            if found:
+                return value
+            future = self._inflight.get(entry_key)
+            owner = future is None
+            if future is None:
+                future = Future()
+                self._inflight[entry_key] = future
+            else:
+                self.shared += 1
+            generation = self._generations.get(endpoint, 0)
+        if not owner:
+            return future.result()
+
+        try:
+            cached = self._readDisk(endpoint, key) if policy.persist else None
+            if cached is None:
+                with self._lock:
+                    self.misses += 1
+                value = load()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(entry_key, None)
+            future.set_exception(e)
+            raise
+
+        value = self._store(endpoint, key, generation, policy, cached, value)
+        with self._lock:
+            self._inflight.pop(entry_key, None)
+        future.set_result(value)
+        return value
+
+    async def getAsync(
+        self, endpoint: str, key: Hashable, load: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Coroutine variant of ``get`` for the asyncio API client."""
+        policy = self._policies.get(endpoint)
+        if policy is None:
+            return await load()
+
+        entry_key = (endpoint, key)
+        with self._lock:
+            found, value = self._lookupLocked(entry_key)
+            if found:
+                return value
+            # a synchronous load of the key may be running on another thread
+            shared = self._inflight.get(entry_key)
+            future = self._inflight_async.get(entry_key)
+            owner = shared is None and future is None
+            if owner:
+                future = asyncio.get_running_loop().create_future()
+                # nobody may await it; don't log its exception as unretrieved
+                future.add_done_callback(lambda f: f.cancelled() or f.exception())
+                self._inflight_async[entry_key] = future
+            else:
+                self.shared += 1
+            generation = self._generations.get(endpoint, 0)
+        if shared is not None:
+            return await asyncio.wrap_future(shared)
+        assert future is not None
+        if not owner:
+            return await asyncio.shield(future)
+
+        try:
+            cached = None
+            if policy.persist:
+                cached = await asyncio.to_thread(self._readDisk, endpoint, key)
+            if cached is None:
+                with self._lock:
+                    self.misses += 1
+                value = await load()
+            value, expires = self._remember(
+                endpoint, key, generation, policy, cached, value
+            )
+        except BaseException as e:
+            with self._lock:
+                self._inflight_async.pop(entry_key, None)
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._inflight_async.pop(entry_key, None)
+        future.set_result(value)
+        if expires is not None:
+            await asyncio.to_thread(self._writeDisk, endpoint, key, expires, value)
+        return value
+
+    def invalidate(self, endpoint: str, key: Hashable | None = None) -> None:
+        """Drop one key of ``endpoint``, or every key when ``key`` is None."""
+        with self._lock:
+            self._generations[endpoint] = self._generations.get(endpoint, 0) + 1
+            if key is None:
+                for entry_key in [k for k in self._entries if k[0] == endpoint]:
+                    del self._entries[entry_key]
+            else:
+                self._entries.pop((endpoint, key), None)
+        if self._disk_dir is None:
+            return
+        if key is None:
+            paths = glob.glob(os.path.join(self._disk_dir, f'{endpoint}-*.json'))
+        else:
+            paths = [self._diskPath(endpoint, key)]
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                _logger.exception(f'failed to remove cached response {path}')
+
+    def _lookupLocked(self, entry_key: tuple[str, Hashable]) -> tuple[bool, Any]:
+        entry = self._entries.get(entry_key)
+        if entry is None:
+            return False, None
+        if entry[0] <= time.monotonic():
+            del self._entries[entry_key]
+            return False, None
+        self._entries.move_to_end(entry_key)
+        self.hits += 1
+        return True, entry[1]
+
+    def _store(
+        self,
+        endpoint: str,
+        key: Hashable,
+        generation: int,
+        policy: CachePolicy,
+        cached: tuple[float, Any] | None,
+        value: Any,
+    ) -> Any:
+        value, expires = self._remember(
+            endpoint, key, generation, policy, cached, value
+        )
+        if expires is not None:
+            self._writeDisk(endpoint, key, expires, value)
+        return value
+
+    def _remember(
+        self,
+        endpoint: str,
+        key: Hashable,
+        generation: int,
+        policy: CachePolicy,
+        cached: tuple[float, Any] | None,
+        value: Any,
+    ) -> tuple[Any, float | None]:
+        """Keep ``value`` in memory; return it with the expiry to persist, if any."""
+        if cached is not None:
+            expires, value = cached
+        else:
+            expires = time.time() + policy.ttl
+        entry_key = (endpoint, key)
+        with self._lock:
+            if cached is not None:
+                self.disk_hits += 1
+            current = self._generations.get(endpoint, 0) == generation
+            if current:
+                remaining = max(0.0, expires - time.time())
+                self._entries[entry_key] = (time.monotonic() + remaining, value)
+                self._entries.move_to_end(entry_key)
+                while len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+        if current and cached is None and policy.persist:
+            return value, expires
+        return value, None
+
+    def emitDebugInfo(self) -> None:
+        with self._lock:
+            entries = len(self._entries)
+            inflight = len(self._inflight) + len(self._inflight_async)
+        event_bus.emit(
+            EMIT_DEBUG_INFO,
+            'ResponseCache',
+            [
+                f'entries={entries}',
+                f'hits={self.hits}',
+                f'disk_hits={self.disk_hits}',
+                f'misses={self.misses}',
+                f'shared={self.shared}',
+                f'inflight={inflight}',
+            ],
+        )
+
+    def _diskPath(self, endpoint: str, key: Hashable) -> str:
+        assert self._disk_dir is not None
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self._disk_dir, f'{endpoint}-{digest}.json')
+
+    def _readDisk(self, endpoint: str, key: Hashable) -> tuple[float, Any] | None:
+        if self._disk_dir is None:
+            return None
+        try:
+            with open(self._diskPath(endpoint, key), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            expires = float(data['expires'])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if expires <= time.time() or data.get('key') != repr(key):
+            return None
+        return expires, data['value']
+
+    def _writeDisk(
+        self, endpoint: str, key: Hashable, expires: float, value: Any
+    ) -> None:
+        if self._disk_dir is None:
+            return
+        path = self._diskPath(endpoint, key)
+        tmp_path = f'{path}.tmp'
+        try:
+            os.makedirs(self._disk_dir, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(
+                    {'key': repr(key), 'expires': expires, 'value': value},
+                    f,
+                    ensure_ascii=False,
+                    separators=(',', ':'),
+                )
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError):
+            _logger.exception(f'failed to persist cached response {path}')
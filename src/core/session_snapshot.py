@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import json
+import logging
+import os
+import threading
+from typing import TYPE_CHECKING, Any
+
+from core.models import DATA_DIR, SongStorable
+
+if TYPE_CHECKING:
+    from pydub import AudioSegment
+
+_logger = logging.getLogger(__name__)
+
+SNAPSHOT_PATH = os.path.join(DATA_DIR, 'session_snapshot.json')
+SNAPSHOT_PCM_PATH = os.path.join(DATA_DIR, 'session_snapshot.pcm')
+_SNAPSHOT_VERSION = 2
+# only the start of the song is kept; the rest decodes while it plays
+_PCM_PREFIX_SECONDS = 30
+# drop the PCM read at boot if no playback has claimed it by then
+_PCM_KEEP_SECONDS = 60.0
+
+
+@dataclass
+class SessionSnapshot:
+    song_ids: list[str]
+    index: int
+    position: float
+    pcm_song_id: str = ''
+    pcm_source: tuple[int, int] | None = None
+    frame_rate: int = 0
+    channels: int = 0
+    sample_width: int = 0
+    # whether the PCM holds the whole song rather than its first seconds
+    pcm_complete: bool = False
+
+    def matchesPlaylist(self, playlist: list[SongStorable]) -> bool:
+        return self.song_ids == [song.id for song in playlist]
+
+
+_snapshot: SessionSnapshot | None = None
+_pcm_data: bytes | None = None
+_pcm_ready = threading.Event()
+_pcm_released = False
+_load_started = False
+_write_lock = threading.Lock()
+_written_pcm_key: tuple[str, tuple[int, int]] | None = None
+
+
+def _musicStamp(song: SongStorable) -> tuple[int, int] | None:
+    try:
+        st = os.stat(song.getMusicPath())
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _parseSnapshot(data: Any) -> SessionSnapshot | None:
+    if not isinstance(data, dict) or data.get('version') != _SNAPSHOT_VERSION:
+        return None
+    try:
+        source = data.get('pcm_source')
+        return SessionSnapshot(
+            song_ids=[str(song_id) for song_id in data['song_ids']],
+            index=int(data['index']),
+            position=float(data['position']),
+            pcm_song_id=str(data.get('pcm_song_id', '')),
+            pcm_source=(int(source[0]), int(source[1])) if source else None,
+            frame_rate=int(data.get('frame_rate', 0)),
+            channels=int(data.get('channels', 0)),
+            sample_width=int(data.get('sample_width', 0)),
+            pcm_complete=bool(data.get('pcm_complete', False)),
+        )
+    except (KeyError, TypeError, ValueError, IndexError):
+        return None
+
+
+def _readPcm() -> None:
+    global _pcm_data
+    try:
+        with open(SNAPSHOT_PCM_PATH, 'rb') as f:
+            data = f.read()
+        _logger.info(f'read session pcm {len(data)} bytes')
+        if not _pcm_released:
+            _pcm_data = data
+    except OSError:
+        _pcm_data = None
+    finally:
+        _pcm_ready.set()
+
+
+def releaseSessionAudio() -> None:
+    """Drop the snapshot PCM; later ``takeSessionAudio`` calls return None."""
+    global _pcm_data, _pcm_released
+    _pcm_released = True
+    _pcm_data = None
+
+
+def loadSessionSnapshot() -> SessionSnapshot | None:
+    """Read the snapshot and start reading its PCM in the background."""
+    global _snapshot, _load_started, _written_pcm_key
+    if _load_started:
+        return _snapshot
+    _load_started = True
+    try:
+        with open(SNAPSHOT_PATH, 'r', encoding='utf-8') as f:
+            _snapshot = _parseSnapshot(json.load(f))
+    except (OSError, ValueError):
+        _snapshot = None
+
+    if _snapshot is None or not _snapshot.pcm_song_id or _snapshot.pcm_source is None:
+        _pcm_ready.set()
+        return _snapshot
+
+    _written_pcm_key = (_snapshot.pcm_song_id, _snapshot.pcm_source)
+    threading.Thread(target=_readPcm, daemon=True, name='southside-session-pcm').start()
+    release_timer = threading.Timer(_PCM_KEEP_SECONDS, releaseSessionAudio)
+    release_timer.daemon = True
+    release_timer.start()
+    return _snapshot
+
+
+def getSessionSnapshot() -> SessionSnapshot | None:
+    return _snapshot
+
+
+def takeSessionAudio(song: SongStorable) -> tuple[AudioSegment, bool] | None:
+    """Return the snapshot PCM of ``song`` and whether it is the whole song.
+
+    Only the first playback gets a chance at it: the PCM is released on the
+    first call, whichever song it is for.
+    """
+    snapshot = _snapshot
+    if snapshot is None or snapshot.pcm_song_id != song.id:
+        releaseSessionAudio()
+        return None
+    _pcm_ready.wait()
+    data = _pcm_data
+    releaseSessionAudio()
+    if not data or snapshot.pcm_source != _musicStamp(song):
+        return None
+    frame_width = snapshot.channels * snapshot.sample_width
+    if frame_width <= 0 or snapshot.frame_rate <= 0 or len(data) % frame_width:
+        return None
+
+    from core.audio_player import PatchedAudioSegment
+
+    audio = PatchedAudioSegment(
+        data=data,
+        sample_width=snapshot.sample_width,
+        frame_rate=snapshot.frame_rate,
+        channels=snapshot.channels,
+    )
+    return audio, snapshot.pcm_complete
+
+
+def _writeAtomic(path: str, data: bytes) -> None:
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _writeSnapshot(
+    song_ids: list[str],
+    index: int,
+    position: float,
+    song: SongStorable | None,
+    audio: AudioSegment | None,
+) -> None:
+    global _written_pcm_key
+    with _write_lock:
+        data: dict[str, Any] = {
+            'version': _SNAPSHOT_VERSION,
+            'song_ids': song_ids,
+            'index': index,
+            'position': round(position, 3),
+        }
+        source = _musicStamp(song) if song is not None else None
+        if song is not None and audio is not None and source is not None:
+            key = (song.id, source)
+            frame_width = audio.channels * audio.sample_width
+            limit = audio.frame_rate * frame_width * _PCM_PREFIX_SECONDS
+            raw = audio.raw_data
+            try:
+                if _written_pcm_key != key:
+                    _written_pcm_key = None
+                    _writeAtomic(SNAPSHOT_PCM_PATH, raw[:limit])
+                    _written_pcm_key = key
+                data.update(
+                    pcm_song_id=song.id,
+                    pcm_source=list(source),
+                    frame_rate=audio.frame_rate,
+                    channels=audio.channels,
+                    sample_width=audio.sample_width,
+                    pcm_complete=len(raw) <= limit,
+                )
+            except OSError:
+                _logger.exception('failed to write session pcm')
+        try:
+            _writeAtomic(
+                SNAPSHOT_PATH,
+                json.dumps(data, separators=(',', ':')).encode('utf-8'),
+            )
+        except OSError:
+            _logger.exception('failed to write session snapshot')
+
+
+def saveSessionSnapshot(
+    playlist: list[SongStorable],
+    index: int,
+    position: float,
+    song: SongStorable | None,
+    audio: AudioSegment | None,
+    block: bool = False,
+) -> None:
+    """Persist the playback session.
+
+    The first ``_PCM_PREFIX_SECONDS`` of the song's PCM are rewritten only
+    when the song changes.
+    """
+    args = ([item.id for item in playlist], index, position, song, audio)
+    if block:
+        _writeSnapshot(*args)
+        return
+    threading.Thread(
+        target=_writeSnapshot,
+        args=args,
+        daemon=True,
+        name='southside-session-snapshot',
+    ).start()
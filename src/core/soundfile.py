@@ -49,17 +49,31 @@ def _clean_lrc(raw_lyric: str) -> str:
     return '\n'.join(lines)
 
 
-def _detect_format(song_bytes: bytes):
+def _magic_bytes(song: bytes | str) -> str:
+    if isinstance(song, bytes):
+        return song[:8].hex()
+    with open(song, 'rb') as f:
+        return f.read(8).hex()
+
+
+def _probe_format(path: str, song: bytes | str) -> type:
+    audio = mutagen.File(path)  # type: ignore
+    if audio is None:
+        raise ValueError(
+            f'Invalid audio file format (magic bytes: {_magic_bytes(song)})'
+        )
+    return type(audio)
+
+
+def _detect_format(song: bytes | str):
     with tempfile.NamedTemporaryFile(delete=False) as tmp:
-        tmp.write(song_bytes)
+        if isinstance(song, bytes):
+            tmp.write(song)
         tmp_path = tmp.name
     try:
-        audio = mutagen.File(tmp_path)  # type: ignore
-        if audio is None:
-            raise ValueError(
-                f'Invalid audio file format (magic bytes: {song_bytes[:8].hex()})'
-            )
-        return tmp_path, type(audio)
+        if not isinstance(song, bytes):
+            shutil.copyfile(song, tmp_path)
+        return tmp_path, _probe_format(tmp_path, song)
     except Exception:
         os.unlink(tmp_path)
         raise
@@ -231,7 +245,7 @@ def _set_tags_mp4(
 
 
 def saveSongWithInformation(
-    song_bytes: bytes,
+    song_bytes: bytes | str,
     song_image: bytes,
     song_name: str,
     song_artists: list[ArtistInfo],
@@ -332,6 +346,10 @@ def saveSongWithInformation(
         raise
 
 
-def getSongFormat(song_bytes: bytes):
-    tmp_path, fmt = _detect_format(song_bytes)
+def getSongFormat(song: bytes | str):
+    if isinstance(song, bytes):
+        tmp_path, fmt = _detect_format(song)
+        os.unlink(tmp_path)
+    else:
+        fmt = _probe_format(song, song)
     return _EXT_MAP.get(fmt, '.bin')
@@ -0,0 +1,232 @@
+"""In-process tracing spans, exported as Chrome ``trace_event`` JSON.
+
+``tracer.span(name)`` is a context manager and ``tracer.traced(name)`` a
+decorator. While tracing is off, both cost an attribute check. While it is
+on, finished spans go into a ring buffer. ``tracer.export`` writes that
+buffer as JSON, which chrome://tracing and Perfetto can open.
+
+Tracing follows the debug overlay (F3), and F4 exports a trace. Set
+``SOUTHSIDE_TRACE=1`` to trace from startup.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, TypeVar
+
+from core.models import DATA_DIR
+from services.events.event_bus import event_bus
+from services.events.events import COLLECT_DEBUG_INFO, EMIT_DEBUG_INFO
+
+_logger = logging.getLogger(__name__)
+
+F = TypeVar('F', bound=Callable[..., Any])
+
+_RING_SIZE = 65536
+_SUMMARY_TOP = 8
+# the overlay summarises only recent spans, the export has all of them
+_SUMMARY_WINDOW = 2.0
+
+TRACE_DIR = os.path.join(DATA_DIR, 'traces')
+
+# name, category, start (ns), duration (ns), thread id, args
+_Span = tuple[str, str, int, int, int, dict[str, Any] | None]
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _ActiveSpan:
+    __slots__ = ('_tracer', '_name', '_category', '_args', '_start')
+
+    def __init__(
+        self,
+        tracer: Tracer,
+        name: str,
+        category: str,
+        args: dict[str, Any] | None,
+    ) -> None:
+        self._tracer = tracer
+        self._name = name
+        self._category = category
+        self._args = args
+        self._start = 0
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter_ns()
+
+    def __exit__(self, *exc: object) -> None:
+        self._tracer.record(
+            self._name,
+            self._category,
+            self._start,
+            time.perf_counter_ns() - self._start,
+            self._args,
+        )
+
+
+class Tracer:
+    def __init__(self, capacity: int = _RING_SIZE) -> None:
+        self.enabled = False
+        # tracing started from the environment outlives the debug overlay
+        self.always_on = False
+        self._spans: deque[_Span] = deque(maxlen=capacity)
+        self._threads: dict[int, str] = {}
+        self._origin = time.perf_counter_ns()
+        self.last_export = ''
+
+        event_bus.subscribe(COLLECT_DEBUG_INFO, self.emitDebugInfo)
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        if not self.always_on:
+            self.enabled = False
+
+    def clear(self) -> None:
+        self._spans.clear()
+
+    def span(
+        self, name: str, category: str = 'app', **args: Any
+    ) -> _ActiveSpan | _NullSpan:
+        if not self.enabled:
+            return _NULL_SPAN
+        return _ActiveSpan(self, name, category, args or None)
+
+    def traced(
+        self, name: str | None = None, category: str = 'app'
+    ) -> Callable[[F], F]:
+        """Decorate a function so each call is recorded as a span."""
+
+        def _decorate(func: F) -> F:
+            label = name or func.__qualname__
+
+            @functools.wraps(func)
+            def _wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter_ns()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(label, category, start, time.perf_counter_ns() - start)
+
+            return _wrapper  # type: ignore[return-value]
+
+        return _decorate
+
+    def record(
+        self,
+        name: str,
+        category: str,
+        start_ns: int,
+        duration_ns: int,
+        args: dict[str, Any] | None = None,
+    ) -> None:
+        """Add a span measured by the caller with ``time.perf_counter_ns``."""
+        if not self.enabled:
+            return
+        thread_id = threading.get_ident()
+        if thread_id not in self._threads:
+            self._threads[thread_id] = threading.current_thread().name
+        self._spans.append((name, category, start_ns, duration_ns, thread_id, args))
+
+    def recent(self, window: float) -> list[_Span]:
+        """Spans that ended within the last ``window`` seconds, oldest first."""
+        since = time.perf_counter_ns() - int(window * 1e9)
+        spans = list(self._spans)
+        index = len(spans)
+        while index > 0 and spans[index - 1][2] + spans[index - 1][3] >= since:
+            index -= 1
+        return spans[index:]
+
+    def threadName(self, thread_id: int) -> str:
+        return self._threads.get(thread_id, str(thread_id))
+
+    def chromeTrace(self) -> dict[str, Any]:
+        pid = os.getpid()
+        events: list[dict[str, Any]] = [
+            {
+                'name': 'thread_name',
+                'ph': 'M',
+                'pid': pid,
+                'tid': thread_id,
+                'args': {'name': name},
+            }
+            for thread_id, name in list(self._threads.items())
+        ]
+        for name, category, start, duration, thread_id, args in list(self._spans):
+            event: dict[str, Any] = {
+                'name': name,
+                'cat': category,
+                'ph': 'X',
+                'ts': (start - self._origin) / 1e3,
+                'dur': duration / 1e3,
+                'pid': pid,
+                'tid': thread_id,
+            }
+            if args:
+                event['args'] = args
+            events.append(event)
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export(self, path: str | None = None) -> str:
+        """Write the buffer as Chrome trace JSON and return the file path."""
+        if path is None:
+            os.makedirs(TRACE_DIR, exist_ok=True)
+            path = os.path.join(TRACE_DIR, time.strftime('trace-%Y%m%d-%H%M%S.json'))
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.chromeTrace(), f, default=str, separators=(',', ':'))
+        _logger.info(f'exported {len(self._spans)} trace spans to {path}')
+        self.last_export = path
+        return path
+
+    def summary(self, spans: list[_Span]) -> list[tuple[str, int, float, float]]:
+        """Per span name: count, total and max seconds, by total descending."""
+        totals: dict[str, list[float]] = {}
+        for name, _, _, duration, _, _ in spans:
+            entry = totals.setdefault(name, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += duration / 1e9
+            entry[2] = max(entry[2], duration / 1e9)
+        return sorted(
+            ((name, int(n), total, peak) for name, (n, total, peak) in totals.items()),
+            key=lambda item: -item[2],
+        )
+
+    def emitDebugInfo(self) -> None:
+        if not self.enabled:
+            return
+        lines = [f'spans={len(self._spans)}/{self._spans.maxlen} (F4 exports)']
+        if self.last_export:
+            lines.append(f'exported {self.last_export}')
+        lines.append(f'last {_SUMMARY_WINDOW:.0f}s:')
+        summary = self.summary(self.recent(_SUMMARY_WINDOW))
+        for name, count, total, peak in summary[:_SUMMARY_TOP]:
+            lines.append(
+                f'{name}: n={count} total={total * 1e3:.1f}ms max={peak * 1e3:.2f}ms'
+            )
+        event_bus.emit(EMIT_DEBUG_INFO, 'Tracing', lines)
+
+
+tracer = Tracer()
+if os.environ.get('SOUTHSIDE_TRACE'):
+    tracer.always_on = True
+    tracer.enable()
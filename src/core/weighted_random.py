@@ -1,3 +1,4 @@
+from collections import deque
 import logging
 import random
 
@@ -15,8 +16,10 @@ class AdvancedRandom(Generic[T]):
         self.list_weight: list[float] = []
         self.randomed_times: list[int] = []
         self.target_lst: list[T] = []
+        self._upcoming: deque[T] = deque()
 
     def init(self, lst: list[T]):
+        self._upcoming.clear()
         if not lst:
             return
         self.list_len = len(lst)
@@ -37,6 +40,19 @@ class AdvancedRandom(Generic[T]):
         )
 
     def random(self) -> T:
+        if self._upcoming:
+            return self._upcoming.popleft()
+        return self._draw()
+
+    def peek(self, count: int) -> list[T]:
+        """Draw the next ``count`` picks ahead of time so they can be prefetched."""
+        if not self.target_lst:
+            return []
+        while len(self._upcoming) < count:
+            self._upcoming.append(self._draw())
+        return list(self._upcoming)[:count]
+
+    def _draw(self) -> T:
         total_weight: float = 0
         adjusted_weights = []
 
@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import heapq
+import logging
+import os
+import threading
+import time
+from typing import Any
+
+from core.config import cfg
+from core.free_threaded_worker import _MAIN_THREAD_OPS, FreeThreadedJsonSender
+from core.metrics import LatencyHistogram
+from services.events.event_bus import event_bus
+from services.events.events import COLLECT_DEBUG_INFO, EMIT_DEBUG_INFO
+
+_logger = logging.getLogger(__name__)
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_FOREGROUND = 1
+PRIORITY_PRELOAD = 2
+PRIORITY_BACKGROUND = 3
+PRIORITY_NAMES = ('interactive', 'foreground', 'preload', 'background')
+
+# each worker runs this many jobs at once; lower classes get only one of them
+_SLOTS_PER_WORKER = 2
+
+
+class JobCancelled(Exception):
+    """Raised by ``WorkerPool.call`` when the job's token was cancelled."""
+
+
+class CancelToken:
+    """Shared by related jobs so ``WorkerPool.cancel`` can drop them together."""
+
+    __slots__ = ('cancelled',)
+
+    def __init__(self) -> None:
+        self.cancelled = False
+
+
+class _Job:
+    __slots__ = (
+        'op',
+        'payload',
+        'priority',
+        'token',
+        'done',
+        'result',
+        'worker',
+        'request_id',
+        'queued_at',
+        'finished',
+    )
+
+    def __init__(
+        self,
+        op: str,
+        payload: dict[str, object],
+        priority: int,
+        token: CancelToken | None,
+    ) -> None:
+        self.op = op
+        self.payload = payload
+        self.priority = priority
+        self.token = token
+        self.done = threading.Event()
+        self.result: Any | None = None
+        self.worker = -1
+        self.request_id: int | None = None
+        self.queued_at = time.perf_counter()
+        self.finished = False
+
+    @property
+    def exclusive(self) -> bool:
+        # these run on the worker's reader thread and stall everything behind
+        return self.op in _MAIN_THREAD_OPS
+
+
+class WorkerPool:
+    """Runs sidecar jobs on several free-threaded workers by priority.
+
+    Each worker takes ``_SLOTS_PER_WORKER`` jobs at once. Preload and
+    background jobs may hold only one slot of a worker, so an interactive or
+    foreground job always finds a free slot instead of queueing behind them.
+    Ops that block a whole worker never run on the first worker while there
+    are others. Workers are started only once the running ones are full. A
+    running job that times out keeps its slot until its worker answers.
+    """
+
+    def __init__(
+        self,
+        *,
+        logger: logging.Logger | None = None,
+        workers: int | None = None,
+    ) -> None:
+        self._logger = logger or _logger
+        self._workers = workers
+        self._lock = threading.Lock()
+        self._senders: list[FreeThreadedJsonSender] = []
+        self._running: list[list[_Job]] = []
+        self._queue: list[tuple[int, int, _Job]] = []
+        self._sequence = 0
+        self._shutdown = False
+        self.queue_max = 0
+        self.completed = [0] * len(PRIORITY_NAMES)
+        self.cancelled = 0
+        self.timeouts = 0
+        self.waits = [LatencyHistogram() for _ in PRIORITY_NAMES]
+
+        event_bus.subscribe(COLLECT_DEBUG_INFO, self.emitDebugInfo)
+
+    def call(
+        self,
+        op: str,
+        payload: dict[str, object],
+        timeout: float = 5.0,
+        *,
+        priority: int = PRIORITY_INTERACTIVE,
+        token: CancelToken | None = None,
+    ) -> Any | None:
+        """Run ``op`` on a worker and wait for it; None when it failed."""
+        if token is not None and token.cancelled:
+            raise JobCancelled(op)
+        job = _Job(op, payload, priority, token)
+        with self._lock:
+            if self._shutdown:
+                return None
+            self._sequence += 1
+            heapq.heappush(self._queue, (priority, self._sequence, job))
+            self.queue_max = max(self.queue_max, len(self._queue))
+        self._dispatch()
+
+        if not job.done.wait(timeout):
+            with self._lock:
+                queued = job.worker < 0
+                sender = None if queued else self._senders[job.worker]
+                request_id = job.request_id
+                self.timeouts += 1
+            if sender is not None and request_id is not None:
+                # the sender still calls back, with None, which frees the slot
+                sender.discard(request_id)
+            self._logger.warning(
+                'worker pool %s timed out %s', op, 'queued' if queued else 'running'
+            )
+            if queued:
+                self._finish(job, None)
+            return None
+        if token is not None and token.cancelled and job.worker < 0:
+            raise JobCancelled(op)
+        return job.result
+
+    def dump(
+        self,
+        payload: dict[str, object],
+        timeout: float = 5.0,
+        *,
+        priority: int = PRIORITY_INTERACTIVE,
+    ) -> str | None:
+        result = self.call('json_dumps', payload, timeout, priority=priority)
+        return result if isinstance(result, str) else None
+
+    def cancel(self, token: CancelToken) -> int:
+        """Drop the queued jobs of ``token``; jobs already running finish."""
+        token.cancelled = True
+        with self._lock:
+            dropped = [job for _, _, job in self._queue if job.token is token]
+            if dropped:
+                self._queue = [
+                    item for item in self._queue if item[2].token is not token
+                ]
+                heapq.heapify(self._queue)
+                self.cancelled += len(dropped)
+        for job in dropped:
+            self._finish(job, None)
+        return len(dropped)
+
+    def queueDepths(self) -> list[int]:
+        depths = [0] * len(PRIORITY_NAMES)
+        with self._lock:
+            for priority, _, _ in self._queue:
+                depths[priority] += 1
+        return depths
+
+    def is_running(self) -> bool:
+        with self._lock:
+            senders = list(self._senders)
+        return any(sender.is_running() for sender in senders)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._shutdown = True
+            dropped = [job for _, _, job in self._queue]
+            self._queue.clear()
+            senders = list(self._senders)
+        for job in dropped:
+            self._finish(job, None)
+        for sender in senders:
+            sender.shutdown()
+
+    def _dispatch(self) -> None:
+        while True:
+            with self._lock:
+                picked = self._pickLocked()
+            if picked is None:
+                return
+            job, sender = picked
+            request_id = sender.submitCall(
+                job.op, job.payload, lambda msg, job=job: self._finish(job, msg)
+            )
+            if request_id is None:
+                self._complete(job, None)
+                continue
+            with self._lock:
+                job.request_id = request_id
+
+    def _pickLocked(self) -> tuple[_Job, FreeThreadedJsonSender] | None:
+        if self._shutdown:
+            return None
+        if not self._senders:
+            count = self._workers or cfg.sidecar_workers or os.cpu_count() or 1
+            self._senders = [
+                FreeThreadedJsonSender(
+                    logger=self._logger, max_workers=_SLOTS_PER_WORKER
+                )
+                for _ in range(max(1, count))
+            ]
+            self._running = [[] for _ in self._senders]
+
+        while self._queue and self._queue[0][2].finished:
+            heapq.heappop(self._queue)
+        if not self._queue:
+            return None
+        job = self._queue[0][2]
+        # strict priority order, so a waiting foreground job is never
+        # overtaken by lower classes that happen to fit somewhere
+        worker = self._slotForLocked(job)
+        if worker < 0:
+            return None
+        heapq.heappop(self._queue)
+        job.worker = worker
+        self._running[worker].append(job)
+        self.waits[job.priority].record(time.perf_counter() - job.queued_at)
+        return job, self._senders[worker]
+
+    def _slotForLocked(self, job: _Job) -> int:
+        for worker, running in enumerate(self._running):
+            if any(other.exclusive for other in running):
+                continue
+            if job.exclusive:
+                if running or worker == 0 and len(self._running) > 1:
+                    continue
+            elif len(running) >= _SLOTS_PER_WORKER:
+                continue
+            elif job.priority > PRIORITY_FOREGROUND and any(
+                other.priority > PRIORITY_FOREGROUND for other in running
+            ):
+                continue
+            return worker
+        return -1
+
+    def _finish(self, job: _Job, result: Any | None) -> None:
+        if self._complete(job, result):
+            self._dispatch()
+
+    def _complete(self, job: _Job, result: Any | None) -> bool:
+        """Settle ``job`` once; True when that freed a worker slot."""
+        with self._lock:
+            if job.finished:
+                return False
+            job.finished = True
+            job.result = result
+            freed = job.worker >= 0
+            if freed:
+                self._running[job.worker].remove(job)
+                self.completed[job.priority] += 1
+        job.done.set()
+        return freed
+
+    def emitDebugInfo(self) -> None:
+        depths = self.queueDepths()
+        with self._lock:
+            running = [len(jobs) for jobs in self._running]
+        event_bus.emit(
+            EMIT_DEBUG_INFO,
+            'WorkerPool',
+            [
+                f'workers={len(running)} running={running}',
+                'queued='
+                + ' '.join(f'{n}:{d}' for n, d in zip(PRIORITY_NAMES, depths)),
+                f'queue_max={self.queue_max}',
+                f'cancelled={self.cancelled}',
+                f'timeouts={self.timeouts}',
+            ]
+            + [
+                f'{name}: done={self.completed[priority]}'
+                f' wait {self.waits[priority].summary()}'
+                for priority, name in enumerate(PRIORITY_NAMES)
+            ],
+        )
+
+
+worker_pool = WorkerPool()
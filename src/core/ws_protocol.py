@@ -0,0 +1,336 @@
+"""Binary frames for the SouthsideClient WebSocket bridge.
+
+A client opts in by sending
+``{"option": "ws_hello", "protocols": ["southside_binary_v2"]}`` after it
+connects. The server answers with a JSON ``ws_hello`` that names the chosen
+protocol. Without a hello, or for options that have no binary form, every
+message stays JSON.
+
+Each binary frame starts with ``<2sBBI``: the magic ``b'SS'``, the protocol
+version, the frame type and a per-connection sequence number. All numbers are
+little-endian. A ``str`` is a ``u16`` byte length followed by UTF-8, and a
+colour is a ``u32`` packed as ``0xRRGGBBAA``.
+
+``FRAME_FFT``
+    ``u32`` count, then ``count`` float32 magnitudes with the FFT multiple
+    already applied.
+``FRAME_COVER``
+    A 20-byte SHA-1 of the image, then a ``u32`` image length and the original
+    JPEG/PNG bytes, then the JSON song info. The image is sent once per hash
+    and connection. An image length of 0 means the client already has it
+    cached under that hash. A client that lost its cache sends the hello again.
+``FRAME_LYRIC``
+    ``update_lyric`` as a delta stream, see ``LyricDeltaStream``.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+import hashlib
+import json
+import struct
+import threading
+from typing import Any
+
+import numpy as np
+
+from core.free_threaded_worker import (
+    dumpJsonPayload,
+    json_base64_bytes_data,
+    json_float_array_spec,
+)
+
+PROTOCOL_JSON = 'json'
+PROTOCOL_BINARY = 'southside_binary_v2'
+VERSION = 2
+
+FRAME_FFT = 1
+FRAME_COVER = 2
+FRAME_LYRIC = 3
+
+_MAGIC = b'SS'
+_HEADER = struct.Struct('<2sBBI')
+_COVER_HEAD = struct.Struct('<20sI')
+# stream sequence, base sequence (0 for a keyframe), flags, position, current
+# index, first visible index, visible count, top offset, draw offset, target
+# draw offset, acceleration, total height, translation progress, current clip
+# ratio and width
+_LYRIC_HEAD = struct.Struct('<IIBdiiHffffffff')
+# canvas w/h, center y, x, then per font: point size, height, ascent, descent
+_LYRIC_ENV = struct.Struct('<HHffffffffff')
+# index, time, flags (is_metadata)
+_LINE_DEF = struct.Struct('<ifB')
+# index, y offset, flags (current, hovered), alpha, clip ratio and width,
+# primary colour, translation colour
+_LINE_STATE = struct.Struct('<ifBBffII')
+_LYRIC_READY = 1
+_LYRIC_USE_YRC = 2
+_LYRIC_TRANSLATION = 4
+_LYRIC_HAS_ENV = 8
+_COVER_CACHE_MAX = 64
+
+
+def _packStr(value: object) -> bytes:
+    data = str(value or '').encode('utf-8')[:0xFFFF]
+    return struct.pack('<H', len(data)) + data
+
+
+def _packColor(value: object) -> int:
+    if not isinstance(value, dict):
+        return 0
+    return (
+        (int(value.get('r', 0)) & 0xFF) << 24
+        | (int(value.get('g', 0)) & 0xFF) << 16
+        | (int(value.get('b', 0)) & 0xFF) << 8
+        | (int(value.get('a', 255)) & 0xFF)
+    )
+
+
+def helloReply(message: dict[str, Any]) -> tuple[str, str]:
+    """Pick a protocol for a ``ws_hello`` and return it with the JSON reply."""
+    protocols = message.get('protocols')
+    protocol = (
+        PROTOCOL_BINARY
+        if isinstance(protocols, list) and PROTOCOL_BINARY in protocols
+        else PROTOCOL_JSON
+    )
+    return protocol, dumpJsonPayload(
+        {'option': 'ws_hello', 'protocol': protocol, 'version': VERSION}
+    )
+
+
+class BinaryFrameEncoder:
+    """Per-connection encoder; ``encode`` returns None for JSON-only options."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self._covers: OrderedDict[bytes, None] = OrderedDict()
+        self.lyrics = LyricDeltaStream()
+
+    def handles(self, option: object) -> bool:
+        return option in ('update_fft', 'cover', 'update_lyric')
+
+    def encode(self, payload: dict[str, object]) -> bytes | None:
+        option = payload.get('option')
+        if option == 'update_fft':
+            return self._encodeFft(payload)
+        if option == 'cover':
+            return self._encodeCover(payload)
+        if option == 'update_lyric':
+            return self._encodeLyric(payload)
+        return None
+
+    def _header(self, frame_type: int) -> bytes:
+        with self._lock:
+            self._sequence = (self._sequence + 1) & 0xFFFFFFFF
+            sequence = self._sequence
+        return _HEADER.pack(_MAGIC, VERSION, frame_type, sequence)
+
+    def _encodeFft(self, payload: dict[str, object]) -> bytes | None:
+        spec = json_float_array_spec(payload.get('magnitudes'))
+        if spec is None or not isinstance(spec.get('data'), bytes):
+            return None
+        count = int(spec.get('count', 0))  # type: ignore
+        try:
+            values = np.frombuffer(spec['data'], dtype=str(spec.get('dtype')))  # type: ignore
+        except (TypeError, ValueError):
+            return None
+        values = values[: max(0, count)] * float(spec.get('multiple', 1.0))  # type: ignore
+        return (
+            self._header(FRAME_FFT)
+            + struct.pack('<I', values.size)
+            + values.astype('<f4').tobytes()
+        )
+
+    def _encodeCover(self, payload: dict[str, object]) -> bytes | None:
+        image = json_base64_bytes_data(payload.get('image'))
+        if image is None:
+            return None
+        digest = hashlib.sha1(image).digest()
+        with self._lock:
+            cached = digest in self._covers
+            self._covers[digest] = None
+            self._covers.move_to_end(digest)
+            while len(self._covers) > _COVER_CACHE_MAX:
+                self._covers.popitem(last=False)
+        if cached:
+            image = b''
+        info = {key: value for key, value in payload.items() if key != 'image'}
+        return (
+            self._header(FRAME_COVER)
+            + _COVER_HEAD.pack(digest, len(image))
+            + image
+            + json.dumps(info, separators=(',', ':')).encode('utf-8')
+        )
+
+    def _encodeLyric(self, payload: dict[str, Any]) -> bytes:
+        return self._header(FRAME_LYRIC) + self.lyrics.encode(payload)
+
+
+class LyricDeltaStream:
+    """Encodes ``update_lyric`` payloads as deltas against the last frame.
+
+    Each frame carries ``_LYRIC_HEAD``. When ``_LYRIC_HAS_ENV`` is set, it is
+    followed by ``_LYRIC_ENV`` and the two font families. Then come a
+    ``u16`` count of line definitions (``_LINE_DEF`` + text + translation)
+    and a ``u16`` count of line states (``_LINE_STATE``).
+
+    A line is defined once, the first time it is visible or in the
+    five-line window, and again only if its text changes, as it does when
+    the song changes. A line state is sent only when it differs from the
+    one sent before. A line's baseline is the top offset plus its y offset.
+    Lines outside the visible range are dropped by the client.
+
+    Frames apply on top of the frame whose stream sequence matches their
+    base sequence. A base sequence of 0 marks a keyframe that replaces
+    everything. A client that sees a gap sends ``ws_lyric_resync`` and
+    receives a keyframe next.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self._resync = True
+        self._env: tuple | None = None
+        self._defs: dict[int, tuple] = {}
+        self._states: dict[int, tuple] = {}
+        self.keyframes = 0
+
+    def requestResync(self) -> None:
+        with self._lock:
+            self._resync = True
+
+    def encode(self, payload: dict[str, Any]) -> bytes:
+        with self._lock:
+            return self._encodeLocked(payload)
+
+    def _encodeLocked(self, payload: dict[str, Any]) -> bytes:
+        layout = payload.get('layout') or {}
+        lines = (layout.get('lines') or []) if layout.get('ready') else []
+        base = self._sequence
+        if self._resync:
+            self._resync = False
+            base = 0
+            self._env = None
+            self._defs.clear()
+            self._states.clear()
+            self.keyframes += 1
+        self._sequence = (self._sequence + 1) & 0xFFFFFFFF or 1
+
+        flags = (
+            (_LYRIC_READY if layout.get('ready') else 0)
+            | (_LYRIC_USE_YRC if payload.get('use_yrc') else 0)
+            | (_LYRIC_TRANSLATION if payload.get('translation_enabled') else 0)
+        )
+        env = _layoutEnv(layout) if layout.get('ready') else None
+        env_part = b''
+        if env is not None and env != self._env:
+            self._env = env
+            flags |= _LYRIC_HAS_ENV
+            env_part = (
+                _LYRIC_ENV.pack(*env[:12]) + _packStr(env[12]) + _packStr(env[13])
+            )
+
+        top_offset = float(layout.get('top_offset', 0.0))
+        first = int(lines[0].get('index', 0)) if lines else 0
+        parts = [
+            _LYRIC_HEAD.pack(
+                self._sequence,
+                base,
+                flags,
+                float(payload.get('position', 0.0)),
+                int(payload.get('current_index', -1)),
+                first,
+                len(lines),
+                top_offset,
+                float(layout.get('draw_offset', 0.0)),
+                float(layout.get('target_draw_offset', 0.0)),
+                float(layout.get('acceleration', 0.0)),
+                float(layout.get('total_height', 0.0)),
+                float(layout.get('translation_progress', 0.0)),
+                float(payload.get('yrc_clip_ratio', 0.0)),
+                float(payload.get('yrc_clip_width', 0.0)),
+            ),
+            env_part,
+        ]
+
+        defs: list[bytes] = []
+        shown = {int(line.get('index', -1)) for line in lines}
+        window = [
+            line
+            for line in payload.get('lines') or []
+            if int(line.get('index', -1)) not in shown
+        ]
+        for line in [*lines, *window]:
+            index = int(line.get('index', -1))
+            if index < 0:
+                continue
+            definition = (
+                float(line.get('time', 0.0)),
+                bool(line.get('is_metadata')),
+                str(line.get('text') or ''),
+                str(line.get('translation') or ''),
+            )
+            if self._defs.get(index) == definition:
+                continue
+            self._defs[index] = definition
+            # a redefined line needs its state again as well
+            self._states.pop(index, None)
+            defs.append(
+                _LINE_DEF.pack(index, definition[0], definition[1])
+                + _packStr(definition[2])
+                + _packStr(definition[3])
+            )
+        parts.append(struct.pack('<H', len(defs)))
+        parts.extend(defs)
+
+        states: list[bytes] = []
+        visible: dict[int, tuple] = {}
+        for line in lines:
+            index = int(line.get('index', -1))
+            state = (
+                float(line.get('baseline_y', 0.0)) - top_offset,
+                bool(line.get('is_current')) | bool(line.get('is_hovered')) << 1,
+                max(0, min(255, int(line.get('alpha', 0)))),
+                float(line.get('yrc_clip_ratio', 0.0)),
+                float(line.get('yrc_clip_width', 0.0)),
+                _packColor(line.get('primary_color')),
+                _packColor(line.get('translation_color')),
+            )
+            # compare at sub-pixel precision so float noise in the offsets
+            # doesn't resend lines that did not move
+            key = (
+                round(state[0] * 16),
+                *state[1:3],
+                round(state[3] * 4096),
+                round(state[4] * 16),
+                *state[5:],
+            )
+            visible[index] = key
+            if self._states.get(index) == key:
+                continue
+            states.append(_LINE_STATE.pack(index, *state))
+        self._states = visible
+        parts.append(struct.pack('<H', len(states)))
+        parts.extend(states)
+        return b''.join(parts)
+
+
+def _layoutEnv(layout: dict[str, Any]) -> tuple:
+    return (
+        int(layout.get('canvas_width', 0)) & 0xFFFF,
+        int(layout.get('canvas_height', 0)) & 0xFFFF,
+        float(layout.get('center_y', 0.0)),
+        float(layout.get('x', 0.0)),
+        float(layout.get('primary_font_point_size', 0.0)),
+        float(layout.get('primary_font_height', 0.0)),
+        float(layout.get('primary_font_ascent', 0.0)),
+        float(layout.get('primary_font_descent', 0.0)),
+        float(layout.get('translation_font_point_size', 0.0)),
+        float(layout.get('translation_font_height', 0.0)),
+        float(layout.get('translation_font_ascent', 0.0)),
+        float(layout.get('translation_font_descent', 0.0)),
+        str(layout.get('primary_font_family') or ''),
+        str(layout.get('translation_font_family') or ''),
+    )
@@ -1,10 +1,20 @@
+import json
 import logging
 import threading
 import time
+from collections import deque
 from collections.abc import Callable
 from concurrent.futures import Future, ThreadPoolExecutor
 
-from core.free_threaded_worker import FreeThreadedJsonSender, dumpJsonPayload
+from core.free_threaded_worker import dumpJsonPayload
+from core.json_strategy import JsonStrategy
+from core.ws_protocol import (
+    PROTOCOL_BINARY,
+    PROTOCOL_JSON,
+    BinaryFrameEncoder,
+    helloReply,
+)
+from core.worker_pool import worker_pool
 from tornado.websocket import WebSocketClosedError
 import tornado.websocket
 import tornado.httpserver
@@ -13,99 +23,209 @@ import tornado.web
 from imports import QObject, Signal
 from services.events import event_bus, COLLECT_DEBUG_INFO, EMIT_DEBUG_INFO
 
+_CLIENT_QUEUE_MAX = 64
+# frames with the drop policy are skipped once a client is this far behind
+_CLIENT_LAG_DEPTH = 4
+# merge: a newer frame replaces a queued one with the same coalesce key
+# drop: merge, and skip the frame entirely while the client is lagging
+# anything else is always queued, evicting the oldest frame when full
+_SEND_POLICIES = {
+    'update_fft': 'drop',
+    'play_position': 'drop',
+    'update_lyric': 'merge',
+    'play_state': 'merge',
+    'cover': 'merge',
+}
+
+
+class _OutgoingFrame:
+    __slots__ = ('key', 'option', 'payload', 'json_msg')
+
+    def __init__(
+        self,
+        key: str | None,
+        option: object,
+        payload: dict[str, object] | None,
+        json_msg: str | None,
+    ) -> None:
+        self.key = key
+        self.option = option
+        self.payload = payload
+        self.json_msg = json_msg
+
 
 class WebSocketHandler(tornado.websocket.WebSocketHandler):
     def __init__(self, application, request, **kwargs) -> None:
         self._logger = logging.getLogger(__name__)
         self.count = 0
         self.ioloop: tornado.ioloop.IOLoop | None = None
-        ws_handler.onSend.connect(self.trySend)
+        self.protocol = PROTOCOL_JSON
+        self.binary_encoder: BinaryFrameEncoder | None = None
+        self._queue: deque[_OutgoingFrame] = deque()
+        self._queue_lock = threading.Lock()
+        self._writing = False
+        self.queued_max = 0
+        self.dropped = 0
+        self.merged = 0
+        self.frames = 0
+        self.ping = 0.0  # unit: ms
+        self.ping_id = 0
+        self.ping_started_at = 0.0
+        self.ping_waiting = False
+        self.ping_timer: threading.Timer | None = None
         super().__init__(application, request, **kwargs)
 
-    def trySend(self, msg: str):
+    @property
+    def name(self) -> str:
+        return f'{self.request.remote_ip}#{id(self) % 10000:04d}'
+
+    def queueDepth(self) -> int:
+        with self._queue_lock:
+            return len(self._queue)
+
+    def needsJson(self, option: object) -> bool:
+        return self.binary_encoder is None or not self.binary_encoder.handles(option)
+
+    def enqueue(self, frame: _OutgoingFrame) -> None:
+        policy = _SEND_POLICIES.get(frame.key or '')
+        with self._queue_lock:
+            if policy is not None:
+                for index, queued in enumerate(self._queue):
+                    if queued.key == frame.key:
+                        self._queue[index] = frame
+                        self.merged += 1
+                        return
+                if policy == 'drop' and len(self._queue) >= _CLIENT_LAG_DEPTH:
+                    self.dropped += 1
+                    return
+            if len(self._queue) >= _CLIENT_QUEUE_MAX:
+                self._queue.popleft()
+                self.dropped += 1
+            self._queue.append(frame)
+            self.queued_max = max(self.queued_max, len(self._queue))
+            if self._writing:
+                return
+            self._writing = True
         try:
-            if not ws_handler.isCurrentHandler(self) or self.ioloop is None:
+            if self.ioloop is None:
+                raise RuntimeError('websocket is not open')
+            self.ioloop.add_callback(self._pump)
+        except RuntimeError:
+            with self._queue_lock:
+                self._queue.clear()
+                self._writing = False
+
+    def _pump(self) -> None:
+        # runs on the io loop; the next frame is only written once the
+        # previous write has drained, so slow clients queue here
+        with self._queue_lock:
+            if not self._queue or self.ws_connection is None:
+                self._queue.clear()
+                self._writing = False
                 return
-            self.ioloop.add_callback(lambda: self._write_message(msg))
-        except Exception:
-            pass
-
-    def _write_message(self, msg: str) -> None:
+            frame = self._queue.popleft()
         try:
-            if ws_handler.isCurrentHandler(self) and self.ws_connection is not None:
-                future = self.write_message(msg)
-                future.add_done_callback(self._on_write_done)
+            msg = self._encode(frame)
+            future = self.write_message(msg, binary=isinstance(msg, bytes))
         except WebSocketClosedError:
-            pass
-        except Exception:
-            pass
+            with self._queue_lock:
+                self._queue.clear()
+                self._writing = False
+            return
+        except Exception as e:
+            self._logger.debug('websocket write failed: %s', e)
+            self._pump()
+            return
+        self.frames += 1
+        ws_handler.countSent(msg)
+        future.add_done_callback(self._on_write_done)
+
+    def _encode(self, frame: _OutgoingFrame) -> str | bytes:
+        if self.binary_encoder is not None and frame.payload is not None:
+            data = self.binary_encoder.encode(frame.payload)
+            if data is not None:
+                return data
+        if frame.json_msg is None:
+            frame.json_msg = dumpJsonPayload(frame.payload)
+        return frame.json_msg
 
     def _on_write_done(self, future) -> None:
         try:
             future.result()
         except WebSocketClosedError:
-            pass
+            with self._queue_lock:
+                self._queue.clear()
+                self._writing = False
+            return
         except Exception as e:
-            if ws_handler.isCurrentHandler(self):
-                self._logger.debug('websocket write failed: %s', e)
+            self._logger.debug('websocket write failed: %s', e)
+        self._pump()
 
     def open(self, *args: str, **kwargs: str):
         self.ioloop = tornado.ioloop.IOLoop.current()
-        self._logger.info('java client connected')
+        self._logger.info('java client connected: %s', self.name)
         ws_handler.openHandler(self)
 
     def on_message(self, message):
-        if ws_handler.isCurrentHandler(self):
+        if ws_handler.hasHandler(self):
             ws_handler.messaged(message)
-            if ws_handler.handlePingMessage(message):  # type: ignore
+            if ws_handler.handlePingMessage(self, message):  # type: ignore
+                return
+            if ws_handler.handleProtocolMessage(self, message):
                 return
             ws_handler.onMessage.emit(message)
 
     def on_close(self):
+        with self._queue_lock:
+            self._queue.clear()
         if ws_handler.closeHandler(self):
-            self._logger.info('java client disconnected')
+            self._logger.info('java client disconnected: %s', self.name)
         else:
-            self._logger.debug('ignored stale java websocket close')
-        try:
-            ws_handler.onSend.disconnect(self.trySend)
-        except (RuntimeError, TypeError):
-            pass
+            self._logger.debug('java client left: %s', self.name)
 
 
 class QObjectHandler(QObject):
+    """Fans frames out to every connected client.
+
+    Each client has its own bounded queue that is drained as its writes
+    complete, and ``_SEND_POLICIES`` decides which frames may be merged or
+    dropped when it falls behind. A ``target`` limits a send to one client,
+    such as the catch-up state for one that just opened.
+    """
+
     onConnected = Signal()
     onDisconnected = Signal()
     onMessage = Signal(str)
-    onSend = Signal(str)
 
     onGetHandler = Signal()
     onHandlerReceived = Signal(WebSocketHandler)
+    onClientOpened = Signal(WebSocketHandler)
 
     is_open: bool = False
     sent: float = 0  # unit: mb
     received: float = 0  # unit: kb
-    ping: float = 0.0  # unit: ms
+    ping: float = 0.0  # unit: ms, latest round trip of any client
 
     def __init__(self) -> None:
         super().__init__()
         self._logger = logging.getLogger(__name__)
         self._handlers: set[WebSocketHandler] = set()
-        self._current_handler: WebSocketHandler | None = None
+        self._handlers_lock = threading.Lock()
+        self._latest_handler: WebSocketHandler | None = None
         self._send_lock = threading.Lock()
         self._json_lock = threading.Lock()
         self._json_executor = ThreadPoolExecutor(
             max_workers=3,
             thread_name_prefix='southside-ws-json',
         )
-        self._ft_json_sender = FreeThreadedJsonSender(logger=self._logger)
+        self._json_strategy = JsonStrategy(worker_pool)
+        self._send_latency = self._json_strategy.histogram('send_json_factory')
         self._json_pending: dict[str, Future[None]] = {}
         self._json_queued: dict[str, Callable[[], dict[str, object]]] = {}
         self._send_generation = 0
         self._json_shutdown = False
-        self._ping_id = 0
-        self._ping_started_at = 0.0
-        self._ping_waiting = False
-        self._ping_timer: threading.Timer | None = None
+        self.binary_frames = 0
+        self.json_frames = 0
         self.onMessage.connect(self.messaged)
         event_bus.subscribe(COLLECT_DEBUG_INFO, self.emitDebugInfo)
 
@@ -113,51 +233,57 @@ class QObjectHandler(QObject):
         self.received += len(msg) / 1024.0
 
     def getHandler(self) -> WebSocketHandler | None:
-        if self._current_handler is not None:
-            self.onHandlerReceived.emit(self._current_handler)
-        return self._current_handler
+        if self._latest_handler is not None:
+            self.onHandlerReceived.emit(self._latest_handler)
+        return self._latest_handler
+
+    def handlers(self) -> list[WebSocketHandler]:
+        with self._handlers_lock:
+            return list(self._handlers)
 
-    def isCurrentHandler(self, handler: WebSocketHandler) -> bool:
-        return self.is_open and self._current_handler is handler
+    def hasHandler(self, handler: WebSocketHandler) -> bool:
+        return self.is_open and handler in self._handlers
 
     def openHandler(self, handler: WebSocketHandler) -> None:
         was_open = self.is_open
-        self._handlers.add(handler)
-        self._current_handler = handler
+        with self._handlers_lock:
+            self._handlers.add(handler)
+        self._latest_handler = handler
         self.is_open = True
-        self._send_generation += 1
         self.onHandlerReceived.emit(handler)
         if not was_open:
             self.sent = 0
             self.ping = 0.0
             self.received = 0
             self.onConnected.emit()
-        self._schedulePingRound(0.1)
+        self.onClientOpened.emit(handler)
+        self._schedulePingRound(handler, 0.1)
 
     def closeHandler(self, handler: WebSocketHandler) -> bool:
-        self._handlers.discard(handler)
-        if self._current_handler is handler:
-            self._current_handler = next(iter(self._handlers), None)
-            self._send_generation += 1
-        if self._handlers:
-            self.is_open = True
+        with self._handlers_lock:
+            self._handlers.discard(handler)
+            remaining = next(iter(self._handlers), None)
+        self._cancelPingTimer(handler)
+        if self._latest_handler is handler:
+            self._latest_handler = remaining
+        if remaining is not None:
             return False
         if not self.is_open:
             return False
         self.is_open = False
         self._send_generation += 1
-        self._cancelPingTimer()
-        self._ping_waiting = False
         self.onDisconnected.emit()
         return True
 
     def clearHandlers(self) -> None:
-        self._handlers.clear()
-        self._current_handler = None
+        with self._handlers_lock:
+            handlers = list(self._handlers)
+            self._handlers.clear()
+        for handler in handlers:
+            self._cancelPingTimer(handler)
+        self._latest_handler = None
         self.is_open = False
         self._send_generation += 1
-        self._cancelPingTimer()
-        self._ping_waiting = False
         with self._json_lock:
             self._json_queued.clear()
 
@@ -168,19 +294,34 @@ class QObjectHandler(QObject):
             [
                 f'is_open={self.is_open}',
                 f'handlers={len(self._handlers)}',
-                f'current_handler={self._current_handler is not None}',
+                f'binary_frames={self.binary_frames}',
+                f'json_frames={self.json_frames}',
                 f'sent={self.sent}',
                 f'received={self.received}',
                 f'ping={self.ping:.2f}ms',
             ],
         )
+        for handler in self.handlers():
+            encoder = handler.binary_encoder
+            event_bus.emit(
+                EMIT_DEBUG_INFO,
+                f'WebSocketClient {handler.name}',
+                [
+                    f'protocol={handler.protocol}',
+                    f'queue={handler.queueDepth()}/{_CLIENT_QUEUE_MAX}',
+                    f'queue_max={handler.queued_max}',
+                    f'frames={handler.frames}',
+                    f'merged={handler.merged}',
+                    f'dropped={handler.dropped}',
+                    f'lyric_keyframes={encoder.lyrics.keyframes if encoder else 0}',
+                    f'rtt={handler.ping:.2f}ms',
+                ],
+            )
 
-    def handlePingMessage(self, message: str) -> bool:
+    def handlePingMessage(self, handler: WebSocketHandler, message: str) -> bool:
         if not isinstance(message, str) or 'ws_pong' not in message:
             return False
         try:
-            import json
-
             payload = json.loads(message)
         except Exception:
             return False
@@ -188,82 +329,122 @@ class QObjectHandler(QObject):
             return False
 
         ping_id = payload.get('id')
-        if ping_id != self._ping_id or not self._ping_waiting:
+        if ping_id != handler.ping_id or not handler.ping_waiting:
             return True
 
-        self.ping = max(0.0, (time.perf_counter() - self._ping_started_at) * 1000.0)
-        self._ping_waiting = False
-        self._sendPingPacket('ws_pong', 'python_pong', ping_id)
-        self._schedulePingRound(1)
+        handler.ping = max(
+            0.0, (time.perf_counter() - handler.ping_started_at) * 1000.0
+        )
+        handler.ping_waiting = False
+        self.ping = handler.ping
+        self._sendPingPacket(handler, 'ws_pong', 'python_pong', ping_id)
+        self._schedulePingRound(handler, 1)
         return True
 
-    def _schedulePingRound(self, delay: float) -> None:
-        self._cancelPingTimer()
-        generation = self._send_generation
-        timer = threading.Timer(delay, lambda: self._startPingRound(generation))
+    def handleProtocolMessage(self, handler: WebSocketHandler, message: str) -> bool:
+        if not isinstance(message, str) or 'ws_' not in message:
+            return False
+        try:
+            payload = json.loads(message)
+        except Exception:
+            return False
+        if not isinstance(payload, dict):
+            return False
+        if payload.get('option') == 'ws_lyric_resync':
+            if handler.binary_encoder is not None:
+                handler.binary_encoder.lyrics.requestResync()
+            return True
+        if payload.get('option') != 'ws_hello':
+            return False
+
+        protocol, reply = helloReply(payload)
+        handler.protocol = protocol
+        # a fresh encoder also forgets which covers the client has cached
+        handler.binary_encoder = (
+            BinaryFrameEncoder() if protocol == PROTOCOL_BINARY else None
+        )
+        self._logger.info('websocket client %s negotiated %s', handler.name, protocol)
+        handler.enqueue(_OutgoingFrame(None, 'ws_hello', None, reply))
+        return True
+
+    def _schedulePingRound(self, handler: WebSocketHandler, delay: float) -> None:
+        self._cancelPingTimer(handler)
+        timer = threading.Timer(delay, lambda: self._startPingRound(handler))
         timer.daemon = True
-        self._ping_timer = timer
+        handler.ping_timer = timer
         timer.start()
 
-    def _cancelPingTimer(self) -> None:
-        if self._ping_timer is not None:
-            self._ping_timer.cancel()
-            self._ping_timer = None
-
-    def _startPingRound(self, generation: int) -> None:
-        if (
-            not self.is_open
-            or generation != self._send_generation
-            or self._ping_waiting
-        ):
+    def _cancelPingTimer(self, handler: WebSocketHandler) -> None:
+        if handler.ping_timer is not None:
+            handler.ping_timer.cancel()
+            handler.ping_timer = None
+        handler.ping_waiting = False
+
+    def _startPingRound(self, handler: WebSocketHandler) -> None:
+        if not self.hasHandler(handler) or handler.ping_waiting:
             return
-        self._ping_id += 1
-        self._ping_started_at = time.perf_counter()
-        self._ping_waiting = True
-        self._sendPingPacket('ws_ping', 'python_ping', self._ping_id)
+        handler.ping_id += 1
+        handler.ping_started_at = time.perf_counter()
+        handler.ping_waiting = True
+        self._sendPingPacket(handler, 'ws_ping', 'python_ping', handler.ping_id)
 
-    def _sendPingPacket(self, option: str, stage: str, ping_id: object) -> None:
+    def _sendPingPacket(
+        self, handler: WebSocketHandler, option: str, stage: str, ping_id: object
+    ) -> None:
         try:
-            self.send(
-                dumpJsonPayload(
-                    {
-                        'option': option,
-                        'stage': stage,
-                        'id': ping_id,
-                        'sent_at': time.perf_counter(),
-                    }
-                )
+            msg = dumpJsonPayload(
+                {
+                    'option': option,
+                    'stage': stage,
+                    'id': ping_id,
+                    'sent_at': time.perf_counter(),
+                }
             )
         except Exception as e:
             self._logger.debug('failed to send websocket ping packet: %s', e)
-
-    def send(self, msg: str):
-        if not self.is_open:
             return
+        handler.enqueue(_OutgoingFrame(None, option, None, msg))
+
+    def countSent(self, msg: str | bytes) -> None:
         with self._send_lock:
             self.sent += len(msg) / 1048576.0  # 1024 * 1024
-        self.onSend.emit(msg)
+            if isinstance(msg, bytes):
+                self.binary_frames += 1
+            else:
+                self.json_frames += 1
+
+    def send(self, msg: str):
+        """Queue an already serialised message for every client."""
+        frame = _OutgoingFrame(None, None, None, msg)
+        for handler in self.handlers():
+            handler.enqueue(frame)
 
     def sendJson(
         self,
         payload: dict[str, object],
         coalesce_key: str | None = None,
+        target: WebSocketHandler | None = None,
     ) -> None:
-        self.sendJsonFactory(lambda: payload, coalesce_key=coalesce_key)
+        self.sendJsonFactory(lambda: payload, coalesce_key=coalesce_key, target=target)
 
     def sendJsonFactory(
         self,
         factory: Callable[[], dict[str, object]],
         coalesce_key: str | None = None,
+        target: WebSocketHandler | None = None,
     ) -> None:
         if not self.is_open:
             return
         if self._json_shutdown:
             return
-        if coalesce_key is None:
+        if coalesce_key is None or target is not None:
+            # a send to one client still merges in that client's queue, but
+            # must not take the place of a queued broadcast
             generation = self._send_generation
             try:
-                self._json_executor.submit(self._sendJsonFactory, factory, generation)
+                self._json_executor.submit(
+                    self._sendJsonFactory, factory, generation, coalesce_key, target
+                )
             except RuntimeError:
                 return
             return
@@ -290,7 +471,7 @@ class QObjectHandler(QObject):
     ) -> None:
         current_factory = factory
         while True:
-            self._sendJsonFactory(current_factory, generation)
+            self._sendJsonFactory(current_factory, generation, coalesce_key)
             with self._json_lock:
                 next_factory = self._json_queued.pop(coalesce_key, None)
                 if next_factory is None:
@@ -302,29 +483,40 @@ class QObjectHandler(QObject):
         self,
         factory: Callable[[], dict[str, object]],
         generation: int,
+        coalesce_key: str | None,
+        target: WebSocketHandler | None = None,
     ) -> None:
         if not self.is_open or generation != self._send_generation:
             return
+        if target is not None and not self.hasHandler(target):
+            return
+        started = time.perf_counter()
         try:
             payload = factory()
         except Exception as e:
             self._logger.exception(e)
             return
 
+        handlers = self.handlers() if target is None else [target]
+        option = payload.get('option')
+        json_msg: str | None = None
         try:
-            msg = self._ft_json_sender.dump(payload)
-            if msg is None:
-                msg = dumpJsonPayload(payload)
+            if any(handler.needsJson(option) for handler in handlers):
+                json_msg = self._json_strategy.dump(payload)
         except Exception as e:
             self._logger.exception(e)
             return
-        if generation == self._send_generation:
-            self.send(msg)
+        if generation != self._send_generation:
+            return
+        frame = _OutgoingFrame(coalesce_key, option, payload, json_msg)
+        for handler in handlers:
+            handler.enqueue(frame)
+        self._send_latency.record(time.perf_counter() - started)
 
     def shutdownJsonSender(self) -> None:
         self._json_shutdown = True
         self._json_executor.shutdown(wait=False, cancel_futures=True)
-        self._ft_json_sender.shutdown()
+        worker_pool.shutdown()
 
 
 class WebSocketServer(threading.Thread):
@@ -350,6 +542,7 @@ class WebSocketServer(threading.Thread):
                 f'port={self.port}',
                 f'alive={self.is_alive()}',
                 f'handler={self.handler is not None}',
+                f'clients={len(ws_handler.handlers())}',
                 f'ioloop={self.ioloop is not None}',
             ],
         )
@@ -390,12 +583,13 @@ class WebSocketServer(threading.Thread):
         timeout: float = 2.0,
     ) -> None:
         self._stopping = True
+        handlers = ws_handler.handlers()
 
         def _stop_on_ioloop() -> None:
             if self.server:
                 self.server.stop()
-            if self.handler:
-                self.handler.close()
+            for handler in handlers:
+                handler.close()
             if self.ioloop:
                 self.ioloop.stop()
 
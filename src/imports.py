@@ -373,7 +373,6 @@ from PySide6.QtCore import (
     QVariantAnimation,
     QVersionNumber,
     QWaitCondition,
-    QWinEventNotifier,
     QWriteLocker,
     QXmlStreamAttribute,
     QXmlStreamAttributes,
@@ -535,10 +534,6 @@ from PySide6.QtGui import (
     QRhiColorAttachment,
     QRhiCommandBuffer,
     QRhiComputePipeline,
-    QRhiD3D11InitParams,
-    QRhiD3D11NativeHandles,
-    QRhiD3D12InitParams,
-    QRhiD3D12NativeHandles,
     QRhiDepthStencilClearValue,
     QRhiDriverInfo,
     QRhiGles2InitParams,
@@ -33,7 +33,7 @@ import imports as _ims
 from qfluentwidgets import setTheme, Theme
 import shiboken6
 
-from core.config import loadConfig, saveConfig, Config
+from core.config import flushConfig, loadConfig, Config
 from core.favorites import favorites_manager
 from core.icons import refreshBoundIcons
 from core.llm import LLM
@@ -41,6 +41,7 @@ from core.audio_player import AudioPlayer
 from core.backend import initBackend
 from core.netease_backend import NeteaseCloudMusicBackend
 from core.playing_manager import PlayingManager
+from core.session_snapshot import loadSessionSnapshot
 from core import theme as themeModule
 import pyncm as ncm
 from pyncm import apis
@@ -140,7 +141,7 @@ def patchedExceptHook(
     popup = ErrorPopupWindow(txt)
     popup.exec()
 
-    saveConfig()
+    flushConfig()
 
 
 sys.excepthook = patchedExceptHook
@@ -195,12 +196,18 @@ def _on_ws_connected():
         mwindow.onWebsocketConnected()
 
 
+def _on_ws_client_opened(handler):
+    if mwindow:
+        mwindow.onWebsocketClientOpened(handler)
+
+
 def _on_ws_disconnected():
     if mwindow:
         mwindow.onWebsocketDisconnected()
 
 
 ws_handler.onConnected.connect(_on_ws_connected)
+ws_handler.onClientOpened.connect(_on_ws_client_opened)
 ws_handler.onDisconnected.connect(_on_ws_disconnected)
 
 
@@ -268,6 +275,7 @@ _ims.event_bus.subscribe(
 
 
 if __name__ == '__main__':
+    session_snapshot = loadSessionSnapshot()
     assert launchwindow is not None
     launchwindow.subtitle('Phase 1 (start core...)')
 
@@ -327,6 +335,14 @@ if __name__ == '__main__':
 
     loadConfig()
     launchwindow.push('Loading config...')
+    if (
+        session_snapshot is not None
+        and cfg.last_playlist
+        and session_snapshot.matchesPlaylist(cfg.last_playlist)
+    ):
+        # the snapshot is written periodically, so it is fresher after a crash
+        cfg.last_playing_index = session_snapshot.index
+        cfg.last_playing_time = session_snapshot.position
 
     launchwindow.push('Loading fonts...')
     harmony_font_family = _ims.QFontDatabase.applicationFontFamilies(
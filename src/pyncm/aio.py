@@ -0,0 +1,165 @@
+"""asyncio api client sharing login state with `pyncm.Session`.
+
+usage::
+
+    >>> from pyncm import aio
+    >>> await aio.weapi('/weapi/v3/song/detail', {'c': '[{"id": "29732235"}]'})
+    {'songs': [{'name': 'Supernova', 'id': 29732235, ...}]}
+    >>> cover = await aio.getCurrentAsyncSession().fetch(url)
+
+requests are prepared by the synchronous session, so headers, cookies,
+`eapi_config` and `csrf_token` are shared, and cookies set by responses are
+written back to it. transfers run on tornado's asyncio http client, bounded
+by `max_concurrency` per event loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from http.cookies import SimpleCookie
+from typing import Any
+from urllib.parse import urlparse
+
+import requests
+from tornado.httpclient import HTTPRequest
+from tornado.simple_httpclient import SimpleAsyncHTTPClient
+
+from . import Session, getCurrentSession
+from .apis import _eapi_request, _parse_eapi_response, _parse_response, _weapi_request
+
+MAX_CONCURRENCY_DEFAULT = 16
+TIMEOUT_DEFAULT = 30.0
+
+
+class AsyncResponse:
+    def __init__(self, url: str, status_code: int, headers: dict, content: bytes):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError('%s for url: %s' % (self.status_code, self.url))
+
+
+class AsyncSession:
+    """asyncio counterpart of `Session`.
+
+    with no `session` the current session is used at request time.
+    """
+
+    def __init__(
+        self,
+        session: Session | None = None,
+        max_concurrency: int = MAX_CONCURRENCY_DEFAULT,
+        timeout: float = TIMEOUT_DEFAULT,
+    ) -> None:
+        self._session = session
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._clients: dict[asyncio.AbstractEventLoop, SimpleAsyncHTTPClient] = {}
+
+    @property
+    def session(self) -> Session:
+        return self._session or getCurrentSession()
+
+    def _client(self) -> SimpleAsyncHTTPClient:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            # queues anything above max_clients instead of opening more sockets
+            client = SimpleAsyncHTTPClient(
+                force_instance=True, max_clients=self.max_concurrency
+            )
+            self._clients[loop] = client
+        return client
+
+    async def request(self, method: str, url: str, **kwargs) -> AsyncResponse:
+        session = self.session
+        if url[:4] != 'http':
+            url = 'https://%s%s' % (session.HOST, url)
+        if session.force_http:
+            url = url.replace('https:', 'http:')
+        prepared = session.prepare_request(requests.Request(method, url, **kwargs))
+        response = await self._client().fetch(
+            HTTPRequest(
+                prepared.url,  # type: ignore
+                method=prepared.method,  # type: ignore
+                headers=dict(prepared.headers),
+                body=prepared.body,
+                request_timeout=self.timeout,
+                follow_redirects=True,
+                decompress_response=True,
+                allow_nonstandard_methods=True,
+            ),
+            raise_error=False,
+        )
+        if response.code == 599 and response.error is not None:
+            raise response.error
+        self._store_cookies(session, response.effective_url, response.headers)
+        return AsyncResponse(
+            response.effective_url,
+            response.code,
+            dict(response.headers),
+            response.body or b'',
+        )
+
+    async def get(self, url: str, **kwargs) -> AsyncResponse:
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> AsyncResponse:
+        return await self.request('POST', url, **kwargs)
+
+    async def fetch(self, url: str) -> bytes:
+        """GET a resource such as a cover image."""
+        response = await self.get(url)
+        response.raise_for_status()
+        return response.content
+
+    def close(self):
+        for client in self._clients.values():
+            client.close()
+        self._clients.clear()
+
+    @staticmethod
+    def _store_cookies(session: Session, url: str, headers) -> None:
+        host = urlparse(url).hostname or session.HOST
+        for header in headers.get_list('Set-Cookie'):
+            cookie = SimpleCookie()
+            try:
+                cookie.load(header)
+            except Exception:
+                continue
+            for name, morsel in cookie.items():
+                session.cookies.set(
+                    name,
+                    morsel.value,
+                    domain=morsel['domain'] or host,
+                    path=morsel['path'] or '/',
+                )
+
+
+_async_session = AsyncSession()
+
+
+def getCurrentAsyncSession() -> AsyncSession:
+    return _async_session
+
+
+async def weapi(url, data, session: AsyncSession | None = None, method='POST') -> Any:
+    """async weapi request (web/miniprogram/mobile APIs)."""
+    session = session or _async_session
+    rsp = await session.request(method, **_weapi_request(url, data, session.session))
+    return _parse_response(rsp.content)
+
+
+async def eapi(url, data, session: AsyncSession | None = None, method='POST') -> Any:
+    """async eapi request (desktop client APIs)."""
+    session = session or _async_session
+    rsp = await session.request(method, **_eapi_request(url, data, session.session))
+    return _parse_eapi_response(rsp.content)
@@ -38,25 +38,23 @@ def _parse_response(rsp):
         return rsp
 
 
-def weapi(url, data, session=None, method='POST') -> Any:
-    """weapi request (web/miniprogram/mobile APIs)."""
-    session = session or getCurrentSession()
+def _weapi_request(url, data, session) -> dict[str, Any]:
+    """keyword arguments of `Session.request` for a weapi call."""
     payload = json.dumps({**data, 'csrf_token': session.csrf_token})
-    encrypted = _weapi_encrypt(payload)
-    rsp = session.request(
-        method,
-        url.replace('/api/', '/weapi/'),
-        params={'csrf_token': session.csrf_token},
-        data=encrypted,
-        headers={'User-Agent': session.UA_DEFAULT, 'Referer': 'https://music.163.com'},
-        cookies={**session.eapi_config},
-    )
-    return _parse_response(rsp)
+    return {
+        'url': url.replace('/api/', '/weapi/'),
+        'params': {'csrf_token': session.csrf_token},
+        'data': _weapi_encrypt(payload),
+        'headers': {
+            'User-Agent': session.UA_DEFAULT,
+            'Referer': 'https://music.163.com',
+        },
+        'cookies': {**session.eapi_config},
+    }
 
 
-def eapi(url, data, session=None, method='POST') -> Any:
-    """eapi request (desktop client APIs)."""
-    session = session or getCurrentSession()
+def _eapi_request(url, data, session) -> dict[str, Any]:
+    """keyword arguments of `Session.request` for an eapi call."""
     payload = {
         **data,
         'header': json.dumps(
@@ -68,14 +66,15 @@ def eapi(url, data, session=None, method='POST') -> Any:
     }
     api_path = urllib.parse.urlparse(url).path.replace('/eapi/', '/api/')
     digest = _eapi_encrypt(api_path, json.dumps(payload))
-    rsp = session.request(
-        method,
-        url,
-        headers={'User-Agent': session.UA_EAPI, 'Referer': ''},
-        cookies={**session.eapi_config},
-        data={**digest},
-    )
-    content = rsp.content
+    return {
+        'url': url,
+        'headers': {'User-Agent': session.UA_EAPI, 'Referer': ''},
+        'cookies': {**session.eapi_config},
+        'data': {**digest},
+    }
+
+
+def _parse_eapi_response(content: bytes):
     try:
         decrypted = bytes(_eapi_decrypt(content)).decode()
         return json.loads(decrypted.strip('\x10'))
@@ -87,6 +86,20 @@ def eapi(url, data, session=None, method='POST') -> Any:
         return content
 
 
+def weapi(url, data, session=None, method='POST') -> Any:
+    """weapi request (web/miniprogram/mobile APIs)."""
+    session = session or getCurrentSession()
+    rsp = session.request(method, **_weapi_request(url, data, session))
+    return _parse_response(rsp)
+
+
+def eapi(url, data, session=None, method='POST') -> Any:
+    """eapi request (desktop client APIs)."""
+    session = session or getCurrentSession()
+    rsp = session.request(method, **_eapi_request(url, data, session))
+    return _parse_eapi_response(rsp.content)
+
+
 from . import (  # noqa: E402
     artist as artist,
     miniprograms as miniprograms,
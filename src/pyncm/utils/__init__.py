@@ -14,12 +14,12 @@ def _random_string(_l, chars=BASE62):
 
 def _hex_digest(data: bytearray):
     # Digests a `bytearray` to a hex string
-    return ''.join([hex(d)[2:].zfill(2) for d in data])
+    return bytes(data).hex()
 
 
 def _hex_compose(hexstr: str):
     # Composes a hex string back to a `bytearray`
-    return bytearray([int(hexstr[i : i + 2], 16) for i in range(0, len(hexstr), 2)])
+    return bytearray.fromhex(hexstr)
 
 
 def _hash_digest(text):
@@ -5,6 +5,11 @@ import base64
 from . import _hex_compose, _hex_digest, _hash_hex_digest, _random_string, security
 from .aes import AES
 
+try:
+    from Crypto.Cipher import AES as _NativeAES
+except ImportError:
+    _NativeAES = None
+
 # region secrets
 WEAPI_RSA_PUBKEY = (
     int(
@@ -23,36 +28,94 @@ EAPI_AES_KEY = 'e82ckenh8dichen8'  # ecb
 # endregion
 
 
+# region AES backends
+class _PurePythonAES:
+    """Fallback on the bundled pure-Python AES port"""
+
+    name = 'pyaes'
+
+    def encrypt(self, data: bytes, key: bytes, iv: bytes | None) -> bytes:
+        cipher = AES(key)
+        if iv is None:
+            return bytes(cipher.encrypt_ecb_nopadding(data))
+        return bytes(cipher.encrypt_cbc_nopadding(data, iv))
+
+    def decrypt(self, data: bytes, key: bytes, iv: bytes | None) -> bytes:
+        cipher = AES(key)
+        if iv is None:
+            return bytes(cipher.decrypt_ecb_nopadding(data))
+        return bytes(cipher.decrypt_cbc_nopadding(data, iv))
+
+
+class _CryptodomeAES:
+    """pycryptodome's C implementation"""
+
+    name = 'pycryptodome'
+
+    def encrypt(self, data: bytes, key: bytes, iv: bytes | None) -> bytes:
+        return self._cipher(key, iv).encrypt(data)
+
+    def decrypt(self, data: bytes, key: bytes, iv: bytes | None) -> bytes:
+        return self._cipher(key, iv).decrypt(data)
+
+    @staticmethod
+    def _cipher(key: bytes, iv: bytes | None):
+        if iv is None:
+            return _NativeAES.new(key, _NativeAES.MODE_ECB)
+        return _NativeAES.new(key, _NativeAES.MODE_CBC, iv=iv)
+
+
+CRYPTO_BACKENDS = {_PurePythonAES.name: _PurePythonAES()}
+if _NativeAES is not None:
+    CRYPTO_BACKENDS[_CryptodomeAES.name] = _CryptodomeAES()
+_crypto_backend = CRYPTO_BACKENDS.get(_CryptodomeAES.name) or CRYPTO_BACKENDS['pyaes']
+
+
+def get_crypto_backend() -> str:
+    """Name of the AES implementation in use"""
+    return _crypto_backend.name
+
+
+def set_crypto_backend(name: str):
+    """Switches the AES implementation, e.g. to compare them"""
+    global _crypto_backend
+    if name not in CRYPTO_BACKENDS:
+        raise ValueError(f'crypto backend {name!r} is not available')
+    _crypto_backend = CRYPTO_BACKENDS[name]
+
+
+# endregion
+
+
 # region Cryptographic algorithims
-def _pkcs7_pad(data, bs=AES.BLOCKSIZE):
-    return data + (bs - len(data) % bs) * chr(bs - len(data) % bs)
+def _pkcs7_pad(data: bytes, bs=AES.BLOCKSIZE):
+    return data + bytes([bs - len(data) % bs]) * (bs - len(data) % bs)
 
 
 def _pkcs7_unpad(data, bs=AES.BLOCKSIZE):
     pad = data[-1]
-    if pad not in range(0, bs):
+    if pad not in range(1, bs + 1):
         return data  # hack : data isn't padded
     return data[:-pad]
 
 
 def _aes_encrypt(data: str, key: str, iv='', mode=AES.MODE_CBC):
-    cipher = AES(key.encode())
-    if mode == AES.MODE_CBC:
-        return cipher.encrypt_cbc_nopadding(_pkcs7_pad(data).encode(), iv.encode())
-    else:
-        return cipher.encrypt_ecb_nopadding(_pkcs7_pad(data).encode())
+    return _crypto_backend.encrypt(
+        _pkcs7_pad(data.encode()),
+        key.encode(),
+        iv.encode() if mode == AES.MODE_CBC else None,
+    )
 
 
 def _aes_decrypt(data: str, key: str, iv='', mode=AES.MODE_CBC):
-    cipher = AES(key.encode())
-    if isinstance(data, str):
-        raw = data.encode()
-    else:
-        raw = data
-    if mode == AES.MODE_CBC:
-        return _pkcs7_unpad(cipher.decrypt_cbc_nopadding(raw, iv.encode()))
-    else:
-        return _pkcs7_unpad(cipher.decrypt_ecb_nopadding(raw))
+    raw = data.encode() if isinstance(data, str) else bytes(data)
+    return bytearray(
+        _pkcs7_unpad(
+            _crypto_backend.decrypt(
+                raw, key.encode(), iv.encode() if mode == AES.MODE_CBC else None
+            )
+        )
+    )
 
 
 def _rsa_encrypt(data: str, n, e, reverse=True):
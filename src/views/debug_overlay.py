@@ -1,8 +1,22 @@
+import time
+
 from imports import QWidget, QFont, QFontMetricsF, Qt, QWheelEvent, QPainter, QColor
 from core.app_context import AppContext
 from core.smooth import EaseOutTimer
+from core.tracing import tracer
 from core import theme
 
+# the span timeline at the bottom covers this many seconds
+_TIMELINE_WINDOW = 0.5
+_TIMELINE_ROWS = 8
+_TIMELINE_ROW_HEIGHT = 10
+_CATEGORY_COLORS = {
+    'audio': QColor(80, 200, 120, 200),
+    'paint': QColor(90, 150, 255, 200),
+    'scheduled': QColor(240, 180, 60, 200),
+    'download': QColor(200, 110, 220, 200),
+}
+
 
 class DebugOverlay(QWidget):
     def __init__(self, ctx: AppContext, parent: QWidget) -> None:
@@ -55,4 +69,30 @@ class DebugOverlay(QWidget):
                 painter.drawText(20, y, line)
                 y += self.content_height + 1
 
+        if tracer.enabled:
+            self._paintTimeline(painter)
+
         painter.end()
+
+    def _paintTimeline(self, painter: QPainter) -> None:
+        spans = tracer.recent(_TIMELINE_WINDOW)
+        if not spans:
+            return
+        now = time.perf_counter_ns()
+        width = self.width() - 20
+        scale = width / (_TIMELINE_WINDOW * 1e9)
+        top = self.height() - 10 - _TIMELINE_ROWS * _TIMELINE_ROW_HEIGHT
+        rows: dict[int, int] = {}
+        painter.setPen(Qt.PenStyle.NoPen)
+        for _, category, start, duration, thread_id, _ in spans:
+            row = rows.setdefault(thread_id, len(rows))
+            if row >= _TIMELINE_ROWS:
+                continue
+            x = 10 + max(0.0, width - (now - start) * scale)
+            painter.setBrush(_CATEGORY_COLORS.get(category, QColor(180, 180, 180, 200)))
+            painter.drawRect(
+                int(x),
+                top + row * _TIMELINE_ROW_HEIGHT,
+                max(1, int(duration * scale)),
+                _TIMELINE_ROW_HEIGHT - 2,
+            )
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import logging
 import threading
+from typing import Callable
 
 import shiboken6
 
@@ -187,6 +188,13 @@ class FavoritesPage(QWidget):
             return self.curr_folder.songs
         return []
 
+    def _songCount(self) -> int:
+        if self.is_cloud:
+            return len(self.curr_cloud_songs)
+        elif self.curr_folder:
+            return self.curr_folder.song_count
+        return 0
+
     def _validSongCards(self) -> list[_SongCardItem]:
         self._song_cards = [
             card for card in self._song_cards if shiboken6.isValid(card)
@@ -267,7 +275,13 @@ class FavoritesPage(QWidget):
 
         if self.is_cloud and self.curr_cloud_folder:
             self.title_label.setText(self.curr_cloud_folder.folder_name)
-            songs = self.curr_cloud_songs
+            songs = list(self.curr_cloud_songs)
+            song_ids = [str(song.id) for song in songs]
+            total = len(songs)
+
+            def load_page(offset: int, limit: int) -> list[SongStorable]:
+                return songs[offset : offset + limit]
+
         elif self.curr_folder:
             folder_name = self.curr_folder.folder_name
             for f in favorites_manager.folders:
@@ -275,32 +289,34 @@ class FavoritesPage(QWidget):
                     self.curr_folder = f
                     break
             self.title_label.setText(self.curr_folder.folder_name)
-            songs = self.curr_folder.songs
+            song_ids = self.curr_folder.songIds()
+            total = self.curr_folder.song_count
+            load_page = self.curr_folder.songPage
         else:
             return
 
-        songs = list(songs)
-        self._selected_song_ids.intersection_update(str(song.id) for song in songs)
+        self._selected_song_ids.intersection_update(song_ids)
         self._syncBatchButtons()
-        self._appendSongBatch(refresh_seq, songs, 0)
+        self._appendSongBatch(refresh_seq, load_page, total, 0)
 
     def _appendSongBatch(
         self,
         refresh_seq: int,
-        songs: list[SongStorable],
+        load_page: Callable[[int, int], list[SongStorable]],
+        total: int,
         start: int,
     ) -> None:
         if refresh_seq != self._favorites_refresh_seq:
             return
 
-        end = min(start + LIST_BUILD_BATCH_SIZE, len(songs))
-        for song in songs[start:end]:
+        end = min(start + LIST_BUILD_BATCH_SIZE, total)
+        for song in load_page(start, end - start):
             self._addSongCard(song)
 
-        if end < len(songs):
+        if end < total:
             QTimer.singleShot(
                 1,
-                lambda: self._appendSongBatch(refresh_seq, songs, end),
+                lambda: self._appendSongBatch(refresh_seq, load_page, total, end),
             )
             return
 
@@ -368,10 +384,13 @@ class FavoritesPage(QWidget):
         self.batch_addto_btn.setEnabled(has_selection)
         self.batch_remove_btn.setEnabled(has_selection)
         self.clear_selection_btn.setEnabled(has_selection)
-        self.selectall_btn.setEnabled(bool(self._songs()))
+        self.selectall_btn.setEnabled(self._songCount() > 0)
 
     def selectAllSongs(self) -> None:
-        self._selected_song_ids = {str(song.id) for song in self._songs()}
+        if self.curr_folder and not self.is_cloud:
+            self._selected_song_ids = set(self.curr_folder.songIds())
+        else:
+            self._selected_song_ids = {str(song.id) for song in self._songs()}
         for card in self._validSongCards():
             card.setSelected(True)
         self._syncBatchButtons()
@@ -1,10 +1,9 @@
 import hashlib
 import os
 
-import requests
-
-from core.app_context import AppContext
+from core.app_context import TASK_IDLE, AppContext
 from core.downloader import asyncTask
+from core.http_client import http_client
 from core.icons import SouthsideIcon
 from core.models import (
     CloudFolderInfo,
@@ -71,18 +70,17 @@ class LocalFolderCard(QWidget):
         event_bus.subscribe(IMAGE_ASSET_PERSISTED, self._onImageAssetPersisted)
 
     def _onImageAssetPersisted(self, storable: SongStorable):
-        songs = self.folder.songs
-        if not songs:
+        first = self.folder.songAt(0)
+        if first is None:
             return
-        if storable is not songs[0]:
+        if storable is not first:
             return
         self._loadFirstSongImage()
 
     def _loadFirstSongImage(self):
-        songs = self.folder.songs
-        if not songs:
+        first = self.folder.songAt(0)
+        if first is None:
             return
-        first = songs[0]
         try:
             image_bytes = first.getImageBytes()
             pixmap = QPixmap()
@@ -154,7 +152,7 @@ class CloudFolderCard(QWidget):
         if not os.path.isfile(file):
 
             def _download():
-                image_bytes = requests.get(self.folder.image_url).content
+                image_bytes = http_client.fetch(self.folder.image_url)
                 with open(file, 'wb') as f:
                     f.write(image_bytes)
 
@@ -169,7 +167,9 @@ class CloudFolderCard(QWidget):
                         )
                         self.img_label.setPixmap(scaled)
 
-                self._ctx.addScheduledTask(applyPixmap)
+                self._ctx.scheduleTask(
+                    applyPixmap, priority=TASK_IDLE, key=(self, 'cover')
+                )
 
             asyncTask(_download, (), self._ctx.main_window)
         else:
@@ -260,7 +260,7 @@ class SearchCloudFolderCard(QWidget):
         if not os.path.isfile(file):
 
             def _download():
-                image_bytes = requests.get(self.folder.image_url).content
+                image_bytes = http_client.fetch(self.folder.image_url)
                 with open(file, 'wb') as f:
                     f.write(image_bytes)
 
@@ -275,7 +275,9 @@ class SearchCloudFolderCard(QWidget):
                         )
                         self.img_label.setPixmap(scaled)
 
-                self._ctx.addScheduledTask(applyPixmap)
+                self._ctx.scheduleTask(
+                    applyPixmap, priority=TASK_IDLE, key=(self, 'cover')
+                )
 
             asyncTask(_download, (), self._ctx.main_window)
         else:
@@ -25,7 +25,7 @@ from views.list_widget import SScrollArea
 from views.account_widget import AccountWidget
 from views.animated_layout import SFlowLayout
 from views.number_viewer import NumberViewer
-from core.downloader import asyncTask
+from core.async_bridge import runAsync
 from views.song_card import CloudFavoriteSongCard
 
 
@@ -132,12 +132,11 @@ class HomePage(SScrollArea):
         self.folders_counter.y_map.clear()
         self.songs_counter.y_map.clear()
 
-        def _fetchFolders():
-            folders: list[CloudFolderInfo] = []
+        def _showFolders(folders: list[CloudFolderInfo]):
             idx = -1
 
             def add():
-                nonlocal folders, idx
+                nonlocal idx
                 idx += 1
                 if idx >= len(folders):
                     return
@@ -148,18 +147,14 @@ class HomePage(SScrollArea):
 
                 QTimer.singleShot(100, add)
 
-            folders = getBackend().getDailyRecommendFolders()
-            self.ctx.addScheduledTask(
-                lambda: self.folders_counter.setText(str(len(folders)))
-            )
-            self.ctx.addScheduledTask(add)
+            self.folders_counter.setText(str(len(folders)))
+            add()
 
-        def _fetchSongs():
-            songs = getBackend().getDailyRecommendSongs()
+        def _showSongs(songs: list[SongStorable]):
             idx = -1
 
             def add():
-                nonlocal songs, idx
+                nonlocal idx
                 idx += 1
                 if idx >= len(songs):
                     return
@@ -176,13 +171,12 @@ class HomePage(SScrollArea):
 
                 QTimer.singleShot(50, add)
 
-            self.ctx.addScheduledTask(
-                lambda: self.songs_counter.setText(str(len(songs)))
-            )
-            self.ctx.addScheduledTask(add)
+            self.songs_counter.setText(str(len(songs)))
+            add()
 
-        asyncTask(_fetchFolders, (), self)
-        asyncTask(_fetchSongs, (), self)
+        # both requests share the asyncio loop instead of a thread each
+        runAsync(getBackend().getDailyRecommendFoldersAsync(), self, _showFolders)
+        runAsync(getBackend().getDailyRecommendSongsAsync(), self, _showSongs)
 
     def _playSong(self, song: SongStorable) -> None:
         event_bus.emit(PLAY_STORABLE, song)
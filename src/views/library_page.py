@@ -199,13 +199,15 @@ class LibraryPage(SScrollArea):
         self._song_cards = []
 
         songs: list[SongStorable] = []
+        seen_ids: set[str] = set()
 
         for folder in favorites_manager.folders:
             if isinstance(folder, CloudFolderInfo):
                 continue
             for s in folder.songs:
-                if s in songs:
+                if s.id in seen_ids:
                     continue
+                seen_ids.add(s.id)
                 songs.append(s)
 
         for song in songs:
@@ -5,7 +5,7 @@ import logging
 import math
 import time
 
-from core.app_context import AppContext
+from core.app_context import TASK_IDLE, AppContext
 
 from core.downloader import asyncTask
 from imports import (
@@ -33,6 +33,7 @@ from imports import QWidget
 
 from core.qt_utils import toQtInt
 from core.time_format import float2time
+from core.tracing import tracer
 from core.color import mixColor
 from core import theme
 from core.smooth import EaseOutTimer
@@ -145,7 +146,12 @@ class LyricsViewer(QWidget):
                         c = ch.char.strip()
                         if c:
                             all_texts.add(c)
-        self.ctx.addScheduledTask(self._prewarmFontMetricsOnMainThread, all_texts)
+        self.ctx.scheduleTask(
+            self._prewarmFontMetricsOnMainThread,
+            all_texts,
+            priority=TASK_IDLE,
+            key=(self, 'prewarm'),
+        )
 
     def _prewarmFontMetricsOnMainThread(self, all_texts: set[str]) -> None:
         if not all_texts:
@@ -626,6 +632,7 @@ class LyricsViewer(QWidget):
             'x': self.draw_x_offset,
             'draw_offset': self.draw_offset,
             'target_draw_offset': self.target_draw_offset,
+            'top_offset': top_offset,
             'acceleration': self.acc,
             'total_height': total_height,
             'primary_font_family': self.ft.family(),
@@ -654,6 +661,7 @@ class LyricsViewer(QWidget):
         self._layout_payload = self.lyricLayoutPayload(update_animation=False)
         self.update()
 
+    @tracer.traced('LyricsViewer.paintEvent', 'paint')
     def paintEvent(self, event: QPaintEvent) -> None:
         payload = self._layout_payload
         if not payload.get('ready'):
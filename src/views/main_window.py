@@ -9,6 +9,8 @@ from core.backend import getBackend
 from core.dialogs import getTextLineedit
 from core.qt_utils import toQtInt
 from core.smooth import EaseOutTimer
+from core.tracing import tracer
+from core.ws_server import WebSocketHandler
 from imports import (
     BACKGROUND_RATIO_CHANGED,
     ENDING_NO_SOUND,
@@ -59,7 +61,7 @@ from qfluentwidgets.window.fluent_window import FluentWindowBase
 from core import theme
 from core.models import CloudFolderInfo, LocalFolderInfo, SongInfo, SongStorable
 from core.color import mixColor
-from core.config import saveConfig, cfg
+from core.config import flushConfig, cfg
 from core.favorites import favorites_manager, saveFavorites
 from core.icons import bindIcon
 from core.downloader import asyncTask
@@ -749,7 +751,7 @@ class MainWindow(FluentWindowBase):
         cfg.window_maximized = self.isMaximized()
         cfg.llm_viewer_expanded = self.llm_viewer_panel.expanded
 
-        saveConfig()
+        flushConfig()
         saveFavorites()
 
         self._app.quit()
@@ -797,15 +799,6 @@ class MainWindow(FluentWindowBase):
             duration=5000,
             parent=self,
         )
-        QTimer.singleShot(
-            500,
-            lambda: self._ws_handler.sendJson(
-                {
-                    'option': f'{"disable" if not self._stp.enableFFT_box.isChecked() else "enable"}_fft'
-                }
-            ),
-        )
-        QTimer.singleShot(500, self._dp.sendSongCoverAndInfo)
 
         self.connected = True
 
@@ -814,6 +807,19 @@ class MainWindow(FluentWindowBase):
 
         event_bus.emit(WEBSOCKET_CONNECTED)
 
+    def onWebsocketClientOpened(self, handler: WebSocketHandler):
+        # the client that joined gets the current state; the others have it
+        QTimer.singleShot(
+            500,
+            lambda: self._ws_handler.sendJson(
+                {
+                    'option': f'{"disable" if not self._stp.enableFFT_box.isChecked() else "enable"}_fft'
+                },
+                target=handler,
+            ),
+        )
+        QTimer.singleShot(500, lambda: self._dp.sendSongCoverAndInfo(handler))
+
     def onWebsocketDisconnected(self):
         InfoBar.warning(
             tr('main_window.southside_client_connection'),
@@ -837,6 +843,9 @@ class MainWindow(FluentWindowBase):
             self.ctx.debugging_obj.toggle()
             self.debug_overlay.refresh()
             event.accept()
+        elif event.key() == Qt.Key.Key_F4 and tracer.enabled:
+            self.ctx.debugging_obj.exportTrace()
+            event.accept()
         else:
             return super().keyPressEvent(event)
 
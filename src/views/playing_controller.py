@@ -11,6 +11,7 @@ from core.i18n import tr
 from core.models import SongStorable
 from core.qt_utils import toQtInt
 from core.smooth import EaseOutTimer
+from core.tracing import tracer
 from views.setting_page import SettingPage
 
 from core.color import mixColor
@@ -226,6 +227,7 @@ class PlayingControllerLyricsViewer(QWidget):
     def _currentLineBaseline(self) -> float:
         return (self.height() - self.font_height) * 0.5 + self.metri.ascent()
 
+    @tracer.traced('PlayingControllerLyricsViewer.paintEvent', 'paint')
     def paintEvent(self, event: QPaintEvent) -> None:
         payload = self._draw_payload
         if not payload.get('ready') or not self._lyrics_ready:
@@ -738,6 +740,7 @@ class PlayingController(QWidget):
             self._player.resume()
             event_bus.emit(PLAY_STATE_CHANGED, True)
 
+    @tracer.traced('PlayingController.paintEvent', 'paint')
     def paintEvent(self, event: QPaintEvent) -> None:
         painter = QPainter(self)
         painter.setRenderHints(QPainter.RenderHint.Antialiasing)
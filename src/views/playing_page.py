@@ -11,6 +11,7 @@ from core.icons import bindIcon
 from core.models import SongStorable
 from core.theme import isDark
 from core.playing_manager import PlayMode
+from core.ws_server import WebSocketHandler
 from imports import (
     BACKGROUND_RATIO_CHANGED,
     PLAY_START_PLAYLIST,
@@ -51,6 +52,13 @@ from views.lyrics_viewer import LyricsViewer
 from views.song_card import DummyCard
 
 
+def _readBytes(path: str | None) -> bytes:
+    if path is None:
+        return b''
+    with open(path, 'rb') as f:
+        return f.read()
+
+
 def _artists_text(song: SongStorable) -> str:
     return '、'.join([artist.name for artist in song.artists])
 
@@ -341,7 +349,7 @@ class PlayingPage(QWidget):
         else:
             InfoBar.error(title, message, parent=self._mwindow_obj)
 
-    def sendSongCoverAndInfo(self) -> None:
+    def sendSongCoverAndInfo(self, target: WebSocketHandler | None = None) -> None:
         if not self._ws_handler.is_open:
             return
         if self.cur is None:
@@ -353,13 +361,17 @@ class PlayingPage(QWidget):
         if pixmap is None or pixmap.isNull():
             return
 
-        pixmap = pixmap.scaled(pixmap.size(), Qt.AspectRatioMode.KeepAspectRatio)
-
-        buffer = QBuffer()
-        buffer.open(QIODevice.OpenModeFlag.WriteOnly)
-        pixmap.save(buffer, 'PNG')
-        img_bytes = buffer.data().data()
-        buffer.close()
+        # the cached cover goes out as-is, read on the sender thread
+        img_bytes: bytes | None = None
+        try:
+            img_path: str | None = self.cur.storable.getImagePath()
+        except FileNotFoundError:
+            img_path = None
+            buffer = QBuffer()
+            buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+            pixmap.save(buffer, 'PNG')
+            img_bytes = buffer.data().data()
+            buffer.close()
 
         song_name = self.cur.storable.name
         position = self.playing_manager.getDisplayPosition()
@@ -369,9 +381,11 @@ class PlayingPage(QWidget):
         artists = _artists_text(self.cur.storable)
         is_playing = self.ctx.player.isPlaying()
         self._ws_handler.sendJsonFactory(
-            lambda img_bytes=img_bytes, song_name=song_name, position=position, duration=duration, translation_enabled=translation_enabled, use_yrc=use_yrc, artists=artists, is_playing=is_playing: {
+            lambda img_bytes=img_bytes, img_path=img_path, song_name=song_name, position=position, duration=duration, translation_enabled=translation_enabled, use_yrc=use_yrc, artists=artists, is_playing=is_playing: {
                 'option': 'cover',
-                'image': json_base64_bytes(img_bytes),
+                'image': json_base64_bytes(
+                    img_bytes if img_bytes is not None else _readBytes(img_path)
+                ),
                 'song_name': song_name,
                 'position': position,
                 'duration': duration,
@@ -381,6 +395,7 @@ class PlayingPage(QWidget):
                 'is_playing': is_playing,
             },
             coalesce_key='cover',
+            target=target,
         )
 
     def resizeEvent(self, event: QResizeEvent) -> None:
@@ -2,7 +2,6 @@ from __future__ import annotations
 
 import logging
 
-import os
 import threading
 from typing import Callable, TYPE_CHECKING, Literal
 
@@ -53,7 +52,6 @@ from qfluentwidgets import (
 
 from core.models import (
     IMAGE_DATA_DIR,
-    MUSIC_DATA_DIR,
     CloudFolderInfo,
     SearchSongInfo,
     SongDetail,
@@ -66,7 +64,8 @@ from core.downloader import (
     asyncTask,
 )
 from core.soundfile import getSongFormat, saveSongWithInformation
-import requests
+from core.http_client import http_client
+from core.image_service import cover_images
 from core.favorites import favorites_manager
 from core.backend import getBackend
 from core.app_context import AppContext
@@ -127,10 +126,7 @@ class FolderSelectDialog(MessageBoxBase):
         local_folders = [
             f
             for f in favorites_manager.folders
-            if any(
-                not any(s.id == selected_id for s in f.songs)
-                for selected_id in song_ids
-            )
+            if any(not f.hasSong(selected_id) for selected_id in song_ids)
         ]
 
         if local_folders:
@@ -208,7 +204,7 @@ class FolderSelectDialog(MessageBoxBase):
 
 
 class SearchSongCard(QWidget):
-    imageLoaded = Signal(bytes)
+    imageLoaded = Signal(str, object)
 
     def __init__(self, info: SearchSongInfo, play_callback: Callable, ctx: AppContext) -> None:
         super().__init__()
@@ -284,7 +280,7 @@ class SearchSongCard(QWidget):
         song_id = str(self.info.id)
         logged = getBackend().loggedIn()
         all_local_have = bool(favorites_manager.folders) and all(
-            any(s.id == song_id for s in f.songs) for f in favorites_manager.folders
+            f.hasSong(song_id) for f in favorites_manager.folders
         )
         if all_local_have and not logged:
             InfoBar.info(
@@ -380,30 +376,29 @@ class SearchSongCard(QWidget):
 
     def loadDetailAndImage(self):
         self.load = True
+        size = self.img_label.size()
 
         def _do():
-            detail = getBackend().getTrackDetail(str(self.info.id))
-            img_url = detail.cover_url
+            # search results already carry the album cover
+            img_url = self.info.album.cover_url
+            if not img_url:
+                img_url = getBackend().getTrackDetail(str(self.info.id)).cover_url
             self.detail.image_url = img_url
 
-            img_bytes = requests.get(img_url).content
-
-            self.imageLoaded.emit(img_bytes)
+            key, image = cover_images.urlThumbnail(img_url, size)
+            self.imageLoaded.emit(key, image)
 
         asyncTask(_do, (), self._mwindow)
 
-    def onImageLoaded(self, bytes):
+    def onImageLoaded(self, key: str, image: QImage | None):
         self.ring.hide()
         self.img_label.show()
-        pixmap = QPixmap()
-        pixmap.loadFromData(bytes)
-        if not pixmap.isNull():
-            scaled = pixmap.scaled(
-                self.img_label.size(),
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation,
-            )
-            self.img_label.setPixmap(scaled)
+        if image is not None:
+            size = self.img_label.size()
+            pixmap = cover_images.cachedPixmap(key, size)
+            if pixmap is None:
+                pixmap = cover_images.pixmapFromImage(key, size, image)
+            self.img_label.setPixmap(pixmap)
         self.playbtn.setEnabled(True)
 
 
@@ -567,7 +562,7 @@ class _SongCardItem(QWidget):
             try:
                 detail = getBackend().getTrackDetail(storable.id)
                 image_url = detail.cover_url
-                image_bytes = requests.get(image_url).content
+                image_bytes = http_client.fetch(image_url)
             except Exception as e:
                 self._logger.warning(
                     f'failed to auto-download image for {storable.id}: {e}'
@@ -591,46 +586,21 @@ class _SongCardItem(QWidget):
         if self._mwindow is None:
             return
 
-        result: dict[str, bytes] = {}
-
-        def _decode():
-            try:
-                image_bytes = self.storable.getImageBytes()
-            except FileNotFoundError:
-                return
-            result['image_bytes'] = image_bytes
-
-        def _finish():
-            image_bytes = result.get('image_bytes')
-            if image_bytes is None:
+        def _apply_pixmap(pixmap: QPixmap):
+            if not self.load:
                 return
-
-            def _apply_pixmap():
-                if not self.load:
-                    return
-                try:
-                    self.img_label.objectName()
-                except RuntimeError:
-                    return
-                image = QImage()
-                image.loadFromData(image_bytes)
-                if image.isNull():
-                    return
-                pixmap = QPixmap.fromImage(image)
-                if not pixmap.isNull():
-                    scaled = pixmap.scaled(
-                        self.img_label.size(),
-                        Qt.AspectRatioMode.KeepAspectRatio,
-                        Qt.TransformationMode.SmoothTransformation,
-                    )
-                    self.img_label.setPixmap(scaled)
-
-            self._mwindow.ctx.addScheduledTask(_apply_pixmap)
-
-        try:
-            asyncTask(_decode, (), self._mwindow, _finish)
-        except Exception:
-            pass
+            try:
+                self.img_label.setPixmap(pixmap)
+            except RuntimeError:
+                pass
+
+        cover_images.requestStorablePixmap(
+            self.storable,
+            self.img_label.size(),
+            self._mwindow.ctx,
+            _apply_pixmap,
+            key=(self, 'cover'),
+        )
 
     def mousePressEvent(self, event: QMouseEvent):
         if event.button() == Qt.MouseButton.LeftButton:
@@ -648,7 +618,7 @@ class _SongCardItem(QWidget):
         song_id = str(self.storable.id)
         logged = getBackend().loggedIn()
         all_local_have = bool(favorites_manager.folders) and all(
-            any(s.id == song_id for s in f.songs) for f in favorites_manager.folders
+            f.hasSong(song_id) for f in favorites_manager.folders
         )
         if all_local_have and not logged:
             InfoBar.info(
@@ -711,15 +681,13 @@ class PlaylistSongCard(_SongCardItem):
     def _exportSong(self):
         if not self._dp.playing_manager.ensureAssets(self.storable):
             return
-        with open(
-            os.path.join(MUSIC_DATA_DIR, self.storable.content_cache_hash), 'rb'
-        ) as f:
-            export_path, fmt = QFileDialog.getSaveFileName(
-                self._mwindow,
-                tr('song_card.export_song'),
-                _export_default_path(self.storable, getSongFormat(f.read())),
-                tr('song_card.song_files_mp3_m4a_flac_wav_ogg_opus'),
-            )
+        music_path = self.storable.getMusicPath()
+        export_path, fmt = QFileDialog.getSaveFileName(
+            self._mwindow,
+            tr('song_card.export_song'),
+            _export_default_path(self.storable, getSongFormat(music_path)),
+            tr('song_card.song_files_mp3_m4a_flac_wav_ogg_opus'),
+        )
 
         if export_path:
 
@@ -727,7 +695,7 @@ class PlaylistSongCard(_SongCardItem):
                 detail = getBackend().getTrackDetail(self.storable.id)
                 image_url = detail.cover_url
 
-                image_bytes = requests.get(image_url).content
+                image_bytes = http_client.fetch(image_url)
 
                 album = detail.album_name
                 track_number = f'{detail.cd}/{detail.track_no}'
@@ -740,24 +708,20 @@ class PlaylistSongCard(_SongCardItem):
                         datetime.datetime.fromtimestamp(publish_time / 1000).year
                     )
 
-                with open(
-                    os.path.join(MUSIC_DATA_DIR, self.storable.content_cache_hash),
-                    'rb',
-                ) as song:
-                    saveSongWithInformation(
-                        song.read(),
-                        image_bytes,
-                        self.storable.name,
-                        self.storable.artists,
-                        export_path,
-                        self.storable.lyric,
-                        album,
-                        '',
-                        year,
-                        track_number,
-                        '',
-                        '',
-                    )
+                saveSongWithInformation(
+                    music_path,
+                    image_bytes,
+                    self.storable.name,
+                    self.storable.artists,
+                    export_path,
+                    self.storable.lyric,
+                    album,
+                    '',
+                    year,
+                    track_number,
+                    '',
+                    '',
+                )
 
             def _final():
                 InfoBar.success(
@@ -849,15 +813,13 @@ class FavoriteSongCard(_SongCardItem):
     def _exportSong(self):
         if not self._dp.playing_manager.ensureAssets(self.storable):
             return
-        with open(
-            os.path.join(MUSIC_DATA_DIR, self.storable.content_cache_hash), 'rb'
-        ) as f:
-            export_path, fmt = QFileDialog.getSaveFileName(
-                self._mwindow,
-                tr('song_card.export_song'),
-                _export_default_path(self.storable, getSongFormat(f.read())),
-                tr('song_card.song_files_mp3_m4a_flac_wav_ogg_opus'),
-            )
+        music_path = self.storable.getMusicPath()
+        export_path, fmt = QFileDialog.getSaveFileName(
+            self._mwindow,
+            tr('song_card.export_song'),
+            _export_default_path(self.storable, getSongFormat(music_path)),
+            tr('song_card.song_files_mp3_m4a_flac_wav_ogg_opus'),
+        )
 
         if export_path:
 
@@ -865,7 +827,7 @@ class FavoriteSongCard(_SongCardItem):
                 detail = getBackend().getTrackDetail(self.storable.id)
                 image_url = detail.cover_url
 
-                image_bytes = requests.get(image_url).content
+                image_bytes = http_client.fetch(image_url)
 
                 album = detail.album_name
                 track_number = f'{detail.cd}/{detail.track_no}'
@@ -878,24 +840,20 @@ class FavoriteSongCard(_SongCardItem):
                         datetime.datetime.fromtimestamp(publish_time / 1000).year
                     )
 
-                with open(
-                    os.path.join(MUSIC_DATA_DIR, self.storable.content_cache_hash),
-                    'rb',
-                ) as song:
-                    saveSongWithInformation(
-                        song.read(),
-                        image_bytes,
-                        self.storable.name,
-                        self.storable.artists,
-                        export_path,
-                        self.storable.lyric,
-                        album,
-                        '',
-                        year,
-                        track_number,
-                        '',
-                        '',
-                    )
+                saveSongWithInformation(
+                    music_path,
+                    image_bytes,
+                    self.storable.name,
+                    self.storable.artists,
+                    export_path,
+                    self.storable.lyric,
+                    album,
+                    '',
+                    year,
+                    track_number,
+                    '',
+                    '',
+                )
 
             def _final():
                 InfoBar.success(
@@ -953,15 +911,13 @@ class CloudFavoriteSongCard(_SongCardItem):
     def _exportSong(self):
         if not self._dp.playing_manager.ensureAssets(self.storable):
             return
-        with open(
-            os.path.join(MUSIC_DATA_DIR, self.storable.content_cache_hash), 'rb'
-        ) as f:
-            export_path, fmt = QFileDialog.getSaveFileName(
-                self._mwindow,
-                tr('song_card.export_song'),
-                _export_default_path(self.storable, getSongFormat(f.read())),
-                tr('song_card.song_files_mp3_m4a_flac_wav_ogg_opus'),
-            )
+        music_path = self.storable.getMusicPath()
+        export_path, fmt = QFileDialog.getSaveFileName(
+            self._mwindow,
+            tr('song_card.export_song'),
+            _export_default_path(self.storable, getSongFormat(music_path)),
+            tr('song_card.song_files_mp3_m4a_flac_wav_ogg_opus'),
+        )
 
         if export_path:
 
@@ -969,7 +925,7 @@ class CloudFavoriteSongCard(_SongCardItem):
                 detail = getBackend().getTrackDetail(self.storable.id)
                 image_url = detail.cover_url
 
-                image_bytes = requests.get(image_url).content
+                image_bytes = http_client.fetch(image_url)
 
                 album = detail.album_name
                 track_number = f'{detail.cd}/{detail.track_no}'
@@ -982,24 +938,20 @@ class CloudFavoriteSongCard(_SongCardItem):
                         datetime.datetime.fromtimestamp(publish_time / 1000).year
                     )
 
-                with open(
-                    os.path.join(MUSIC_DATA_DIR, self.storable.content_cache_hash),
-                    'rb',
-                ) as song:
-                    saveSongWithInformation(
-                        song.read(),
-                        image_bytes,
-                        self.storable.name,
-                        self.storable.artists,
-                        export_path,
-                        self.storable.lyric,
-                        album,
-                        '',
-                        year,
-                        track_number,
-                        '',
-                        '',
-                    )
+                saveSongWithInformation(
+                    music_path,
+                    image_bytes,
+                    self.storable.name,
+                    self.storable.artists,
+                    export_path,
+                    self.storable.lyric,
+                    album,
+                    '',
+                    year,
+                    track_number,
+                    '',
+                    '',
+                )
 
             def _final():
                 InfoBar.success(